@@ -0,0 +1 @@
+"""Benchmarks for the feed generator. Run modules with `python -m benchmarks.<name>`."""
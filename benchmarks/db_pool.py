@@ -0,0 +1,124 @@
+"""Per-request latency of getFeedSkeleton with different database connection modes.
+
+Each mode runs in its own process against the configured Postgres database:
+`connect` opens a new connection per request, `persistent` keeps one connection
+per thread with health checks and `pool` uses the psycopg connection pool. Set
+`FEEDGEN_DB_SSL_MODE=require` against a remote database to include the TLS
+handshake in the connection cost.
+
+Usage:
+    FEEDGEN_DB_TYPE=postgres python -m benchmarks.db_pool [--requests 1000]
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.utils import percentile, print_table, setup_django
+
+MODES = {
+    "connect": {"FEEDGEN_DB_POOL": "FALSE", "FEEDGEN_DB_CONN_MAX_AGE": "0"},
+    "persistent": {"FEEDGEN_DB_POOL": "FALSE", "FEEDGEN_DB_CONN_MAX_AGE": "600"},
+    "pool": {"FEEDGEN_DB_POOL": "TRUE"},
+}
+
+
+def run_mode(args) -> dict:
+    """Run the requests of a single mode in this process."""
+    setup_django()
+
+    from django.conf import settings
+
+    from benchmarks.feed_load import FEED_URI, view_request
+    from flatlanders.algorithms import ALGORITHMS
+    from flatlanders.algorithms.flatlanders_feed import FlatlandersAlgorithm
+    from flatlanders.db import pool_stats
+
+    settings.CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.dummy.DummyCache"
+    }
+    ALGORITHMS[FEED_URI] = FlatlandersAlgorithm().aget_feed
+
+    def timed_request(_) -> float:
+        start = time.perf_counter()
+        view_request(random.choice((10, 30, 50)), None)
+        return (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        # Warm up every thread, and the pool, before measuring
+        list(pool.map(timed_request, range(args.concurrency * 2)))
+        start = time.perf_counter()
+        latencies = list(pool.map(timed_request, range(args.requests)))
+        wall = time.perf_counter() - start
+
+    return {
+        "throughput": args.requests / wall,
+        "latencies": latencies,
+        "pool": pool_stats(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args)))
+        return
+
+    if os.getenv("FEEDGEN_DB_TYPE", "sqlite") != "postgres":
+        sys.exit(
+            "Connection modes only differ on Postgres, set FEEDGEN_DB_TYPE=postgres"
+        )
+
+    rows = []
+    for mode, env in MODES.items():
+        output = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.db_pool",
+                "--mode",
+                mode,
+                "--requests",
+                str(args.requests),
+                "--concurrency",
+                str(args.concurrency),
+            ],
+            env={**os.environ, **env},
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.splitlines()[-1])
+        latencies = result["latencies"]
+        stats = result["pool"] or {}
+        rows.append(
+            [
+                mode,
+                f"{result['throughput']:.0f}",
+                f"{percentile(latencies, 50):.2f}",
+                f"{percentile(latencies, 95):.2f}",
+                f"{percentile(latencies, 99):.2f}",
+                stats.get("connections_num", "-"),
+                stats.get("requests_wait_ms", "-"),
+            ]
+        )
+
+    print(f"concurrency={args.concurrency} requests={args.requests}")
+    print_table(
+        ["mode", "req/s", "p50 ms", "p95 ms", "p99 ms", "pool conns", "pool wait ms"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Load test of getFeedSkeleton against the configured database.
+
+Seed the database first, e.g. `python manage.py seed_posts --count 10000000`, then
+drive concurrent first-page and deep-cursor requests through either
+`FlatlandersAlgorithm.get_feed` or the full WSGI application. Set
+`FEEDGEN_DB_TYPE=postgres` to run against Postgres instead of SQLite.
+
+Usage:
+    python -m benchmarks.feed_load [--mode view] [--requests 2000] [--concurrency 16]
+"""
+
+import argparse
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+from wsgiref.util import setup_testing_defaults
+
+from benchmarks.utils import percentile, print_table, setup_django
+
+FEED_URI = "at://did:plc:benchmark/app.bsky.feed.generator/flatlanders"
+
+
+def sample_cursors(count: int, max_depth: int) -> list[str]:
+    """Build cursors pointing at random depths of the chronological feed."""
+    from flatlanders.models.posts import FeedEntry
+
+    entries = FeedEntry.objects.filter(feed="flatlanders_jetstream")
+    total = entries.count()
+    cursors = []
+    for _ in range(count):
+        offset = random.randrange(min(total, max_depth))
+        created_at, cid = entries.order_by("-created_at").values_list(
+            "created_at", "cid"
+        )[offset]
+        cursors.append(f"{created_at.timestamp()}::{cid}")
+    return cursors
+
+
+def algorithm_request(limit: int, cursor: str | None) -> None:
+    from flatlanders.algorithms.flatlanders_feed import FlatlandersAlgorithm
+
+    FlatlandersAlgorithm().get_feed(cursor=cursor, limit=limit)
+
+
+def view_request(limit: int, cursor: str | None) -> None:
+    from sk_atp_feed.wsgi import application
+
+    params = {"feed": FEED_URI, "limit": limit}
+    if cursor:
+        params["cursor"] = cursor
+
+    environ = {
+        "PATH_INFO": "/xrpc/app.bsky.feed.getFeedSkeleton",
+        "QUERY_STRING": urlencode(params),
+        "HTTP_HOST": "localhost",
+    }
+    setup_testing_defaults(environ)
+    status = []
+    b"".join(application(environ, lambda s, _: status.append(s)))
+    if not status[0].startswith("200"):
+        raise RuntimeError(f"Request failed: {status[0]}")
+
+
+def timed_request(request, limit: int, cursor: str | None) -> tuple[float, int]:
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        request(limit, cursor)
+        elapsed = (time.perf_counter() - start) * 1000
+    return elapsed, len(queries)
+
+
+def run_scenario(request, cursors, args) -> list:
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        start = time.perf_counter()
+        results = list(
+            pool.map(
+                lambda cursor: timed_request(request, args.limit, cursor),
+                (random.choice(cursors) for _ in range(args.requests)),
+            )
+        )
+        wall = time.perf_counter() - start
+
+    latencies = [latency for latency, _ in results]
+    return [
+        f"{args.requests / wall:.0f}",
+        f"{percentile(latencies, 50):.2f}",
+        f"{percentile(latencies, 95):.2f}",
+        f"{percentile(latencies, 99):.2f}",
+        f"{statistics.mean(queries for _, queries in results):.1f}",
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=("algorithm", "view"), default="algorithm")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--limit", type=int, default=30)
+    parser.add_argument("--max-depth", type=int, default=100_000)
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Keep the feed page cache enabled in view mode.",
+    )
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.conf import settings
+
+    from flatlanders.algorithms import ALGORITHMS
+    from flatlanders.algorithms.flatlanders_feed import FlatlandersAlgorithm
+
+    if not args.cache:
+        settings.CACHES["default"] = {
+            "BACKEND": "django.core.cache.backends.dummy.DummyCache"
+        }
+    ALGORITHMS[FEED_URI] = FlatlandersAlgorithm().aget_feed
+
+    request = view_request if args.mode == "view" else algorithm_request
+    rows = [
+        ["first page", *run_scenario(request, [None], args)],
+        [
+            "deep cursor",
+            *run_scenario(request, sample_cursors(200, args.max_depth), args),
+        ],
+    ]
+
+    print(f"mode={args.mode} concurrency={args.concurrency} limit={args.limit}")
+    print_table(["scenario", "req/s", "p50 ms", "p95 ms", "p99 ms", "queries"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Microbenchmark of the getFeedSkeleton query and serialization path.
+
+Compares the original path, which loads full `Post` instances and serializes with
+`JsonResponse`'s encoder, against the projection-only feed entry path used by
+`FlatlandersAlgorithm` and the `FeedSkeleton` view.
+
+Usage:
+    python -m benchmarks.feed_skeleton [--posts 5000] [--iterations 200]
+"""
+
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+from datetime import UTC, datetime, timedelta
+
+from benchmarks.utils import percentile, print_table, setup_django
+
+LIMITS = (20, 50, 100)
+
+
+def seed(count: int) -> None:
+    from flatlanders.algorithms.flatlanders_feed import FlatlandersAlgorithm
+    from flatlanders.models.posts import FeedEntry, Post
+
+    now = datetime.now(tz=UTC)
+    posts = Post.objects.bulk_create(
+        Post(
+            uri=f"at://did:plc:bench{i % 97}/app.bsky.feed.post/{i:013d}",
+            cid=f"bafyrei{i:052d}",
+            author_did=f"did:plc:bench{i % 97}",
+            text="Saskatchewan " * 25,
+            created_at=now - timedelta(seconds=i),
+        )
+        for i in range(count)
+    )
+    feed = FlatlandersAlgorithm().name
+    FeedEntry.objects.bulk_create(FeedEntry.from_post(post, feed) for post in posts)
+
+
+def model_path(limit: int) -> bytes:
+    """The feed path before the projection-only query."""
+    from django.core.serializers.json import DjangoJSONEncoder
+
+    from flatlanders.models.posts import Post
+
+    posts = Post.objects.order_by("-created_at")[:limit]
+    feed = [{"post": post.uri} for post in posts]
+    last = list(posts)[-1]
+    cursor = f"{last.created_at.timestamp()}::{last.cid}"
+    return json.dumps({"cursor": cursor, "feed": feed}, cls=DjangoJSONEncoder).encode()
+
+
+def lean_path(limit: int) -> bytes:
+    import orjson
+
+    from flatlanders.algorithms.flatlanders_feed import FlatlandersAlgorithm
+
+    return orjson.dumps(FlatlandersAlgorithm().get_feed(cursor=None, limit=limit))
+
+
+def measure(path, limit: int, iterations: int) -> list:
+    path(limit)  # warm up
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        path(limit)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    path(limit)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return [
+        f"{statistics.mean(timings):.3f}",
+        f"{percentile(timings, 95):.3f}",
+        f"{(peak - before) / 1024:.1f}",
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=5000)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django(test_database=True)
+    seed(args.posts)
+
+    rows = []
+    for limit in LIMITS:
+        for name, path in (("model", model_path), ("lean", lean_path)):
+            rows.append([limit, name, *measure(path, limit, args.iterations)])
+
+    print_table(["limit", "path", "mean ms", "p95 ms", "peak KiB"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Post ingest rate of the per-post ORM path against batched writes.
+
+The ORM path writes each post and its feed entry in their own transaction, like
+the live indexer. Batched writes use `write_posts`, which streams batches with
+`COPY` on Postgres and falls back to `bulk_create` on SQLite. Runs against a
+throwaway test database of the configured type.
+
+Usage:
+    python -m benchmarks.ingest [--posts 20000]
+"""
+
+import argparse
+import time
+from datetime import UTC, datetime, timedelta
+
+from asgiref.sync import async_to_sync, sync_to_async
+
+from benchmarks.utils import print_table, setup_django
+
+BATCH_SIZES = (100, 1000, 5000)
+
+
+def build_posts(run: str, count: int) -> list:
+    from flatlanders.models.posts import Post
+
+    now = datetime.now(tz=UTC)
+    return [
+        Post(
+            uri=f"at://did:plc:bench{i % 97}/app.bsky.feed.post/{run}{i:010d}",
+            cid=f"bafyrei{i:052d}",
+            author_did=f"did:plc:bench{i % 97}",
+            text="Saskatchewan " * 25,
+            created_at=now - timedelta(seconds=i),
+            is_community_match=True,
+        )
+        for i in range(count)
+    ]
+
+
+def orm_ingest(posts: list, feed: str) -> None:
+    """Write posts one by one, as `Post.afrom_event` does."""
+
+    async def ingest():
+        for post in posts:
+            await sync_to_async(post._insert_with_feed_entries)([feed])
+
+    async_to_sync(ingest)()
+
+
+def batch_ingest(posts: list, feed: str, batch_size: int) -> None:
+    from flatlanders.ingest import write_posts
+
+    for start in range(0, len(posts), batch_size):
+        write_posts((post, [feed]) for post in posts[start : start + batch_size])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=20_000)
+    args = parser.parse_args()
+
+    setup_django(test_database=True)
+
+    from django.db import connection
+
+    from flatlanders.algorithms.flatlanders_feed import FlatlandersAlgorithm
+
+    feed = FlatlandersAlgorithm().name
+    scenarios = [("orm", lambda posts: orm_ingest(posts, feed))]
+    for batch_size in BATCH_SIZES:
+        scenarios.append(
+            (
+                f"batch {batch_size}",
+                lambda posts, size=batch_size: batch_ingest(posts, feed, size),
+            )
+        )
+
+    rows = []
+    for run, (name, ingest) in enumerate(scenarios):
+        posts = build_posts(f"r{run}", args.posts)
+        start = time.perf_counter()
+        ingest(posts)
+        elapsed = time.perf_counter() - start
+        rows.append([name, f"{args.posts / elapsed:.0f}", f"{elapsed:.2f}"])
+
+    print(f"database={connection.vendor} posts={args.posts}")
+    print_table(["path", "posts/s", "seconds"], rows)
+
+
+if __name__ == "__main__":
+    main()
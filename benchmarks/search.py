@@ -0,0 +1,70 @@
+"""Latency of post text search with `icontains` against the full-text index.
+
+Runs against the configured database, so seed it first, e.g.
+`python manage.py seed_posts --count 1000000`.
+
+Usage:
+    python -m benchmarks.search [--iterations 20] [--limit 25]
+"""
+
+import argparse
+import time
+
+from benchmarks.utils import percentile, print_table, setup_django
+
+QUERIES = ("hockey", "canola harvest", "saskatoon", "bridge", "sunset prairie")
+
+
+def timed(run, iterations: int) -> list[float]:
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        run()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=25)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.db import connection
+
+    from flatlanders.models.posts import Post
+    from flatlanders.search import search_posts
+
+    paths = {
+        "icontains": lambda query: Post.objects.filter(text__icontains=query),
+        "full-text": search_posts,
+    }
+
+    rows = []
+    for query in QUERIES:
+        for name, search in paths.items():
+            queryset = search(query).order_by("-created_at", "-id")
+            latencies = timed(
+                # A new slice each call, evaluated querysets cache their results
+                lambda queryset=queryset: list(
+                    queryset.values_list("uri", flat=True)[: args.limit]
+                ),
+                args.iterations,
+            )
+            rows.append(
+                [
+                    query,
+                    name,
+                    f"{percentile(latencies, 50):.2f}",
+                    f"{percentile(latencies, 95):.2f}",
+                ]
+            )
+
+    print(f"database={connection.vendor} posts={Post.objects.count()}")
+    print_table(["query", "path", "p50 ms", "p95 ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
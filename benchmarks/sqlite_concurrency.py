@@ -0,0 +1,168 @@
+"""Concurrent feed reads during ingest on SQLite, with and without the WAL profile.
+
+Each profile runs in its own process against a fresh database file: a writer
+process ingests batches of posts with `write_posts`, as the indexer does, while
+reader threads request the first page of the feed.
+
+Usage:
+    python -m benchmarks.sqlite_concurrency [--readers 8] [--duration 10]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.utils import percentile, print_table, setup_django
+
+PROFILES = {"default": "FALSE", "wal": "TRUE"}
+
+
+def build_batch(run: str, start: int, count: int) -> list:
+    from datetime import UTC, datetime
+
+    from flatlanders.models.posts import Post
+
+    now = datetime.now(tz=UTC)
+    return [
+        Post(
+            uri=f"at://did:plc:bench{i % 97}/app.bsky.feed.post/{run}{i:010d}",
+            cid=f"bafyrei{i:052d}",
+            author_did=f"did:plc:bench{i % 97}",
+            text="Saskatchewan " * 25,
+            created_at=now,
+            is_community_match=True,
+        )
+        for i in range(start, start + count)
+    ]
+
+
+def run_profile(args) -> dict:
+    """Run the writer and the readers of a single profile in this process."""
+    setup_django()
+
+    from django.core.management import call_command
+    from django.db import connection
+
+    from flatlanders.algorithms.flatlanders_feed import FlatlandersAlgorithm
+    from flatlanders.ingest import write_posts
+
+    algorithm = FlatlandersAlgorithm()
+    call_command("migrate", verbosity=0)
+    write_posts((post, [algorithm.name]) for post in build_batch("seed", 0, 10_000))
+    connection.close()
+
+    context = multiprocessing.get_context("fork")
+    stop = context.Event()
+    written = context.Value("i", 0)
+
+    def writer() -> None:
+        start = 0
+        while not stop.is_set():
+            batch = build_batch("ingest", start, args.batch_size)
+            inserted = write_posts((post, [algorithm.name]) for post in batch)
+            with written.get_lock():
+                written.value += inserted
+            start += args.batch_size
+
+    def reader(_) -> tuple[list[float], int]:
+        latencies, errors = [], 0
+        try:
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    algorithm.get_feed(cursor=None, limit=30)
+                except Exception:
+                    errors += 1
+                latencies.append((time.perf_counter() - start) * 1000)
+        finally:
+            connection.close()
+        return latencies, errors
+
+    writer_process = context.Process(target=writer)
+    writer_process.start()
+    with ThreadPoolExecutor(max_workers=args.readers) as pool:
+        results = pool.map(reader, range(args.readers))
+        time.sleep(args.duration)
+        stop.set()
+        results = list(results)
+    writer_process.join()
+
+    latencies = [
+        latency for thread_latencies, _ in results for latency in thread_latencies
+    ]
+    return {
+        "reads": len(latencies) / args.duration,
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+        "errors": sum(errors for _, errors in results),
+        "writes": written.value / args.duration,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--duration", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--profile", choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        print(json.dumps(run_profile(args)))
+        return
+
+    rows = []
+    for profile, wal in PROFILES.items():
+        with tempfile.TemporaryDirectory() as directory:
+            env = {
+                **os.environ,
+                "FEEDGEN_DB_TYPE": "sqlite",
+                "FEEDGEN_SQLITE_PATH": os.path.join(directory, "db.sqlite3"),
+                "FEEDGEN_SQLITE_WAL": wal,
+            }
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.sqlite_concurrency",
+                    "--profile",
+                    profile,
+                    "--readers",
+                    str(args.readers),
+                    "--duration",
+                    str(args.duration),
+                    "--batch-size",
+                    str(args.batch_size),
+                ],
+                env=env,
+                capture_output=True,
+                check=True,
+                text=True,
+            ).stdout
+        result = json.loads(output.splitlines()[-1])
+        rows.append(
+            [
+                profile,
+                f"{result['reads']:.0f}",
+                f"{result['p50']:.2f}",
+                f"{result['p99']:.2f}",
+                result["errors"],
+                f"{result['writes']:.0f}",
+            ]
+        )
+
+    print(f"readers={args.readers} duration={args.duration}s")
+    print_table(
+        ["profile", "reads/s", "read p50 ms", "read p99 ms", "read errors", "posts/s"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
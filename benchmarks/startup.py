@@ -0,0 +1,107 @@
+"""Startup time of the indexer, the labeler and the server workers.
+
+Every entry point is imported in a fresh interpreter, as the process would at
+startup: Django is set up and the module of the management command, or the ASGI
+application of a gunicorn worker, is imported. The report shows the median wall
+time over several runs and, from `python -X importtime`, the packages taking the
+most time to import. No network access is needed: clients log in on first use.
+
+Usage:
+    python -m benchmarks.startup [--runs 5] [--top 8] [--max-seconds 1.5]
+
+With `--max-seconds`, the script exits with an error when an entry point takes
+longer to start, so that it can guard startup time in CI.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.utils import print_table
+
+ENTRY_POINTS = {
+    "start_feed": "firehose.management.commands.start_feed",
+    "start_labeler": "flatlanders.management.commands.start_labeler",
+    "gunicorn worker": "sk_atp_feed.asgi",
+}
+
+# Run from the project root, like the management commands
+ENV = {
+    **os.environ,
+    "DJANGO_SETTINGS_MODULE": "sk_atp_feed.settings",
+    "PYTHONPATH": os.getcwd(),
+}
+
+
+def import_command(module: str) -> list[str]:
+    return [
+        sys.executable,
+        "-c",
+        f"import django; django.setup(); import {module}",
+    ]
+
+
+def wall_time(module: str) -> float:
+    """Seconds taken by a fresh interpreter to import an entry point."""
+    start = time.perf_counter()
+    subprocess.run(
+        import_command(module), env=ENV, check=True, capture_output=True, text=True
+    )
+    return time.perf_counter() - start
+
+
+def slowest_packages(module: str, top: int) -> list[tuple[str, float]]:
+    """The packages imported by an entry point taking the most time, in seconds."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", *import_command(module)[1:]],
+        env=ENV,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    packages: dict[str, float] = {}
+    for line in stderr.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        # The outermost import of a package includes the time of its submodules
+        package = fields[2].strip().split(".")[0]
+        seconds = int(fields[1]) / 1_000_000
+        packages[package] = max(packages.get(package, 0), seconds)
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8)
+    parser.add_argument("--max-seconds", type=float)
+    args = parser.parse_args()
+
+    rows, over_budget = [], []
+    for name, module in ENTRY_POINTS.items():
+        seconds = statistics.median(wall_time(module) for _ in range(args.runs))
+        rows.append([name, module, f"{seconds:.3f}"])
+        if args.max_seconds is not None and seconds > args.max_seconds:
+            over_budget.append(name)
+
+        print(f"{name}: slowest packages")
+        packages = slowest_packages(module, args.top)
+        print_table(
+            ["package", "seconds"],
+            [[package, f"{cumulative:.3f}"] for package, cumulative in packages],
+        )
+        print()
+
+    print(f"runs={args.runs}")
+    print_table(["entry point", "module", "median s"], rows)
+
+    if over_budget:
+        sys.exit(f"Startup slower than {args.max_seconds}s: {', '.join(over_budget)}")
+
+
+if __name__ == "__main__":
+    main()
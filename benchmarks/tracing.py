@@ -0,0 +1,115 @@
+"""Overhead of Sentry tracing on the hot path of the indexer.
+
+Decodes a Jetstream post event in a loop, the cheapest step of processing an
+event, traced by `TRACER` under several Sentry configurations: tracing disabled,
+the adaptive sampling of the indexer, and tracing, then also profiling, every
+event as the indexer used to. Events are sent to a transport dropping them, so
+no network access is needed and only the cost of the SDK is measured.
+
+Usage:
+    python -m benchmarks.tracing [--events 20000]
+"""
+
+import argparse
+import json
+import time
+
+import sentry_sdk
+from sentry_sdk.transport import Transport
+
+from benchmarks.utils import print_table
+from common.sentry import TRACER, init_sentry
+from firehose.settings import (
+    INDEXER_SENTRY_MAX_TRACES_PER_SECOND,
+    INDEXER_SENTRY_SLOW_EVENT_SECONDS,
+    INDEXER_SENTRY_TRACES_SAMPLE_RATE,
+)
+
+EVENT = json.dumps(
+    {
+        "did": "did:plc:benchmark",
+        "time_us": 1_700_000_000_000_000,
+        "kind": "commit",
+        "commit": {
+            "rev": "3l3qo2vutsw2b",
+            "operation": "create",
+            "collection": "app.bsky.feed.post",
+            "rkey": "3l3qo2vuowo2b",
+            "record": {
+                "$type": "app.bsky.feed.post",
+                "createdAt": "2024-09-09T19:46:02.102Z",
+                "langs": ["en"],
+                "text": "Saskatchewan " * 20,
+            },
+            "cid": "bafyreidwaivazkwu67xztlmuobx35hs2lnfh3kolmgfmucldvhd3sgzcqi",
+        },
+    }
+)
+
+# name -> (traces sample rate, max traces per second, profiles sample rate)
+CONFIGURATIONS = {
+    "adaptive": (
+        INDEXER_SENTRY_TRACES_SAMPLE_RATE,
+        INDEXER_SENTRY_MAX_TRACES_PER_SECOND,
+        0,
+    ),
+    "every event": (1.0, 0, 0),
+    "every event, profiled": (1.0, 0, 1.0),
+}
+
+
+class DropTransport(Transport):
+    """Counts the envelopes sent to Sentry and drops them."""
+
+    sent = 0
+
+    def capture_envelope(self, envelope) -> None:
+        DropTransport.sent += 1
+
+
+def run(events: int) -> float:
+    """Microseconds taken to decode an event under `TRACER`."""
+    start = time.perf_counter()
+    for _ in range(events):
+        with TRACER.trace("jetstream.event", "app.bsky.feed.post"):
+            json.loads(EVENT)
+    return (time.perf_counter() - start) / events * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=20000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    for _ in range(args.events):
+        json.loads(EVENT)
+    baseline = (time.perf_counter() - start) / args.events * 1_000_000
+
+    rows = [["untraced", f"{baseline:.2f}", "", ""]]
+    disabled = run(args.events)
+    rows.append(["sentry disabled", f"{disabled:.2f}", f"{disabled - baseline:.2f}", 0])
+
+    for name, (rate, per_second, profiles) in CONFIGURATIONS.items():
+        init_sentry(
+            "https://public@127.0.0.1/1",
+            rate,
+            per_second,
+            profiles,
+            INDEXER_SENTRY_SLOW_EVENT_SECONDS,
+            transport=DropTransport,
+        )
+        DropTransport.sent = 0
+        micros = run(args.events)
+        sentry_sdk.flush()
+        rows.append(
+            [name, f"{micros:.2f}", f"{micros - baseline:.2f}", DropTransport.sent]
+        )
+        TRACER.disable()
+
+    print(f"events={args.events}")
+    print_table(["configuration", "µs/event", "overhead µs", "envelopes"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Helpers shared by the benchmark scripts."""
+
+import logging
+import os
+import statistics
+
+import django
+
+
+def setup_django(test_database: bool = False) -> None:
+    """Configure Django for a standalone benchmark script.
+
+    Args:
+        test_database (bool): Create a throwaway, migrated test database instead of
+            using the configured one.
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sk_atp_feed.settings")
+    django.setup()
+
+    # Per-request debug logging would dominate the measurements
+    logging.disable(logging.INFO)
+
+    if test_database:
+        from django.db import connection
+
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Return the `pct` percentile of a list of samples."""
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[int(pct) - 1]
+
+
+def print_table(headers: list[str], rows: list[list]) -> None:
+    """Print rows as a plain text table."""
+    widths = [
+        max(len(str(value)) for value in [header, *(row[i] for row in rows)])
+        for i, header in enumerate(headers)
+    ]
+    print(
+        "  ".join(
+            header.ljust(width) for header, width in zip(headers, widths, strict=True)
+        )
+    )
+    for row in rows:
+        print(
+            "  ".join(
+                str(value).ljust(width)
+                for value, width in zip(row, widths, strict=True)
+            )
+        )
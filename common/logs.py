@@ -0,0 +1,252 @@
+"""Logging that never slows down the event loop.
+
+- `configure` is the `LOGGING_CONFIG` of the project. It applies the `LOGGING`
+  config, then hands the records of every configured logger to a
+  `BackgroundHandler`, which writes them to the console and the log files from a
+  background thread.
+- `JsonFormatter` formats records as one JSON object per line.
+- `RateLimitedLog` limits the messages logged for every event on a hot path, and
+  logs how many it skipped once in a while.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.config
+import os
+import queue
+import threading
+import time
+import weakref
+from collections.abc import Callable
+from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
+
+# Records waiting to be written, records logged past it are dropped
+QUEUE_SIZE = 10_000
+
+# Messages of a kind logged by a `RateLimitedLog` in every interval, in seconds
+RATE_LIMIT = 10
+RATE_INTERVAL = 60.0
+
+_exception_formatter = logging.Formatter()
+_background_handlers: "weakref.WeakSet[BackgroundHandler]" = weakref.WeakSet()
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # Wait for room in the queue, the records before the sentinel are written
+        self.queue.put(self._sentinel)
+
+
+class BackgroundHandler(QueueHandler):
+    """Queues records for a thread that writes them to `handlers`.
+
+    Logging only formats the message and queues the record. When the queue is
+    full, records are dropped rather than blocking the caller, and the number
+    dropped is logged once the queue has room again.
+
+    Args:
+        handlers (list[logging.Handler]): The handlers writing the records.
+        maxsize (int): Maximum number of records waiting to be written.
+    """
+
+    def __init__(self, handlers: list[logging.Handler], maxsize: int = QUEUE_SIZE):
+        super().__init__(queue.Queue(maxsize))
+        self.handlers = handlers
+        self.dropped = 0
+        self.start()
+        _background_handlers.add(self)
+
+    def start(self) -> None:
+        """Start the thread writing the records."""
+        self.listener = _Listener(
+            self.queue, *self.handlers, respect_handler_level=True
+        )
+        self.listener.start()
+
+    def stop(self) -> None:
+        """Write the records left in the queue and stop the thread."""
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render the message now, its arguments may change once the call returns,
+        # and the traceback, which references every frame of the stack
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if self.dropped:
+                self.queue.put_nowait(self._dropped_record(record))
+                self.dropped = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        self.stop()
+        super().close()
+
+    def _after_fork(self) -> None:
+        # Threads do not survive a fork, and the queue may have been locked by the
+        # thread of the parent process
+        self.queue = queue.Queue(self.queue.maxsize)
+        self.start()
+
+    def _dropped_record(self, record: logging.LogRecord) -> logging.LogRecord:
+        return logging.makeLogRecord(
+            {
+                "name": record.name,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": f"Dropped {self.dropped} log records, the log queue was full",
+            }
+        )
+
+
+def _restart_background_handlers() -> None:
+    for handler in list(_background_handlers):
+        handler._after_fork()
+
+
+def _stop_background_handlers() -> None:
+    for handler in list(_background_handlers):
+        handler.stop()
+
+
+os.register_at_fork(after_in_child=_restart_background_handlers)
+atexit.register(_stop_background_handlers)
+
+
+def configure(config: dict[str, Any]) -> None:
+    """Apply a `dictConfig` config, writing the records from background threads.
+
+    The handlers of the root logger and of the loggers in the config are replaced
+    by a `BackgroundHandler` writing to them. Loggers with the same handlers share
+    the same background handler.
+
+    Args:
+        config (dict[str, Any]): The config, in the `dictConfig` format.
+    """
+    logging.config.dictConfig(config)
+
+    background: dict[tuple[int, ...], BackgroundHandler] = {}
+    for name in [None, *config.get("loggers", {})]:
+        logger = logging.getLogger(name)
+        handlers = [h for h in logger.handlers if not isinstance(h, QueueHandler)]
+        if not handlers:
+            continue
+        key = tuple(id(handler) for handler in handlers)
+        if key not in background:
+            background[key] = BackgroundHandler(handlers)
+        logger.handlers = [background[key]]
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as JSON objects, with the `extra` fields of the record."""
+
+    # Attributes of every record, the others were passed with `extra`
+    RESERVED = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(
+            (key, value)
+            for key, value in vars(record).items()
+            if key not in self.RESERVED
+        )
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class RateLimitedLog:
+    """Logs at most `limit` messages of each kind every `interval` seconds.
+
+    Messages over the limit are only counted. When the interval is over, the next
+    message logs how many messages of each kind were skipped.
+
+    Args:
+        logger (logging.Logger): The logger to log to.
+        limit (int): Messages of each kind logged every interval.
+        interval (float): Length of the interval, in seconds.
+        clock (Callable[[], float]): Source of the time, in seconds.
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        limit: int = RATE_LIMIT,
+        interval: float = RATE_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.logger = logger
+        self.limit = limit
+        self.interval = interval
+        self._clock = clock
+        self._interval_end = clock() + interval
+        # kind -> (level, messages logged or skipped in the interval)
+        self._counts: dict[str, tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def log(self, level: int, kind: str, msg: str, *args: Any, **kwargs: Any) -> None:
+        """Log a message, unless `limit` messages of its kind were already logged.
+
+        Args:
+            level (int): The level of the message.
+            kind (str): The kind of message the limit applies to.
+            msg (str): The message, formatted with `args` when it is logged.
+        """
+        if not self.logger.isEnabledFor(level):
+            return
+        with self._lock:
+            now = self._clock()
+            if now >= self._interval_end:
+                self._summarize(now)
+            _, count = self._counts.get(kind, (level, 0))
+            self._counts[kind] = (level, count + 1)
+        if count < self.limit:
+            self.logger.log(level, msg, *args, **kwargs)
+
+    def info(self, kind: str, msg: str, *args: Any, **kwargs: Any) -> None:
+        self.log(logging.INFO, kind, msg, *args, **kwargs)
+
+    def warning(self, kind: str, msg: str, *args: Any, **kwargs: Any) -> None:
+        self.log(logging.WARNING, kind, msg, *args, **kwargs)
+
+    def error(self, kind: str, msg: str, *args: Any, **kwargs: Any) -> None:
+        self.log(logging.ERROR, kind, msg, *args, **kwargs)
+
+    def _summarize(self, now: float) -> None:
+        for kind, (level, count) in self._counts.items():
+            if count > self.limit:
+                self.logger.log(
+                    level,
+                    "Skipped %d of %d %s messages in the last %.0fs",
+                    count - self.limit,
+                    count,
+                    kind,
+                    self.interval,
+                    extra={"kind": kind, "count": count, "skipped": count - self.limit},
+                )
+        self._counts.clear()
+        self._interval_end = now + self.interval
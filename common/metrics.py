@@ -0,0 +1,304 @@
+"""In-process metrics, exported in the Prometheus text format.
+
+Metrics are plain Python numbers updated from the event loop of the process, so
+recording one costs a dictionary lookup and an addition. They are registered in
+`REGISTRY` by the modules updating them, and served over HTTP by `MetricsServer`
+on `/metrics`.
+"""
+
+import asyncio
+import bisect
+import logging
+import math
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from http import HTTPStatus
+
+logger = logging.getLogger("feed")
+
+# Upper bounds of the buckets of latency histograms, in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+# Upper bounds of the buckets of batch size histograms
+SIZE_BUCKETS = (1, 10, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+Labels = tuple[str, ...]
+
+
+def _format_labels(names: Labels, values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base class of metrics, with one value per combination of label values."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Labels = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = labels
+
+    def samples(self) -> Iterator[str]:
+        """Yields the sample lines of the metric."""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """Returns the metric in the Prometheus text format."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+            *self.samples(),
+        ]
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing count, e.g. of events received."""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Labels = ()) -> None:
+        super().__init__(name, documentation, labels)
+        self._values: dict[Labels, float] = {} if labels else {(): 0}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """Increments the count of the given label values."""
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        """Returns the count of the given label values."""
+        return self._values.get(labels, 0)
+
+    def samples(self) -> Iterator[str]:
+        for labels, value in sorted(self._values.items()):
+            yield (
+                f"{self.name}{_format_labels(self.label_names, labels)} "
+                f"{_format_value(value)}"
+            )
+
+
+class Gauge(Metric):
+    """Value that goes up and down, set directly or read from a callback."""
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Labels = (),
+        callback: Callable[[], float | dict[Labels, float] | None] | None = None,
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self._values: dict[Labels, float] = {}
+        self.callback = callback
+
+    def set(self, value: float, *labels: str) -> None:
+        """Sets the value of the given label values."""
+        self._values[labels] = value
+
+    def value(self, *labels: str) -> float | None:
+        """Returns the value of the given label values."""
+        return self._values.get(labels)
+
+    def samples(self) -> Iterator[str]:
+        values = self._values
+        if self.callback is not None:
+            try:
+                result = self.callback()
+            except Exception as error:
+                logger.debug("Error reading gauge %s: %s", self.name, error)
+                result = None
+            if result is None:
+                return
+            values = result if isinstance(result, dict) else {(): result}
+        for labels, value in sorted(values.items()):
+            yield (
+                f"{self.name}{_format_labels(self.label_names, labels)} "
+                f"{_format_value(value)}"
+            )
+
+
+class Histogram(Metric):
+    """Distribution of observed values, counted in cumulative buckets."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Labels = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> (count per bucket, with +Inf last, sum)
+        self._values: dict[Labels, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Records an observed value for the given label values."""
+        counts, total = self._values.get(labels) or self._values.setdefault(
+            labels, ([0] * (len(self.buckets) + 1), [0.0])
+        )
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        """Observes the duration of the enclosed block, in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def count(self, *labels: str) -> int:
+        """Returns the number of values observed for the given label values."""
+        counts, _ = self._values.get(labels, ([0], [0.0]))
+        return sum(counts)
+
+    def samples(self) -> Iterator[str]:
+        for labels, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts, strict=True):
+                cumulative += count
+                bucket_labels = _format_labels(
+                    self.label_names, labels, f'le="{_format_value(bound)}"'
+                )
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            label_text = _format_labels(self.label_names, labels)
+            yield f"{self.name}_sum{label_text} {_format_value(total[0])}"
+            yield f"{self.name}_count{label_text} {cumulative}"
+
+
+class Registry:
+    """Collection of the metrics of a process."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """Adds a metric, or returns the metric already registered with its name."""
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labels: Labels = ()) -> Counter:
+        """Returns the counter registered with a name, creating it if needed."""
+        return self.register(Counter(name, documentation, labels))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labels: Labels = (),
+        callback: Callable[[], float | dict[Labels, float] | None] | None = None,
+    ) -> Gauge:
+        """Returns the gauge registered with a name, creating it if needed."""
+        return self.register(Gauge(name, documentation, labels, callback))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Labels = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        """Returns the histogram registered with a name, creating it if needed."""
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def render(self) -> str:
+        """Returns every metric in the Prometheus text format."""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class MetricsServer:
+    """Minimal HTTP server exporting the metrics of the process.
+
+    Serves `GET /metrics` from the event loop of the process, so that reading the
+    metrics never races with their updates.
+
+    Args:
+        host (str): Interface to listen on.
+        port (int): Port to listen on.
+        registry (Registry): The metrics to export.
+    """
+
+    def __init__(self, host: str, port: int, registry: Registry = REGISTRY) -> None:
+        self.host = host
+        self.port = port
+        self.registry = registry
+        # path -> handler returning the status, content type and body of a response
+        self.routes: dict[str, Callable[[], tuple[int, str, str]]] = {
+            "/metrics": self.metrics,
+        }
+        self._server: asyncio.Server | None = None
+
+    def metrics(self) -> tuple[int, str, str]:
+        return 200, "text/plain; version=0.0.4; charset=utf-8", self.registry.render()
+
+    async def start(self) -> None:
+        """Task that serves the metrics until it is cancelled."""
+        try:
+            self._server = await asyncio.start_server(
+                self._handle, self.host, self.port
+            )
+        except OSError as error:
+            # Keep indexing without metrics rather than stopping the indexer
+            logger.error(
+                "Failed to serve metrics on %s:%d: %s", self.host, self.port, error
+            )
+            return
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("Serving metrics on http://%s:%d/metrics", self.host, self.port)
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            request_line = await reader.readline()
+            # Skip the request headers
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            method, _, rest = request_line.decode("latin-1").partition(" ")
+            path = rest.split(" ", 1)[0].split("?", 1)[0]
+
+            handler = self.routes.get(path)
+            if method != "GET":
+                status, content_type, body = 405, "text/plain", "Method not allowed\n"
+            elif handler is None:
+                status, content_type, body = 404, "text/plain", "Not found\n"
+            else:
+                status, content_type, body = handler()
+
+            payload = body.encode()
+            writer.write(
+                f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                "Connection: close\r\n\r\n".encode()
+                + payload
+            )
+            await writer.drain()
+        except (ConnectionError, UnicodeDecodeError) as error:
+            logger.debug("Error serving metrics: %s", error)
+        finally:
+            writer.close()
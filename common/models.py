@@ -6,8 +6,15 @@ from datetime import UTC, datetime
 from enum import StrEnum
 from typing import Any
 
+from asgiref.sync import sync_to_async
+
+from common.logs import RateLimitedLog
+
 logger = logging.getLogger("feed")
 
+# A burst of failing events is logged a few times a minute, by type of error
+error_log = RateLimitedLog(logger)
+
 
 class JetstreamEventKinds(StrEnum):
     """Kinds of Jetstream events."""
@@ -122,6 +129,15 @@ class JetstreamEventWrapper:
             )
         return None
 
+    @property
+    def subject_uri(self) -> str | None:
+        """Returns the URI of the record a like or repost refers to."""
+        if self.kind == JetstreamEventKinds.COMMIT:
+            subject = self._event["commit"].get("record", {}).get("subject")
+            if isinstance(subject, dict):
+                return subject.get("uri")
+        return None
+
     def __str__(self) -> str:
         return f"{self.timestamp}-{self.author}-{self.kind}-{self.operation}"
 
@@ -151,9 +167,21 @@ class FeedAlgorithm(abc.ABC):
 
     def on_process_event_error(self, error: Exception) -> None:
         """Handles an error in the feed algorithm"""
-        logger.error("Error processing event: %s", error)
+        error_log.error(
+            type(error).__name__,
+            "Error processing event: %s",
+            error,
+            extra={"error": type(error).__name__},
+        )
 
     @abc.abstractmethod
     def get_feed(self, cursor: str | None, limit: int) -> dict[str, Any]:
         """Returns a feed of post skeletons (very spooky)"""
         pass
+
+    async def aget_feed(self, cursor: str | None, limit: int) -> dict[str, Any]:
+        """Asynchronous version of `get_feed`.
+
+        Runs `get_feed` in a worker thread unless overridden with native async queries.
+        """
+        return await sync_to_async(self.get_feed)(cursor=cursor, limit=limit)
@@ -0,0 +1,211 @@
+"""On-demand profiling of a running process.
+
+`OnDemandProfiler.install` makes `PROFILE_SIGNAL` start a time-bounded profile of
+the process: a `cProfile` profile of the main thread, which runs the event loop of
+the indexer and of the server workers, and a `tracemalloc` snapshot of the memory
+allocated while it runs. Nothing is traced until the signal is received. Once the
+time is up, or on a second signal, the results are written to:
+
+- `<stem>.prof`: load it with `python -m pstats`, snakeviz or any pstats viewer.
+- `<stem>.tracemalloc`: load it with `tracemalloc.Snapshot.load`.
+
+`request_profile`, used by the `profile_process` command, sends the signal along
+with the duration of the profile and where to write it. It only signals processes
+that advertise an installed profiler with a `ready-<pid>` marker in the profile
+directory: the default action of the signal terminates a process, and it makes a
+gunicorn master start a new binary.
+"""
+
+import atexit
+import cProfile
+import json
+import logging
+import os
+import pstats
+import signal
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from types import FrameType
+
+logger = logging.getLogger("feed")
+
+# SIGUSR1 reopens the log files of gunicorn workers
+PROFILE_SIGNAL = signal.SIGUSR2
+
+# Frames recorded per allocation, for the tracebacks of the memory snapshot
+TRACEMALLOC_FRAMES = 10
+
+
+class ProfilerNotInstalledError(Exception):
+    """Raised when asking a process without a profiler to profile itself."""
+
+
+def _request_path(directory: Path, pid: int) -> Path:
+    return directory / f"request-{pid}.json"
+
+
+def _ready_path(directory: Path, pid: int) -> Path:
+    return directory / f"ready-{pid}"
+
+
+def request_profile(pid: int, directory: Path, seconds: float) -> Path:
+    """Ask a process to profile itself.
+
+    Args:
+        pid (int): The process, which must have installed an `OnDemandProfiler`
+            writing to the same directory.
+        directory (Path): Directory the profiler of the process writes to.
+        seconds (float): Duration of the profile.
+
+    Returns:
+        Path: The stem of the files the profile will be written to.
+
+    Raises:
+        ProfilerNotInstalledError: If the process did not install a profiler
+            writing to the directory.
+    """
+    if not _ready_path(directory, pid).exists():
+        raise ProfilerNotInstalledError(
+            f"Process {pid} has not installed a profiler writing to {directory}"
+        )
+    stem = directory / f"{pid}-{time.strftime('%Y%m%d-%H%M%S')}"
+    _request_path(directory, pid).write_text(
+        json.dumps({"seconds": seconds, "stem": str(stem)})
+    )
+    os.kill(pid, PROFILE_SIGNAL)
+    return stem
+
+
+class OnDemandProfiler:
+    """Profiles the process for a while when it receives `PROFILE_SIGNAL`.
+
+    Args:
+        name (str): Name of the process, prefixed to the files written.
+        directory (Path): Directory the profiles are written to.
+        seconds (float): Default duration of a profile.
+    """
+
+    def __init__(self, name: str, directory: Path, seconds: float) -> None:
+        self.name = name
+        self.directory = Path(directory)
+        self.seconds = seconds
+        self._profile: cProfile.Profile | None = None
+        self._stem: Path | None = None
+        self._timer: threading.Timer | None = None
+        self._started_tracemalloc = False
+
+    @property
+    def running(self) -> bool:
+        return self._profile is not None
+
+    def install(self) -> None:
+        """Start and stop profiles on `PROFILE_SIGNAL`, from the main thread.
+
+        The `ready-<pid>` marker that `request_profile` looks for is written once
+        the handler is installed, and removed when the process exits.
+        """
+        signal.signal(PROFILE_SIGNAL, self._handle_signal)
+        ready = _ready_path(self.directory, os.getpid())
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            ready.touch()
+        except OSError as error:
+            logger.warning(
+                "Profiles cannot be requested, failed to write %s: %s", ready, error
+            )
+            return
+        atexit.register(ready.unlink, missing_ok=True)
+
+    def start(self, seconds: float | None = None, stem: Path | None = None) -> None:
+        """Start profiling the current thread, and tracing memory allocations.
+
+        Args:
+            seconds (float | None): Duration of the profile, the default if None.
+            stem (Path | None): Path of the files written, without their suffix.
+        """
+        if self._profile is not None:
+            return
+        seconds = seconds or self.seconds
+        self._stem = stem or self.directory / (
+            f"{self.name}-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}"
+        )
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._started_tracemalloc = True
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+        # The profile must be disabled from the thread it profiles, the signal
+        # handler runs on the main thread
+        main_thread = threading.main_thread().ident
+        self._timer = threading.Timer(
+            seconds, signal.pthread_kill, (main_thread, PROFILE_SIGNAL)
+        )
+        self._timer.daemon = True
+        self._timer.start()
+        logger.info("Profiling %s for %.0fs", self.name, seconds)
+
+    def stop(self) -> tuple[Path, Path] | None:
+        """Stop profiling and write the results.
+
+        Returns:
+            tuple[Path, Path] | None: The cProfile stats and the memory snapshot
+                written, or None if no profile was running.
+        """
+        if self._profile is None or self._stem is None:
+            return None
+        self._profile.disable()
+        if self._timer is not None:
+            self._timer.cancel()
+        snapshot = tracemalloc.take_snapshot()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        profile, stem = self._profile, self._stem
+        self._profile = self._stem = self._timer = None
+
+        stats_path = stem.with_suffix(".prof")
+        snapshot_path = stem.with_suffix(".tracemalloc")
+        try:
+            stem.parent.mkdir(parents=True, exist_ok=True)
+            snapshot.dump(str(snapshot_path))
+            # Written last and renamed, so that the profile is complete once the
+            # stats exist
+            partial_path = stem.with_suffix(".prof.partial")
+            profile.dump_stats(partial_path)
+            os.replace(partial_path, stats_path)
+        except OSError as error:
+            logger.error("Failed to write the profile to %s: %s", stem, error)
+            return None
+
+        stats = pstats.Stats(profile).sort_stats(pstats.SortKey.CUMULATIVE)
+        slowest = [
+            f"{pstats.func_std_string(func)}: {stats.stats[func][3]:.3f}s"
+            for func in stats.fcn_list[:5]
+        ]
+        allocated = [str(stat) for stat in snapshot.statistics("lineno")[:5]]
+        logger.info(
+            "Wrote profile to %s and %s\nSlowest calls:\n  %s\nTop allocations:\n  %s",
+            stats_path,
+            snapshot_path,
+            "\n  ".join(slowest),
+            "\n  ".join(allocated),
+        )
+        return stats_path, snapshot_path
+
+    def _handle_signal(self, signum: int, frame: FrameType | None) -> None:
+        if self._profile is not None:
+            self.stop()
+            return
+
+        # Use the duration and the files requested by `request_profile`, if any
+        request = _request_path(self.directory, os.getpid())
+        try:
+            options = json.loads(request.read_text())
+            request.unlink()
+        except (OSError, ValueError):
+            options = {}
+        stem = options.get("stem")
+        self.start(options.get("seconds"), Path(stem) if stem else None)
@@ -0,0 +1,176 @@
+"""Sentry error tracking, with adaptive sampling of traces.
+
+Errors are always reported, but tracing every transaction would add its overhead
+to every request and every Jetstream event. Transactions are instead sampled at a
+configurable rate, and at most `max_per_second` of them are kept each second, so
+that the effective rate drops as throughput grows. On the hot path of the indexer,
+`TRACER` only starts a transaction for the events sampled, and reports the events
+taking longer than a threshold after the fact.
+
+The SDK is only imported by `init_sentry`, importing it slows down every process
+start.
+"""
+
+import random
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+
+class AdaptiveSampler:
+    """Samples a fraction of transactions, keeping at most `max_per_second` a second.
+
+    Instances are used as the `traces_sampler` of the SDK.
+
+    Args:
+        rate (float): Fraction of transactions sampled, between 0 and 1.
+        max_per_second (int): Maximum number of transactions sampled each second,
+            0 for no limit.
+        clock (Callable[[], float]): Source of the time, in seconds.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        max_per_second: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rate = rate
+        self.max_per_second = max_per_second
+        self._clock = clock
+        self._second = 0
+        self._sampled = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, sampling_context: dict[str, Any]) -> float:
+        # Do not record parts of traces the caller decided not to sample
+        if sampling_context.get("parent_sampled") is False:
+            return 0.0
+        return 1.0 if self.should_sample() else 0.0
+
+    def should_sample(self) -> bool:
+        """Returns True if the next transaction must be sampled."""
+        if self.rate <= 0 or (self.rate < 1 and random.random() >= self.rate):
+            return False
+        return self.acquire()
+
+    def acquire(self) -> bool:
+        """Takes a transaction from the budget of the current second, if any is left."""
+        if self.max_per_second <= 0:
+            return True
+        with self._lock:
+            second = int(self._clock())
+            if second != self._second:
+                self._second = second
+                self._sampled = 0
+            if self._sampled >= self.max_per_second:
+                return False
+            self._sampled += 1
+            return True
+
+
+class EventTracer:
+    """Traces events on the hot path, at no cost when they are not sampled.
+
+    Tracing is disabled until `configure` is called by `init_sentry`.
+    """
+
+    def __init__(self) -> None:
+        self.sampler: AdaptiveSampler | None = None
+        self.slow_seconds = 0.0
+        self._start_transaction: Callable[..., Any] | None = None
+
+    def configure(
+        self,
+        sampler: AdaptiveSampler,
+        slow_seconds: float,
+        start_transaction: Callable[..., Any],
+    ) -> None:
+        """Enables tracing.
+
+        Args:
+            sampler (AdaptiveSampler): Decides which events are traced.
+            slow_seconds (float): Events taking longer are reported even when they
+                are not sampled, 0 to only report sampled events.
+            start_transaction (Callable[..., Any]): `sentry_sdk.start_transaction`.
+        """
+        self.sampler = sampler
+        self.slow_seconds = slow_seconds
+        self._start_transaction = start_transaction
+
+    def disable(self) -> None:
+        """Stops tracing events."""
+        self.sampler = None
+        self._start_transaction = None
+
+    @contextmanager
+    def trace(self, op: str, name: str) -> Iterator[None]:
+        """Traces the enclosed block as a transaction if it is sampled or slow.
+
+        Args:
+            op (str): Kind of event, e.g. "jetstream.event".
+            name (str): Name of the transaction, e.g. the collection of the event.
+        """
+        sampler, start_transaction = self.sampler, self._start_transaction
+        if sampler is None or start_transaction is None:
+            yield
+            return
+
+        if sampler.should_sample():
+            with start_transaction(op=op, name=name, sampled=True):
+                yield
+            return
+
+        start_timestamp = time.time()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            slow = self.slow_seconds and duration >= self.slow_seconds
+            if slow and sampler.acquire():
+                # Report the slow event as a transaction without child spans
+                transaction = start_transaction(
+                    op=op, name=name, sampled=True, start_timestamp=start_timestamp
+                )
+                transaction.set_tag("slow", True)
+                transaction.finish(end_timestamp=start_timestamp + duration)
+
+
+TRACER = EventTracer()
+
+
+def init_sentry(
+    dsn: str,
+    traces_sample_rate: float,
+    max_traces_per_second: int,
+    profiles_sample_rate: float = 0.0,
+    slow_event_seconds: float = 0.0,
+    **options: Any,
+) -> None:
+    """Initializes the Sentry SDK and enables `TRACER`.
+
+    Args:
+        dsn (str): The Sentry DSN to report to.
+        traces_sample_rate (float): Fraction of transactions traced.
+        max_traces_per_second (int): Maximum number of transactions traced each
+            second, 0 for no limit.
+        profiles_sample_rate (float): Fraction of the traced transactions profiled.
+        slow_event_seconds (float): Duration from which hot path events are traced
+            even when they are not sampled, 0 to disable.
+        **options (Any): Other options of `sentry_sdk.init`.
+    """
+    import sentry_sdk
+
+    sampler = AdaptiveSampler(traces_sample_rate, max_traces_per_second)
+    sentry_sdk.init(
+        dsn=dsn,
+        # Every error is reported
+        sample_rate=1.0,
+        traces_sampler=sampler,
+        profiles_sample_rate=profiles_sample_rate,
+        **options,
+    )
+    TRACER.configure(sampler, slow_event_seconds, sentry_sdk.start_transaction)
@@ -2,13 +2,17 @@ import asyncio
 import json
 import logging
 import random
-from typing import Any, Callable, Coroutine
+import time
+from collections.abc import Callable, Coroutine
+from typing import Any
 
 from websockets.asyncio.client import ClientConnection, connect
 from websockets.exceptions import ConnectionClosed
 from zstandard import ZstdCompressionDict, ZstdDecompressor
 
+from common.metrics import REGISTRY
 from common.models import FeedAlgorithm, JetstreamEventWrapper
+from common.sentry import TRACER
 from firehose.models import SubscriptionState
 
 logger = logging.getLogger("feed")
@@ -23,6 +27,29 @@ PUBLIC_HOSTS = [
 
 _MAX_MESSAGE_SIZE_BYTES = 1024 * 1024 * 5  # 5MB
 
+EVENTS_RECEIVED = REGISTRY.counter(
+    "feedgen_events_received_total", "Jetstream messages received"
+)
+EVENTS_DECODED = REGISTRY.counter(
+    "feedgen_events_decoded_total",
+    "Jetstream events decompressed and decoded, by collection",
+    ("collection",),
+)
+EVENT_ERRORS = REGISTRY.counter(
+    "feedgen_event_errors_total", "Jetstream events that failed to be processed"
+)
+EVENT_LAG = REGISTRY.gauge(
+    "feedgen_event_lag_seconds",
+    "Wall clock time minus the time of the last event received",
+)
+QUEUE_DEPTH = REGISTRY.gauge(
+    "feedgen_jetstream_queue_depth",
+    "Frames received from Jetstream and waiting to be processed",
+)
+RECONNECTS = REGISTRY.counter(
+    "feedgen_jetstream_reconnects_total", "Reconnections to Jetstream"
+)
+
 
 OnMessageCallback = Callable[[JetstreamEventWrapper], Coroutine[Any, Any, None]]
 OnCallbackErrorCallback = Callable[[BaseException], Coroutine[Any, Any, None]]
@@ -49,6 +76,7 @@ class JetStreamClient:
         self._max_reconnect_delay_sec = max_reconnect_delay
         self._client_connection: ClientConnection | None = None
         self._decompressor = self._load_decompressor()
+        QUEUE_DEPTH.callback = self._queue_depth
 
     @property
     def cursor(self) -> float | None:
@@ -100,17 +128,26 @@ class JetStreamClient:
         while not self._stop_event.is_set():
             try:
                 async for client in self._connect():
+                    self._client_connection = client
                     while not self._stop_event.is_set():
                         compressed: bytes = await client.recv(decode=False)  # type: ignore
+                        EVENTS_RECEIVED.inc()
                         try:
                             event = self._decompress_event(compressed)
+                            EVENTS_DECODED.inc(event.collection or "unknown")
+                            EVENT_LAG.set(time.time() - event.timestamp / 1_000_000)
                             await self._set_cursor(event.timestamp)
-                            await self._algorithm.process_event(event)
+                            with TRACER.trace(
+                                "jetstream.event", event.collection or "unknown"
+                            ):
+                                await self._algorithm.process_event(event)
                         except Exception as e:
+                            EVENT_ERRORS.inc()
                             self._algorithm.on_process_event_error(e)
             except ConnectionClosed:
                 if self._stop_event.is_set():
                     break
+                RECONNECTS.inc()
                 logger.warning("Connection closed. Reconnecting...")
 
     async def stop(self) -> None:
@@ -119,6 +156,16 @@ class JetStreamClient:
         if self._client_connection:
             await self._client_connection.close()
 
+    async def reconnect(self) -> None:
+        """Drop the connection, the client reconnects from its cursor."""
+        if self._client_connection:
+            await self._client_connection.close()
+
+    def _queue_depth(self) -> int | None:
+        if self._client_connection is None:
+            return None
+        return len(self._client_connection.recv_messages.frames)
+
     async def _init_cursor(self) -> None:
         # try:
         #     state = await SubscriptionState.objects.aget(service=self._algorithm.name)
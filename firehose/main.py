@@ -3,12 +3,16 @@ import logging
 import signal
 from asyncio import TaskGroup
 
-from atproto_firehose.exceptions import FirehoseError
-
+from common.metrics import REGISTRY, MetricsServer
 from firehose.jetstream import JetStreamClient
-from firehose.watchdog import WatchDogTimeoutError, start_watchdog
+from firehose.settings import INDEXER_METRICS_HOST, INDEXER_METRICS_PORT
+from firehose.watchdog import Watchdog, WatchDogTimeoutError
 from flatlanders.algorithms.flatlanders_feed import FlatlandersAlgorithm
+from flatlanders.algorithms.hot_feed import FlatlandersHotFeed
 from flatlanders.clients import FlatlandersATProtoClient
+from flatlanders.db import log_pool_stats, pool_stats
+from flatlanders.retention import PostPruner
+from flatlanders.settings import FEEDGEN_HOT_URI
 
 logger = logging.getLogger("feed")
 
@@ -21,24 +25,57 @@ async def signal_handler(client: JetStreamClient) -> None:
     raise asyncio.CancelledError
 
 
+def register_gauges(algorithm: FlatlandersAlgorithm) -> None:
+    """Export the in-memory queues of the indexer and its connection pool"""
+    REGISTRY.gauge(
+        "feedgen_ingest_pending_posts", "Posts buffered for the next batch write"
+    ).callback = lambda: algorithm.writer.pending
+    REGISTRY.gauge(
+        "feedgen_engagement_pending_posts",
+        "Posts with like and repost counts waiting to be written",
+    ).callback = lambda: algorithm.engagement.pending
+    REGISTRY.gauge(
+        "feedgen_db_pool",
+        "Statistics of the database connection pool, by counter",
+        ("stat",),
+    ).callback = lambda: (
+        {(stat,): value for stat, value in (pool_stats() or {}).items()} or None
+    )
+
+
 async def run_jetstream() -> None:
     """Run the JetStream client"""
     algorithm = FlatlandersAlgorithm()
     client = JetStreamClient(algorithm=algorithm)
+    watchdog = Watchdog(client)
 
+    # Logs in from its task, so consuming the firehose does not wait for it
     flatlanders_client = FlatlandersATProtoClient()
-    flatlanders_client.login()
-    
+
     try:
         async with TaskGroup() as group:
             # Spawn the client and watchdog tasks
             group.create_task(client.start())
-            group.create_task(start_watchdog(client))
+            group.create_task(watchdog.start())
             group.create_task(flatlanders_client.start())
+            group.create_task(algorithm.engagement.start())
+            group.create_task(algorithm.writer.start())
+            group.create_task(PostPruner().start())
+            group.create_task(log_pool_stats())
+            if INDEXER_METRICS_PORT:
+                register_gauges(algorithm)
+                server = MetricsServer(INDEXER_METRICS_HOST, INDEXER_METRICS_PORT)
+                server.routes["/health"] = watchdog.health
+                group.create_task(server.start())
+            if FEEDGEN_HOT_URI:
+                group.create_task(FlatlandersHotFeed().start())
             signal.signal(
                 signal.SIGINT, lambda _, __: asyncio.create_task(signal_handler(client))
             )
-    except (FirehoseError, WatchDogTimeoutError) as e:
-        logger.warning("Firehose consumer has terminated due to en error: %s", e)
+    except* WatchDogTimeoutError as errors:
+        # Task groups wrap the errors of their tasks
+        logger.warning(
+            "Firehose consumer has terminated due to en error: %s", errors.exceptions[0]
+        )
 
     logger.info("Shutting down firehose client")
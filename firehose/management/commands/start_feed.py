@@ -1,26 +1,31 @@
 import asyncio
 import logging
 
-import sentry_sdk
 import uvloop
 from django.core.management.base import BaseCommand
 
+from common.profiling import OnDemandProfiler
+from common.sentry import init_sentry
 from firehose.main import run_jetstream
-from firehose.settings import INDEXER_SENTRY_DNS
+from firehose.settings import (
+    INDEXER_SENTRY_DNS,
+    INDEXER_SENTRY_MAX_TRACES_PER_SECOND,
+    INDEXER_SENTRY_PROFILES_SAMPLE_RATE,
+    INDEXER_SENTRY_SLOW_EVENT_SECONDS,
+    INDEXER_SENTRY_TRACES_SAMPLE_RATE,
+)
+from flatlanders.settings import FEEDGEN_PROFILE_DIR, FEEDGEN_PROFILE_SECONDS
 
 logger = logging.getLogger("feed")
 
 # Initialize Sentry
 if INDEXER_SENTRY_DNS:
-    sentry_sdk.init(
-        dsn=INDEXER_SENTRY_DNS,
-        # Set traces_sample_rate to 1.0 to capture 100%
-        # of transactions for tracing.
-        traces_sample_rate=1.0,
-        # Set profiles_sample_rate to 1.0 to profile 100%
-        # of sampled transactions.
-        # We recommend adjusting this value in production.
-        profiles_sample_rate=1.0,
+    init_sentry(
+        INDEXER_SENTRY_DNS,
+        INDEXER_SENTRY_TRACES_SAMPLE_RATE,
+        INDEXER_SENTRY_MAX_TRACES_PER_SECOND,
+        INDEXER_SENTRY_PROFILES_SAMPLE_RATE,
+        INDEXER_SENTRY_SLOW_EVENT_SECONDS,
     )
 
 
@@ -31,5 +36,8 @@ class Command(BaseCommand):
     help = "Connects to the BSky jetstream and starts processing repository commits."
 
     def handle(self, *args, **options):
+        OnDemandProfiler(
+            "indexer", FEEDGEN_PROFILE_DIR, FEEDGEN_PROFILE_SECONDS
+        ).install()
         with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
             runner.run(run_jetstream())
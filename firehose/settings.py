@@ -7,4 +7,35 @@ from dotenv import load_dotenv
 load_dotenv()
 
 FIREHOSE_WORKERS_COUNT = int(os.getenv("FIREHOSE_WORKERS_COUNT", "3"))
+
+# Sentry SDK of the indexer, every error is reported but only a sample of the events
+# is traced: INDEXER_SENTRY_TRACES_SAMPLE_RATE of them, and no more than
+# INDEXER_SENTRY_MAX_TRACES_PER_SECOND a second (0 for no limit). Events processed
+# in more than INDEXER_SENTRY_SLOW_EVENT_SECONDS are traced too, within that limit.
 INDEXER_SENTRY_DNS = os.getenv("INDEXER_SENTRY_DNS")
+INDEXER_SENTRY_TRACES_SAMPLE_RATE = float(
+    os.getenv("INDEXER_SENTRY_TRACES_SAMPLE_RATE", "0.001")
+)
+INDEXER_SENTRY_MAX_TRACES_PER_SECOND = int(
+    os.getenv("INDEXER_SENTRY_MAX_TRACES_PER_SECOND", "1")
+)
+INDEXER_SENTRY_PROFILES_SAMPLE_RATE = float(
+    os.getenv("INDEXER_SENTRY_PROFILES_SAMPLE_RATE", "0")
+)
+INDEXER_SENTRY_SLOW_EVENT_SECONDS = float(
+    os.getenv("INDEXER_SENTRY_SLOW_EVENT_SECONDS", "1")
+)
+
+# Local HTTP endpoint serving the metrics of the indexer, 0 disables it
+INDEXER_METRICS_HOST = os.getenv("INDEXER_METRICS_HOST", "127.0.0.1")
+INDEXER_METRICS_PORT = int(os.getenv("INDEXER_METRICS_PORT", "9722"))
+
+# Watchdog of the Jetstream client, which checks it every INDEXER_WATCHDOG_INTERVAL
+# seconds. The client reconnects from its cursor when it receives no events for
+# INDEXER_STALL_SECONDS, or lags by more than INDEXER_MAX_LAG_SECONDS without
+# catching up for as long. The indexer stops after INDEXER_WATCHDOG_MAX_RECONNECTS
+# reconnections in a row (0 never stops it). The state is served on /health.
+INDEXER_WATCHDOG_INTERVAL = float(os.getenv("INDEXER_WATCHDOG_INTERVAL", "10"))
+INDEXER_STALL_SECONDS = float(os.getenv("INDEXER_STALL_SECONDS", "60"))
+INDEXER_MAX_LAG_SECONDS = float(os.getenv("INDEXER_MAX_LAG_SECONDS", "300"))
+INDEXER_WATCHDOG_MAX_RECONNECTS = int(os.getenv("INDEXER_WATCHDOG_MAX_RECONNECTS", "5"))
@@ -1,35 +1,180 @@
 import asyncio
+import json
 import logging
+import time
+from collections.abc import Callable
+from enum import StrEnum
 
+from common.metrics import REGISTRY
 from firehose.jetstream import JetStreamClient
+from firehose.settings import (
+    INDEXER_MAX_LAG_SECONDS,
+    INDEXER_STALL_SECONDS,
+    INDEXER_WATCHDOG_INTERVAL,
+    INDEXER_WATCHDOG_MAX_RECONNECTS,
+)
 
 logger = logging.getLogger("feed")
 
+EVENT_RATE = REGISTRY.gauge(
+    "feedgen_event_rate", "Jetstream events received per second, by the watchdog"
+)
+WATCHDOG_RECONNECTS = REGISTRY.counter(
+    "feedgen_watchdog_reconnects_total",
+    "Reconnections of the Jetstream client by the watchdog, by reason",
+    ("reason",),
+)
+
 
 class WatchDogTimeoutError(Exception):
     """Raised when the firehose client stalls."""
 
 
-async def start_watchdog(client: JetStreamClient) -> None:
-    """Task that monitors the current cursor state and stops the client if it stalls.
+class WatchdogState(StrEnum):
+    """State of the Jetstream client, as seen by the watchdog."""
+
+    STARTING = "starting"
+    OK = "ok"
+    CATCHING_UP = "catching_up"
+    LAGGING = "lagging"
+    STALLED = "stalled"
+
+
+# States reported as unhealthy by the health endpoint
+UNHEALTHY_STATES = (WatchdogState.LAGGING, WatchdogState.STALLED)
+
+
+class Watchdog:
+    """Monitors the Jetstream client and reconnects it when it stalls or lags.
+
+    Every `interval` seconds, the watchdog measures the rate of events received and
+    the event time lag of the client. The client reconnects in place, from its
+    cursor, when it receives no events for `stall_seconds`, or when it lags by more
+    than `max_lag` seconds without catching up for `stall_seconds`. The other tasks
+    of the indexer keep running. After `max_reconnects` reconnections in a row
+    without recovering, `WatchDogTimeoutError` stops the indexer.
 
     Args:
-        base_uri (str): The base URI of the firehose service.
+        client (JetStreamClient): The client to monitor.
+        interval (float): Seconds between checks.
+        stall_seconds (float): Seconds without progress before reconnecting.
+        max_lag (float): Event time lag considered healthy, in seconds.
+        max_reconnects (int): Reconnections in a row before giving up, 0 to never
+            give up.
+        clock (Callable[[], float]): Source of the time, in seconds.
     """
-    try:
-        last_cursor = client.cursor or 0
-        last_count = JetStreamClient.event_counter
-        consumer_sleep_time = 60
-        while True:
-            await asyncio.sleep(consumer_sleep_time)
-            cursor = client.cursor or 0
-            if not cursor > last_cursor:
-                raise WatchDogTimeoutError("Firehose client has stalled.")
-
-            rate = (JetStreamClient.event_counter - last_count) / consumer_sleep_time
-            logger.debug("Processing rate: %d/s", rate)
-
-            last_cursor = cursor
-            last_count = JetStreamClient.event_counter
-    except asyncio.CancelledError:
-        pass
+
+    def __init__(
+        self,
+        client: JetStreamClient,
+        interval: float = INDEXER_WATCHDOG_INTERVAL,
+        stall_seconds: float = INDEXER_STALL_SECONDS,
+        max_lag: float = INDEXER_MAX_LAG_SECONDS,
+        max_reconnects: int = INDEXER_WATCHDOG_MAX_RECONNECTS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.client = client
+        self.interval = interval
+        self.stall_seconds = stall_seconds
+        self.max_lag = max_lag
+        self.max_reconnects = max_reconnects
+        self.state = WatchdogState.STARTING
+        self.rate = 0.0
+        self.reconnects = 0
+        self._clock = clock
+        now = clock()
+        self._last_check = now
+        self._last_count = client.event_counter
+        self._last_lag: float | None = None
+        # Last time events were received, and the lag was healthy or decreasing
+        self._progress_at = now
+        self._catching_up_at = now
+
+    @property
+    def lag(self) -> float | None:
+        """Seconds between now and the time of the last event, None before any."""
+        cursor = self.client.cursor
+        return time.time() - cursor / 1_000_000 if cursor else None
+
+    async def start(self) -> None:
+        """Task that checks the client every interval until it is cancelled."""
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                await self.check()
+        except asyncio.CancelledError:
+            pass
+
+    async def check(self) -> None:
+        """Update the state of the client, and reconnect it if it stalled or lags.
+
+        Raises:
+            WatchDogTimeoutError: The client did not recover after `max_reconnects`
+                reconnections.
+        """
+        now = self._clock()
+        count = self.client.event_counter
+        self.rate = (count - self._last_count) / max(now - self._last_check, 1e-6)
+        EVENT_RATE.set(self.rate)
+        if count > self._last_count:
+            self._progress_at = now
+        self._last_check, self._last_count = now, count
+
+        lag = self.lag
+        if (
+            lag is None
+            or lag <= self.max_lag
+            or (self._last_lag is not None and lag < self._last_lag)
+        ):
+            self._catching_up_at = now
+        self._last_lag = lag
+        logger.debug("Processing rate: %d/s, lag: %s", self.rate, lag)
+
+        if now - self._progress_at >= self.stall_seconds:
+            await self._reconnect(WatchdogState.STALLED)
+        elif now - self._catching_up_at >= self.stall_seconds:
+            await self._reconnect(WatchdogState.LAGGING)
+        elif lag is None:
+            self.state = WatchdogState.STARTING
+        else:
+            self.state = (
+                WatchdogState.OK if lag <= self.max_lag else WatchdogState.CATCHING_UP
+            )
+            self.reconnects = 0
+
+    def health(self) -> tuple[int, str, str]:
+        """Handler of the health endpoint, for `MetricsServer.routes`."""
+        lag = self.lag
+        idle = (
+            0.0
+            if self.client.event_counter != self._last_count
+            else self._clock() - self._progress_at
+        )
+        body = {
+            "status": self.state,
+            "lag_seconds": round(lag, 3) if lag is not None else None,
+            "events_per_second": round(self.rate, 1),
+            "seconds_without_events": round(idle, 1),
+            "reconnects": self.reconnects,
+            "cursor": self.client.cursor,
+        }
+        status = 503 if self.state in UNHEALTHY_STATES else 200
+        return status, "application/json", json.dumps(body) + "\n"
+
+    async def _reconnect(self, state: WatchdogState) -> None:
+        self.state = state
+        if self.max_reconnects and self.reconnects >= self.max_reconnects:
+            raise WatchDogTimeoutError(
+                f"Firehose client {state} after {self.reconnects} reconnections."
+            )
+        self.reconnects += 1
+        WATCHDOG_RECONNECTS.inc(state)
+        logger.warning(
+            "Jetstream client %s (lag: %s), reconnecting from cursor %s",
+            state,
+            self.lag,
+            self.client.cursor,
+        )
+        await self.client.reconnect()
+        # Give the new connection time to receive events
+        self._progress_at = self._catching_up_at = self._clock()
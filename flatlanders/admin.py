@@ -2,9 +2,11 @@
 
 from django.contrib import admin
 
-from flatlanders.models.labelers import LabelerCursorState
+from flatlanders.models.labelers import EmittedLabel, LabelerCursorState
 from flatlanders.models.posts import Post
+from flatlanders.models.rankings import HotPostRank
 from flatlanders.models.users import RegisteredUser
+from flatlanders.search import search_posts
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -20,6 +22,17 @@ class PostAdmin(admin.ModelAdmin):
 
     search_fields = ("uri", "text", "author__did")
 
+    def get_search_results(self, request, queryset, search_term):
+        """Look up URIs and DIDs exactly and search text with the full-text index"""
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        if search_term.startswith("at://"):
+            return queryset.filter(uri=search_term), False
+        if search_term.startswith("did:"):
+            return queryset.filter(author_did=search_term), False
+        return search_posts(search_term, queryset), False
+
 
 class RegisteredUserAdmin(admin.ModelAdmin):
     """Admin class for RegisteredUser"""
@@ -44,6 +57,33 @@ class LabelerCursorStateAdmin(admin.ModelAdmin):
     search_fields = ("labeler_service",)
 
 
+class EmittedLabelAdmin(admin.ModelAdmin):
+    """Admin class for EmittedLabel"""
+
+    list_display = (
+        "uri",
+        "label",
+        "created_at",
+    )
+
+    search_fields = ("uri",)
+
+
+class HotPostRankAdmin(admin.ModelAdmin):
+    """Admin class for HotPostRank"""
+
+    list_display = (
+        "snapshot",
+        "rank",
+        "uri",
+        "score",
+    )
+
+    search_fields = ("uri",)
+
+
 admin.site.register(Post, PostAdmin)
 admin.site.register(RegisteredUser, RegisteredUserAdmin)
 admin.site.register(LabelerCursorState, LabelerCursorStateAdmin)
+admin.site.register(EmittedLabel, EmittedLabelAdmin)
+admin.site.register(HotPostRank, HotPostRankAdmin)
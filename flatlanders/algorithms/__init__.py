@@ -1,6 +1,10 @@
 from flatlanders.algorithms.flatlanders_feed import FlatlandersAlgorithm
-from flatlanders.settings import FEEDGEN_URI
+from flatlanders.algorithms.hot_feed import FlatlandersHotFeed
+from flatlanders.settings import FEEDGEN_HOT_URI, FEEDGEN_URI
 
 __FLATLANDERS = FlatlandersAlgorithm()
 
-ALGORITHMS = {FEEDGEN_URI: __FLATLANDERS.get_feed}
+ALGORITHMS = {FEEDGEN_URI: __FLATLANDERS.aget_feed}
+
+if FEEDGEN_HOT_URI:
+    ALGORITHMS[FEEDGEN_HOT_URI] = FlatlandersHotFeed().aget_feed
@@ -1,17 +1,31 @@
 import logging
-import re
-from datetime import datetime, timezone
+import time
+from datetime import UTC, datetime
 from typing import Any
 
+from django.db.models import QuerySet
+
+from common.logs import RateLimitedLog
 from common.models import FeedAlgorithm, JetstreamEventOps, JetstreamEventWrapper
 from flatlanders.algorithms.errors import InvalidCursorError
-from flatlanders.keywords import SASK_WORDS, is_sask_text
-from flatlanders.models.posts import Post
+from flatlanders.cache import abump_feed_version
+from flatlanders.engagement import EngagementCounter
+from flatlanders.ingest import PostBatchWriter
+from flatlanders.keywords import is_sask_text
+from flatlanders.metrics import (
+    DB_WRITE_SECONDS,
+    POSTS_DELETED,
+    POSTS_FILTERED,
+    POSTS_INDEXED,
+)
+from flatlanders.models.posts import FeedEntry, Post, uri_key
 from flatlanders.models.users import RegisteredUser
+from flatlanders.settings import FEEDGEN_INGEST_BATCH_SIZE, FEEDGEN_INGEST_CATCHUP_LAG
 
 logger = logging.getLogger("feed")
 
-COMPILED_PATTERNS = [re.compile(rf"\b{word}\b") for word in SASK_WORDS]
+# Indexed posts are logged at most a few times a minute, with a count of the others
+post_log = RateLimitedLog(logger)
 
 
 class FlatlandersAlgorithm(FeedAlgorithm):
@@ -19,7 +33,13 @@ class FlatlandersAlgorithm(FeedAlgorithm):
 
     def __init__(self) -> None:
         self._wanted_dids = []
-        self._wanted_collections = ["app.bsky.feed.post"]
+        self._wanted_collections = [
+            "app.bsky.feed.post",
+            "app.bsky.feed.like",
+            "app.bsky.feed.repost",
+        ]
+        self.engagement = EngagementCounter()
+        self.writer = PostBatchWriter(batch_size=FEEDGEN_INGEST_BATCH_SIZE)
 
     @property
     def wanted_collections(self) -> list[str]:
@@ -39,39 +59,53 @@ class FlatlandersAlgorithm(FeedAlgorithm):
         A chronological feed of posts that have been indexed by the algorithm.
         """
         try:
-            indexed_at: datetime | None = None
-            if cursor:
-                logger.debug("Incoming cursor: %s", cursor)
-                (indexed_at_timestamp, cid) = cursor.split("::")
-                if not indexed_at_timestamp or not cid:
-                    raise InvalidCursorError(f"Malformed cursor: {cursor}")
-
-                indexed_at = datetime.fromtimestamp(
-                    float(indexed_at_timestamp), timezone.utc
-                )
-
-                posts = Post.objects.filter(created_at__lt=indexed_at).order_by(
-                    "-created_at"
-                )[:limit]
-            else:
-                posts = Post.objects.order_by("-created_at")[:limit]
-
-            feed = [{"post": post.uri} for post in posts]
-
-            if posts:
-                last = list(posts)[-1]
-                if last.created_at:
-                    cursor = f"{last.created_at.timestamp()}::{last.cid}"
-                else:
-                    cursor = f"{last.indexed_at.timestamp()}::{last.cid}"
-            else:
-                # No more posts, no cursor. Must be empty string
-                cursor = ""
-
-            logger.debug("Outgoing cursor: %s", cursor)
+            rows = list(self._feed_rows(cursor, limit))
+            return self._feed_skeleton(rows)
         except Exception as error:
             logger.error("Error in flatlanders handler: %s", error, exc_info=True)
             raise error
+
+    async def aget_feed(self, cursor: str | None, limit: int) -> dict[str, Any]:
+        """Asynchronous version of `get_feed`."""
+        try:
+            rows = [row async for row in self._feed_rows(cursor, limit)]
+            return self._feed_skeleton(rows)
+        except Exception as error:
+            logger.error("Error in flatlanders handler: %s", error, exc_info=True)
+            raise error
+
+    def _feed_rows(self, cursor: str | None, limit: int) -> QuerySet:
+        """Build the (lazy) queryset of a feed page from an incoming cursor.
+
+        Pages are read from the narrow feed entry table and returned as
+        `(uri, created_at, cid)` tuples, so no model instances are created.
+        """
+        entries = FeedEntry.objects.filter(feed=self.name)
+        if cursor:
+            logger.debug("Incoming cursor: %s", cursor)
+            (indexed_at_timestamp, cid) = cursor.split("::")
+            if not indexed_at_timestamp or not cid:
+                raise InvalidCursorError(f"Malformed cursor: {cursor}")
+
+            indexed_at = datetime.fromtimestamp(float(indexed_at_timestamp), UTC)
+            entries = entries.filter(created_at__lt=indexed_at)
+
+        return entries.order_by("-created_at").values_list("uri", "created_at", "cid")[
+            :limit
+        ]
+
+    def _feed_skeleton(self, rows: list[tuple[str, datetime, str]]) -> dict[str, Any]:
+        """Build the feed skeleton and outgoing cursor from a page of rows."""
+        feed = [{"post": uri} for uri, _, _ in rows]
+
+        if rows:
+            _, created_at, cid = rows[-1]
+            cursor = f"{created_at.timestamp()}::{cid}"
+        else:
+            # No more posts, no cursor. Must be empty string
+            cursor = ""
+
+        logger.debug("Outgoing cursor: %s", cursor)
         return {
             "cursor": cursor,
             "feed": feed,
@@ -83,6 +117,11 @@ class FlatlandersAlgorithm(FeedAlgorithm):
                 await self._process_created_post(event)
             elif event.operation == JetstreamEventOps.DELETE:
                 await self._process_deleted_post(event)
+        elif event.operation == JetstreamEventOps.CREATE:
+            if event.collection == "app.bsky.feed.like":
+                self.engagement.add("likes", event.subject_uri)
+            elif event.collection == "app.bsky.feed.repost":
+                self.engagement.add("reposts", event.subject_uri)
 
     async def _process_created_post(self, event: JetstreamEventWrapper) -> None:
         """Indexes a post from a commit operations object.
@@ -102,22 +141,73 @@ class FlatlandersAlgorithm(FeedAlgorithm):
 
         # Index post from keyword match
         if is_sask_post:
-            logger.info("Indexing post from keyword match")
-            await Post.afrom_event(event, is_community_match=True, author=author)
+            post_log.info(
+                "indexed keyword",
+                "Indexing post from keyword match: %s",
+                event.uri,
+                extra={"uri": event.uri, "match": "keyword"},
+            )
+            await self._index_post(event, author, "keyword")
 
         elif author:
             # Replies to non-indexed posts are ignored
             if (
                 event.reply_parent
-                and not await Post.objects.filter(uri=event.reply_parent).aexists()
+                and event.reply_parent not in self.writer
+                and not await Post.objects.filter(
+                    pk=uri_key(event.reply_parent)
+                ).aexists()
             ):
+                POSTS_FILTERED.inc("reply")
                 return
 
             # Index post from registered author
-            logger.info("Indexing post from registered author: %s", record_text)
-            await Post.afrom_event(event, is_community_match=True, author=author)
+            post_log.info(
+                "indexed author",
+                "Indexing post from registered author: %s",
+                event.uri,
+                extra={"uri": event.uri, "match": "author"},
+            )
+            await self._index_post(event, author, "author")
+
+        else:
+            POSTS_FILTERED.inc("no_match")
+
+    async def _index_post(
+        self, event: JetstreamEventWrapper, author: RegisteredUser | None, match: str
+    ) -> None:
+        """Writes a post, in a batch if the event is older than the catch-up lag.
+
+        The post is counted in `POSTS_INDEXED` once it is inserted.
+
+        Args:
+            event: The Jetstream event wrapper object.
+            author: The registered author of the post, if any.
+            match: The rule the post matched, keyword or author.
+        """
+        if time.time() - event.timestamp / 1_000_000 > FEEDGEN_INGEST_CATCHUP_LAG:
+            post = Post.from_event(event, is_community_match=True, author=author)
+            await self.writer.add(post, feeds=[self.name], match=match)
+            return
+
+        # Caught up: write the remaining batch before indexing posts one by one
+        if self.writer.pending:
+            await self.writer.flush()
+        with DB_WRITE_SECONDS.time("post"):
+            post = await Post.afrom_event(
+                event, is_community_match=True, author=author, feeds=[self.name]
+            )
+        if post:
+            POSTS_INDEXED.inc(match)
+            await abump_feed_version()
 
     async def _process_deleted_post(self, event: JetstreamEventWrapper):
         """Deletes a post from the database"""
         if event.uri:
-            await Post.objects.filter(uri=event.uri).adelete()
+            if self.writer.discard(event.uri):
+                return
+            with DB_WRITE_SECONDS.time("delete"):
+                deleted = await Post.adelete_uri(event.uri)
+            if deleted:
+                POSTS_DELETED.inc()
+                await abump_feed_version()
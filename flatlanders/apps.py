@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class FlatlandersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "flatlanders"
+
+    def ready(self):
+        from flatlanders.search import restore_search_triggers
+
+        post_migrate.connect(restore_search_triggers, sender=self)
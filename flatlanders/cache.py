@@ -0,0 +1,61 @@
+"""Versioned page cache for feed skeleton responses.
+
+Pages are stored pre-serialized under a key built from the feed URI, cursor and
+limit plus a feed version counter. The indexer bumps the counter whenever posts
+are inserted or deleted, which orphans every cached page at once.
+"""
+
+import hashlib
+
+from django.core.cache import cache
+
+from flatlanders.settings import FEEDGEN_FEED_CACHE_TTL
+
+FEED_VERSION_KEY = "feed-version"
+
+
+def feed_page_key(version: int, uri: str, cursor: str | None, limit: int) -> str:
+    """Build the cache key of a feed page.
+
+    Args:
+        version (int): The current feed version.
+        uri (str): The URI of the requested feed.
+        cursor (str | None): The incoming pagination cursor.
+        limit (int): The requested page size.
+
+    Returns:
+        str: A short, backend safe cache key.
+    """
+    digest = hashlib.sha1(f"{uri}|{cursor or ''}|{limit}".encode()).hexdigest()
+    return f"feed-page:{version}:{digest}"
+
+
+async def aget_feed_version() -> int:
+    """Return the current feed version, initializing it if needed."""
+    return await cache.aget_or_set(FEED_VERSION_KEY, 0, timeout=None)
+
+
+async def abump_feed_version() -> None:
+    """Increment the feed version so that every cached page is invalidated."""
+    try:
+        await cache.aincr(FEED_VERSION_KEY)
+    except ValueError:
+        # The counter does not exist yet or was evicted
+        await cache.aadd(FEED_VERSION_KEY, 1, timeout=None)
+
+
+async def aget_feed_page(
+    uri: str, cursor: str | None, limit: int
+) -> tuple[str, bytes | None]:
+    """Look up a cached feed page.
+
+    Returns:
+        tuple[str, bytes | None]: The cache key and the cached body, if any.
+    """
+    key = feed_page_key(await aget_feed_version(), uri, cursor, limit)
+    return key, await cache.aget(key)
+
+
+async def aset_feed_page(key: str, body: bytes) -> None:
+    """Store a serialized feed page under a key from `aget_feed_page`."""
+    await cache.aset(key, body, FEEDGEN_FEED_CACHE_TTL)
@@ -4,13 +4,11 @@ import asyncio
 import logging
 from typing import TYPE_CHECKING
 
-from atproto import Client, DidDocument
-from atproto.exceptions import AtProtocolError
-
 from flatlanders.models.users import RegisteredUser
 from flatlanders.settings import FEEDGEN_PUBLISHER_DID, PUBLISHER_APP_PASSWORD
 
 if TYPE_CHECKING:
+    from atproto import Client
     from atproto_client.models.app.bsky.actor.defs import ProfileViewDetailed
 
 logger = logging.getLogger("feed")
@@ -22,7 +20,7 @@ class FlatlandersATProtoClientError(Exception):
 
 class FlatlandersATProtoClient:
     def __init__(self) -> None:
-        self._client = Client()
+        self._client: Client | None = None
         self._admin_profile: ProfileViewDetailed | None = None
 
     def is_logged_in(self) -> bool:
@@ -39,6 +37,12 @@ class FlatlandersATProtoClient:
         Returns:
             Client: The admin client instance.
         """
+        # The AT Protocol models take about a second to import, so they are only
+        # imported once the client logs in, off the event loop (see `start`)
+        from atproto import Client, DidDocument
+        from atproto.exceptions import AtProtocolError
+
+        self._client = self._client or Client()
         try:
             self._admin_profile = self._client.login(
                 FEEDGEN_PUBLISHER_DID, PUBLISHER_APP_PASSWORD
@@ -66,6 +70,8 @@ class FlatlandersATProtoClient:
         try:
             while True:
                 try:
+                    if not self.is_logged_in():
+                        await asyncio.to_thread(self.login)
                     created, deleted = await self._sync_registered_users()
                     logger.info(f"Created {created} new users and deleted {deleted} users.")
                 except Exception as e:
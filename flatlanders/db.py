@@ -0,0 +1,42 @@
+"""Statistics of the database connection pool."""
+
+import asyncio
+import logging
+
+from django.db import connections
+
+logger = logging.getLogger("feed")
+
+
+def pool_stats(alias: str = "default") -> dict[str, int] | None:
+    """Return the statistics of the connection pool of this process.
+
+    Args:
+        alias (str): Alias of the database.
+
+    Returns:
+        dict[str, int] | None: The psycopg pool counters, e.g. `pool_size`,
+            `pool_available` and `requests_wait_ms`, or None if connections to the
+            database are not pooled.
+    """
+    pool = getattr(connections[alias], "pool", None)
+    if pool is None:
+        return None
+    return pool.get_stats()
+
+
+async def log_pool_stats(interval: int = 60) -> None:
+    """Task that periodically logs the statistics of the connection pool.
+
+    Args:
+        interval (int): Seconds between two log lines.
+    """
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            stats = pool_stats()
+            if stats is None:
+                return
+            logger.info("Database pool: %s", stats)
+    except asyncio.CancelledError:
+        pass
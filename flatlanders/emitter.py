@@ -0,0 +1,205 @@
+"""Concurrent, rate limited emission of label events to the labeler.
+
+Label events are sent through the PDS, which proxies them to the labeler. Events
+are emitted by a pool of threads sharing one logged in client, and so its pool of
+HTTP connections, at no more than `FEEDGEN_LABELER_RATE` events per second.
+Events failing with a transient error (network errors, rate limiting and server
+errors) are retried with exponential backoff.
+"""
+
+import logging
+import random
+import threading
+import time
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+
+from atproto import Client
+from atproto.exceptions import (
+    AtProtocolError,
+    NetworkError,
+    RateLimitExceededError,
+    RequestException,
+)
+from atproto_client.models.com.atproto.repo.strong_ref import Main as StrongRef
+from atproto_client.models.tools.ozone.moderation.defs import ModEventLabel
+from atproto_client.models.tools.ozone.moderation.emit_event import Data as EventData
+
+from common.logs import RateLimitedLog
+from flatlanders.models.posts import Post
+from flatlanders.settings import (
+    FEEDGEN_LABELER_CONCURRENCY,
+    FEEDGEN_LABELER_RATE,
+    FEEDGEN_LABELER_RETRIES,
+)
+
+logger = logging.getLogger("labeler")
+
+# Retries and failures are logged a few times a minute when the labeler is down
+emit_log = RateLimitedLog(logger)
+
+# Seconds before the first retry of an event, doubled on every retry
+RETRY_BACKOFF = 1.0
+
+
+class LabelEmissionError(Exception):
+    """Raised when label events could not be emitted."""
+
+
+class TokenBucket:
+    """Thread safe token bucket allowing `rate` acquisitions per second.
+
+    Up to `burst` tokens accumulate while the bucket is idle. A rate of 0 disables
+    the limit.
+    """
+
+    def __init__(self, rate: float, burst: int | None = None) -> None:
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class LabelEmitter:
+    """Emits label events on posts through a logged in client.
+
+    Args:
+        client (Client): Client logged in as the labeler account, with its base
+            URL set to the PDS of the account.
+        labeler_did (str): DID of the labeler the PDS proxies events to.
+        concurrency (int): Number of events in flight at once.
+        rate (float): Maximum number of events sent per second, 0 for no limit.
+        retries (int): Number of retries of an event failing with a transient error.
+        backoff (float): Seconds before the first retry, doubled on every retry.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        labeler_did: str,
+        concurrency: int = FEEDGEN_LABELER_CONCURRENCY,
+        rate: float = FEEDGEN_LABELER_RATE,
+        retries: int = FEEDGEN_LABELER_RETRIES,
+        backoff: float = RETRY_BACKOFF,
+    ) -> None:
+        self.client = client
+        self.labeler_did = labeler_did
+        self.retries = retries
+        self.backoff = backoff
+        self.bucket = TokenBucket(rate)
+        # Apply headers to redirect the events to the labeler from the PDS
+        self.headers = {"atproto-proxy": f"{labeler_did}#atproto_labeler"}
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="label-emitter"
+        )
+
+    def emit(self, post: Post, label: str) -> None:
+        """Apply a label to a post, retrying transient errors.
+
+        Args:
+            post (Post): The post to label.
+            label (str): The label value.
+
+        Raises:
+            AtProtocolError: The event failed with a permanent error, or still
+                failed after all retries.
+        """
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire()
+            try:
+                self._emit_event(post, label)
+                return
+            except AtProtocolError as error:
+                delay = self._retry_delay(error, attempt)
+                if delay is None or attempt == self.retries:
+                    raise
+                emit_log.warning(
+                    "label retry",
+                    "Retrying label %s on %s in %.1fs: %s",
+                    label,
+                    post.uri,
+                    delay,
+                    error,
+                )
+                time.sleep(delay)
+
+    def emit_all(
+        self, labels: Sequence[tuple[Post, str]]
+    ) -> list[AtProtocolError | None]:
+        """Apply labels to posts concurrently.
+
+        Args:
+            labels (Sequence[tuple[Post, str]]): The posts and the label to apply.
+
+        Returns:
+            list[AtProtocolError | None]: The error of each label, in order, or None
+                for the labels applied.
+        """
+        futures = [
+            self._executor.submit(self.emit, post, label) for post, label in labels
+        ]
+        errors = []
+        for (post, label), future in zip(labels, futures, strict=True):
+            error = future.exception()
+            if error is not None and not isinstance(error, AtProtocolError):
+                raise error
+            if error is not None:
+                emit_log.error(
+                    "label failure",
+                    "Failed to label %s with %s: %s",
+                    post.uri,
+                    label,
+                    error,
+                )
+            errors.append(error)
+        return errors
+
+    def close(self) -> None:
+        """Wait for the events in flight and stop the emitting threads."""
+        self._executor.shutdown()
+
+    def _emit_event(self, post: Post, label: str) -> None:
+        # Create the event with the label
+        event = ModEventLabel(create_label_vals=[label], negate_label_vals=[])
+
+        # Emit the event on the post from the labeler account
+        data = EventData(
+            created_by=self.labeler_did,
+            event=event,
+            subject=StrongRef(cid=post.cid, uri=post.uri),
+            subject_blob_cids=[],
+        )
+        self.client.tools.ozone.moderation.emit_event(data=data, headers=self.headers)
+
+    def _retry_delay(self, error: AtProtocolError, attempt: int) -> float | None:
+        # Seconds to wait before retrying an event, None when it must not be retried
+        backoff = self.backoff * 2**attempt * random.uniform(1, 1.5)
+        if isinstance(error, RateLimitExceededError):
+            return error.retry_after if error.retry_after is not None else backoff
+        if isinstance(error, NetworkError):
+            return backoff
+        if (
+            isinstance(error, RequestException)
+            and error.response is not None
+            and error.response.status_code >= 500
+        ):
+            return backoff
+        return None
@@ -0,0 +1,142 @@
+"""Module containing the EngagementCounter class."""
+
+import asyncio
+import heapq
+import logging
+from collections import Counter, defaultdict
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import F
+
+from flatlanders.metrics import DB_WRITE_SECONDS, WRITE_BATCH_SIZE
+from flatlanders.models.posts import Post, uri_key
+from flatlanders.settings import (
+    FEEDGEN_ENGAGEMENT_FLUSH_INTERVAL,
+    FEEDGEN_ENGAGEMENT_MAX_PENDING,
+)
+
+logger = logging.getLogger("feed")
+
+POST_COLLECTION_SEGMENT = "/app.bsky.feed.post/"
+
+# Maximum number of posts in a single UPDATE statement
+_UPDATE_BATCH_SIZE = 500
+
+
+class EngagementCounter:
+    """Aggregates like and repost counts in memory and writes them in batches.
+
+    Likes vastly outnumber posts, so events are never written one at a time.
+    Increments are summed per post and flushed periodically as
+    `UPDATE ... SET likes = likes + n WHERE id IN (...)` statements over the post
+    keys, which also discards every subject that is not an indexed post.
+
+    Deleted likes and reposts are not subtracted: Jetstream delete events do not
+    carry the subject of the deleted record.
+
+    A failed flush keeps its increments for the next one. While the database is
+    down, at most `max_pending` posts are kept, dropping the smallest increments.
+    """
+
+    FIELDS = ("likes", "reposts")
+
+    def __init__(self, max_pending: int = FEEDGEN_ENGAGEMENT_MAX_PENDING) -> None:
+        self.max_pending = max_pending
+        self._pending: dict[str, Counter[int]] = self._empty()
+
+    def _empty(self) -> dict[str, Counter[int]]:
+        return {field: Counter() for field in self.FIELDS}
+
+    @property
+    def pending(self) -> int:
+        """The number of posts with unflushed increments."""
+        return sum(len(counts) for counts in self._pending.values())
+
+    def add(self, field: str, subject_uri: str | None) -> None:
+        """Count a like or repost of a post.
+
+        Args:
+            field (str): Either "likes" or "reposts".
+            subject_uri (str | None): The URI of the liked or reposted record.
+        """
+        if subject_uri and POST_COLLECTION_SEGMENT in subject_uri:
+            self._pending[field][uri_key(subject_uri)] += 1
+
+    async def flush(self) -> int:
+        """Write the pending increments to the database.
+
+        Returns:
+            int: The number of post rows updated.
+        """
+        pending, self._pending = self._pending, self._empty()
+        if not any(pending.values()):
+            return 0
+        WRITE_BATCH_SIZE.observe(sum(map(len, pending.values())), "engagement")
+        try:
+            with DB_WRITE_SECONDS.time("engagement"):
+                return await sync_to_async(self._write)(pending)
+        except Exception:
+            # Nothing was written, add the increments counted meanwhile back
+            for field, counts in self._pending.items():
+                pending[field].update(counts)
+            self._pending = pending
+            self._trim()
+            raise
+
+    def _trim(self) -> None:
+        """Drop the smallest increments of the posts beyond `max_pending`."""
+        excess = self.pending - self.max_pending
+        if excess <= 0:
+            return
+        smallest = heapq.nsmallest(
+            excess,
+            (
+                (increment, field, key)
+                for field, counts in self._pending.items()
+                for key, increment in counts.items()
+            ),
+        )
+        for _, field, key in smallest:
+            del self._pending[field][key]
+        logger.warning(
+            "Dropped %d engagement increments of %d posts, over the limit of %d",
+            sum(increment for increment, _, _ in smallest),
+            excess,
+            self.max_pending,
+        )
+
+    @staticmethod
+    def _write(pending: dict[str, Counter[int]]) -> int:
+        updated = 0
+        with transaction.atomic():
+            for field, counts in pending.items():
+                # Group posts by increment so each statement covers many posts
+                by_increment: dict[int, list[int]] = defaultdict(list)
+                for key, increment in counts.items():
+                    by_increment[increment].append(key)
+
+                for increment, keys in by_increment.items():
+                    for start in range(0, len(keys), _UPDATE_BATCH_SIZE):
+                        updated += Post.objects.filter(
+                            pk__in=keys[start : start + _UPDATE_BATCH_SIZE]
+                        ).update(**{field: F(field) + increment})
+        return updated
+
+    async def start(self, flush_interval: int = FEEDGEN_ENGAGEMENT_FLUSH_INTERVAL):
+        """Task that periodically flushes the aggregated counters.
+
+        Args:
+            flush_interval (int): Seconds between flushes.
+        """
+        try:
+            while True:
+                await asyncio.sleep(flush_interval)
+                try:
+                    updated = await self.flush()
+                    logger.debug("Updated engagement counters of %d posts", updated)
+                except Exception as e:
+                    logger.error("Error flushing engagement counters: %s", e)
+        except asyncio.CancelledError:
+            await self.flush()
+            raise
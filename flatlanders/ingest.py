@@ -0,0 +1,249 @@
+"""Batched ingest of posts.
+
+On Postgres, batches are streamed with `COPY` into a temporary staging table and
+merged into the post table with `INSERT ... ON CONFLICT DO NOTHING`, which skips
+posts that were already indexed. Other databases fall back to `bulk_create`.
+
+A batch that fails while the database is available is split in halves until the
+posts that cannot be written are found, which are logged and dropped.
+"""
+
+import asyncio
+import logging
+from collections.abc import Iterable
+
+from asgiref.sync import sync_to_async
+from django.db import InterfaceError, OperationalError, connection, transaction
+
+from flatlanders.cache import abump_feed_version
+from flatlanders.metrics import DB_WRITE_SECONDS, POSTS_INDEXED, WRITE_BATCH_SIZE
+from flatlanders.models.posts import FeedEntry, Post, PostOutbox, uri_key
+from flatlanders.settings import FEEDGEN_INGEST_FLUSH_INTERVAL
+
+logger = logging.getLogger("feed")
+
+STAGING_TABLE = "flatlanders_post_staging"
+
+
+def _copy_posts(posts: list[Post]) -> set[int]:
+    qn = connection.ops.quote_name
+    fields = Post._meta.concrete_fields
+    columns = ", ".join(qn(field.column) for field in fields)
+
+    with connection.cursor() as cursor:
+        # The staging table lives as long as the connection and is emptied on commit
+        cursor.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {qn(STAGING_TABLE)} "
+            f"(LIKE {qn(Post._meta.db_table)} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        )
+        with cursor.copy(f"COPY {qn(STAGING_TABLE)} ({columns}) FROM STDIN") as copy:
+            for post in posts:
+                copy.write_row(
+                    [
+                        field.get_db_prep_save(field.pre_save(post, True), connection)
+                        for field in fields
+                    ]
+                )
+        cursor.execute(
+            f"INSERT INTO {qn(Post._meta.db_table)} ({columns}) "
+            f"SELECT {columns} FROM {qn(STAGING_TABLE)} "
+            f"ON CONFLICT DO NOTHING RETURNING {qn(Post._meta.pk.column)}"
+        )
+        return {key for (key,) in cursor.fetchall()}
+
+
+def _bulk_create_posts(posts: list[Post]) -> set[int]:
+    existing = set(
+        Post.objects.filter(pk__in=[post.pk for post in posts]).values_list(
+            "pk", flat=True
+        )
+    )
+    created = Post.objects.bulk_create(
+        [post for post in posts if post.pk not in existing]
+    )
+    return {post.pk for post in created}
+
+
+def _is_unavailable(error: Exception) -> bool:
+    """Indicate if a write failed because of the database rather than its rows."""
+    return isinstance(error, (OperationalError, InterfaceError)) or (
+        not connection.is_usable()
+    )
+
+
+def write_posts(posts: Iterable[tuple[Post, Iterable[str]]]) -> int:
+    """Insert a batch of posts and their feed entries in one transaction.
+
+    Posts that already exist are skipped, together with their feed entries.
+
+    Args:
+        posts (Iterable[tuple[Post, Iterable[str]]]): Unsaved posts, each with the
+            names of the feeds it belongs to.
+
+    Returns:
+        int: The number of inserted posts.
+    """
+    return len(insert_posts(posts))
+
+
+def insert_posts(posts: Iterable[tuple[Post, Iterable[str]]]) -> set[int]:
+    """Version of `write_posts` returning the keys of the inserted posts."""
+    feeds_by_key: dict[int, tuple[Post, Iterable[str]]] = {}
+    for post, feeds in posts:
+        post.pk = post.pk or uri_key(post.uri)
+        feeds_by_key[post.pk] = (post, feeds)
+    if not feeds_by_key:
+        return set()
+
+    batch = [post for post, _ in feeds_by_key.values()]
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            inserted = _copy_posts(batch)
+        else:
+            inserted = _bulk_create_posts(batch)
+
+        FeedEntry.objects.bulk_create(
+            FeedEntry.from_post(post, feed)
+            for key, (post, feeds) in feeds_by_key.items()
+            if key in inserted
+            for feed in feeds
+        )
+        PostOutbox.enqueue(key for key in feeds_by_key if key in inserted)
+    return inserted
+
+
+# A buffered post, its feeds and the rule it matched, if counted as indexed
+_Entry = tuple[Post, tuple[str, ...], str | None]
+
+
+class PostBatchWriter:
+    """Buffers posts in memory and writes them with `insert_posts`.
+
+    Used by the indexer while it catches up with the firehose, where writing each
+    post in its own transaction cannot keep up with the rate of events.
+    """
+
+    def __init__(self, batch_size: int) -> None:
+        self._batch_size = batch_size
+        self._pending: dict[str, _Entry] = {}
+        # The batch being written, and the URIs of its posts deleted meanwhile
+        self._writing: dict[str, _Entry] = {}
+        self._discarded: set[str] = set()
+
+    @property
+    def pending(self) -> int:
+        """The number of buffered posts."""
+        return len(self._pending)
+
+    def __contains__(self, uri: str) -> bool:
+        return uri in self._pending or (
+            uri in self._writing and uri not in self._discarded
+        )
+
+    async def add(
+        self, post: Post, feeds: Iterable[str] = (), match: str | None = None
+    ) -> None:
+        """Buffer a post, and write the batch once it is full.
+
+        Args:
+            post (Post): The unsaved post.
+            feeds (Iterable[str]): Names of the feeds the post belongs to.
+            match (str | None): The rule the post matched, counted in
+                `POSTS_INDEXED` once the post is inserted.
+        """
+        self._pending[post.uri] = (post, tuple(feeds), match)
+        if len(self._pending) >= self._batch_size:
+            await self.flush()
+
+    def discard(self, uri: str) -> bool:
+        """Remove a buffered post, e.g. when it is deleted before being written.
+
+        A post of the batch being written is deleted once the batch is written.
+
+        Returns:
+            bool: True if the post was buffered.
+        """
+        if self._pending.pop(uri, None) is not None:
+            return True
+        if uri in self._writing and uri not in self._discarded:
+            self._discarded.add(uri)
+            return True
+        return False
+
+    async def flush(self) -> int:
+        """Write the buffered posts to the database.
+
+        Returns:
+            int: The number of inserted posts.
+        """
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        self._writing = pending
+        WRITE_BATCH_SIZE.observe(len(pending), "posts")
+        try:
+            with DB_WRITE_SECONDS.time("batch"):
+                keys = await sync_to_async(self._write)(list(pending.values()))
+            for uri in self._discarded:
+                await Post.adelete_uri(uri)
+            for uri, (post, _, match) in pending.items():
+                if match and post.pk in keys and uri not in self._discarded:
+                    POSTS_INDEXED.inc(match)
+        except Exception:
+            # The database is unavailable: keep the batch for the next flush, with
+            # the posts buffered meanwhile and without the ones deleted meanwhile
+            kept = {
+                uri: entry
+                for uri, entry in pending.items()
+                if uri not in self._discarded
+            }
+            self._pending = {**kept, **self._pending}
+            raise
+        finally:
+            self._writing, self._discarded = {}, set()
+        inserted = len(keys)
+        if inserted:
+            await abump_feed_version()
+        logger.debug("Wrote %d of %d buffered posts", inserted, len(pending))
+        return inserted
+
+    def _write(self, batch: list[_Entry]) -> set[int]:
+        """Write a batch, splitting it to drop the posts that cannot be written.
+
+        Returns:
+            set[int]: The keys of the inserted posts.
+
+        Raises:
+            Exception: The error of a write that failed because the database is
+                unavailable.
+        """
+        try:
+            return insert_posts((post, feeds) for post, feeds, _ in batch)
+        except Exception as error:
+            if _is_unavailable(error):
+                raise
+            if len(batch) == 1:
+                post, _, _ = batch[0]
+                logger.error(
+                    "Dropping post %s, failed to write it: %s", post.uri, error
+                )
+                return set()
+        middle = len(batch) // 2
+        return self._write(batch[:middle]) | self._write(batch[middle:])
+
+    async def start(self, flush_interval: int = FEEDGEN_INGEST_FLUSH_INTERVAL):
+        """Task that periodically writes the buffered posts.
+
+        Args:
+            flush_interval (int): Seconds between flushes.
+        """
+        try:
+            while True:
+                await asyncio.sleep(flush_interval)
+                try:
+                    await self.flush()
+                except Exception as e:
+                    logger.error("Error writing buffered posts: %s", e)
+        except asyncio.CancelledError:
+            await self.flush()
+            raise
@@ -1,6 +1,7 @@
 """Module containing keywords for the Flatlanders algorithm."""
 
 import re
+from functools import cache
 
 SASK_WORDS = {
     "sask",
@@ -150,10 +151,21 @@ POLITICAL_CONTENT = POLITICAL_WORDS.union(SASK_POLITICIANS)
 
 SASK_CONTENT = SASK_WORDS.union(SASK_POLITICIANS)
 
-COMPILED_PATTERNS = [re.compile(rf"\b{word}\b") for word in SASK_CONTENT]
+
+# Patterns are compiled on first use, so importing the keywords stays cheap
+@cache
+def sask_patterns() -> list[re.Pattern]:
+    """Returns the compiled patterns of the Saskatchewan keywords"""
+    return [re.compile(rf"\b{word}\b") for word in SASK_CONTENT]
+
+
+@cache
+def political_patterns() -> list[re.Pattern]:
+    """Returns the compiled patterns of the political content keywords"""
+    return [re.compile(rf"\b{word}\b") for word in POLITICAL_CONTENT]
 
 
 def is_sask_text(text: str) -> bool:
     """Check if a text contains any of the Saskatchewan keywords"""
     lower_text = text.lower()
-    return any(pattern.search(lower_text) for pattern in COMPILED_PATTERNS)
+    return any(pattern.search(lower_text) for pattern in sask_patterns())
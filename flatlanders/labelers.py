@@ -1,31 +1,45 @@
 import logging
-import re
 import time
-from datetime import datetime
+from functools import cache
 
 from atproto import Client, DidDocument
-from atproto_client.models.com.atproto.repo.strong_ref import Main as StrongRef
-from atproto_client.models.tools.ozone.moderation.defs import ModEventLabel
-from atproto_client.models.tools.ozone.moderation.emit_event import Data as EventData
 
-from flatlanders.keywords import POLITICAL_CONTENT
-from flatlanders.models.labelers import LabelerCursorState, SKPoliLabels
-from flatlanders.models.posts import Post
-from flatlanders.settings import FEEDGEN_PUBLISHER_DID, PUBLISHER_APP_PASSWORD
+from flatlanders.emitter import LabelEmissionError, LabelEmitter
+from flatlanders.keywords import political_patterns
+from flatlanders.models.labelers import EmittedLabel, LabelerCursorState, SKPoliLabels
+from flatlanders.models.posts import Post, PostOutbox
+from flatlanders.outbox import OutboxListener
+from flatlanders.settings import (
+    FEEDGEN_LABELER_CHUNK_SIZE,
+    FEEDGEN_LABELER_OUTBOX,
+    FEEDGEN_LABELER_POLL_INTERVAL,
+    FEEDGEN_PUBLISHER_DID,
+    PUBLISHER_APP_PASSWORD,
+)
 
 DEFAULT_labeler_SERVICE = "skpoli"
 
+# Fields of the posts read by the labeler
+LABELER_POST_FIELDS = ("id", "uri", "cid", "text", "created_at")
+
 logger = logging.getLogger("labeler")
 
 
-# initialize client and update base url to PDS
-client = Client()
-profile = client.login(FEEDGEN_PUBLISHER_DID, PUBLISHER_APP_PASSWORD)
-repo = client.com.atproto.repo.describe_repo({"repo": FEEDGEN_PUBLISHER_DID})
-did_doc = DidDocument.from_dict(repo.did_doc)
-client._base_url = f"{did_doc.get_pds_endpoint()}/xrpc"
+@cache
+def get_emitter() -> LabelEmitter:
+    """Returns the label emitter, logging in to the PDS on first use.
+
+    Logging in is deferred to the first label so that importing the labeler, e.g.
+    by management commands and tests, needs no network access.
+    """
+    # initialize client and update base url to PDS
+    client = Client()
+    client.login(FEEDGEN_PUBLISHER_DID, PUBLISHER_APP_PASSWORD)
+    repo = client.com.atproto.repo.describe_repo({"repo": FEEDGEN_PUBLISHER_DID})
+    did_doc = DidDocument.from_dict(repo.did_doc)
+    client._base_url = f"{did_doc.get_pds_endpoint()}/xrpc"
+    return LabelEmitter(client, FEEDGEN_PUBLISHER_DID)
 
-compiled_patterns = [re.compile(rf"\b{word}\b") for word in POLITICAL_CONTENT]
 
 def has_political_content(post: Post) -> bool:
     """Indicate if a post has political content.
@@ -37,7 +51,7 @@ def has_political_content(post: Post) -> bool:
         bool: True if text matches any of the political content keywords.
     """
     lower_text = post.text.lower()
-    return any(pattern.search(lower_text) for pattern in compiled_patterns)
+    return any(pattern.search(lower_text) for pattern in political_patterns())
 
 
 def raise_label_event(post: Post, label: str):
@@ -47,29 +61,116 @@ def raise_label_event(post: Post, label: str):
         post (Post): The post to label.
         label (str): The label value.
     """
+    get_emitter().emit(post, label)
 
-    # Create the event with the label
-    event = ModEventLabel(
-        create_label_vals=[label],
-        negate_label_vals=[],
-    )
 
-    # Create the subject reference
-    subject = StrongRef(cid=post.cid, uri=post.uri)
+def emit_labels(posts: list[Post]) -> set[int]:
+    """Label posts with political content, concurrently.
 
-    # Emit the event from the profile
-    event = EventData(
-        created_by=profile.did,
-        event=event,
-        subject=subject,
-        subject_blob_cids=[],
+    Labels already in the ledger are skipped, and the labels emitted are added to
+    it.
+
+    Args:
+        posts (list[Post]): The posts to check and label.
+
+    Returns:
+        set[int]: Keys of the posts whose label failed after all retries.
+    """
+    labels = [
+        (post, SKPoliLabels.POLITICAL_CONTENT)
+        for post in posts
+        if has_political_content(post)
+    ]
+    # Labels emitted before a reset or restart are not emitted again
+    labels = EmittedLabel.exclude_emitted(labels)
+    errors = get_emitter().emit_all(labels)
+    EmittedLabel.record(
+        [label for label, error in zip(labels, errors, strict=True) if error is None]
     )
+    return {post.pk for (post, _), error in zip(labels, errors, strict=True) if error}
+
+
+def label_posts(
+    cursor_state: LabelerCursorState, chunk_size: int = FEEDGEN_LABELER_CHUNK_SIZE
+) -> int:
+    """Label the posts after the cursor, in chunks of posts ordered by creation.
+
+    The labels of a chunk are emitted concurrently. The cursor is then advanced up
+    to the first post whose label failed, and saved, so an interrupted pass
+    resumes after the last post labelled.
+
+    Args:
+        cursor_state (LabelerCursorState): The cursor of the labeler.
+        chunk_size (int): Number of posts read per query.
+
+    Returns:
+        int: The number of posts processed.
 
-    # Apply headers to redirect the event to the labeler from the PDS
-    headers = {"atproto-proxy": f"{FEEDGEN_PUBLISHER_DID}#atproto_labeler"}
+    Raises:
+        LabelEmissionError: Labels of the chunk failed after all retries.
+    """
+    processed = 0
+    while True:
+        chunk = cursor_state.pending_posts().only(*LABELER_POST_FIELDS)[:chunk_size]
+        posts = list(chunk)
+        failed = emit_labels(posts)
+
+        count = 0
+        for post in posts:
+            if post.pk in failed:
+                break
+            cursor_state.advance(post)
+            count += 1
+        if count:
+            cursor_state.save(update_fields=["cursor", "cursor_key"])
+            processed += count
+        logger.debug(f"Processed {count} posts, cursor at {cursor_state.cursor}")
+
+        if failed:
+            raise LabelEmissionError(f"Failed to label {len(failed)} posts")
+        if len(posts) < chunk_size:
+            return processed
+
+
+def label_outbox(chunk_size: int = FEEDGEN_LABELER_CHUNK_SIZE) -> int:
+    """Label the posts of the outbox, in the order they were indexed.
+
+    Entries are deleted up to the first post whose label failed, so failed posts
+    are retried first on the next call.
+
+    Args:
+        chunk_size (int): Number of outbox entries read per query.
+
+    Returns:
+        int: The number of posts processed.
 
-    # Emit the event
-    client.tools.ozone.moderation.emit_event(data=event, headers=headers)
+    Raises:
+        LabelEmissionError: Labels of the chunk failed after all retries.
+    """
+    processed = 0
+    while True:
+        entries = list(
+            PostOutbox.objects.order_by("id").values_list("id", "post_key")[:chunk_size]
+        )
+        # Posts deleted since they were indexed are skipped
+        posts_by_key = Post.objects.only(*LABELER_POST_FIELDS).in_bulk(
+            [key for _, key in entries]
+        )
+        failed = emit_labels(list(posts_by_key.values()))
+
+        done = []
+        for entry_id, key in entries:
+            if key in failed:
+                break
+            done.append(entry_id)
+        if done:
+            PostOutbox.objects.filter(id__in=done).delete()
+            processed += len(done)
+
+        if failed:
+            raise LabelEmissionError(f"Failed to label {len(failed)} posts")
+        if len(entries) < chunk_size:
+            return processed
 
 
 def run(reset: bool = False):
@@ -79,22 +180,29 @@ def run(reset: bool = False):
     )
 
     # Reset the cursor state if requested
-    if reset or cursor_state.cursor is None:
-        cursor_state.cursor = datetime.min
-
+    if reset:
+        cursor_state.reset()
+
+    if not FEEDGEN_LABELER_OUTBOX:
+        # Scan the post table for new posts every minute
+        while True:
+            try:
+                label_posts(cursor_state)
+            except Exception as e:
+                logger.exception(e)
+            time.sleep(60)
+
+    listener = OutboxListener()
     while True:
         try:
-            posts = Post.objects.filter(created_at__gt=cursor_state.cursor)
-            logger.debug(f"Processing {posts.count()} posts")
-
-            for post in posts:
-                # Update cursor state
-                cursor_state.cursor = post.created_at
-                # process post
-                if has_political_content(post):
-                    raise_label_event(post, SKPoliLabels.POLITICAL_CONTENT)
-
-            cursor_state.save()
+            # Posts indexed before the outbox was read are only labelled on reset,
+            # retried until the scan succeeds
+            if reset:
+                label_posts(cursor_state)
+                reset = False
+            processed = label_outbox()
+            if processed:
+                logger.debug(f"Processed {processed} posts from the outbox")
         except Exception as e:
             logger.exception(e)
-        time.sleep(60)
+        listener.wait(FEEDGEN_LABELER_POLL_INTERVAL)
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from flatlanders.retention import PartitioningError, convert_to_partitioned
+from flatlanders.settings import FEEDGEN_POST_PARTITION_INTERVAL
+
+
+class Command(BaseCommand):
+    help = "Converts the post table to a table range partitioned by creation date (Postgres only)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            choices=("month", "week"),
+            default=FEEDGEN_POST_PARTITION_INTERVAL,
+            help="Time range covered by each partition.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            convert_to_partitioned(options["interval"])
+        except PartitioningError as e:
+            raise CommandError(str(e)) from e
+        self.stdout.write(self.style.SUCCESS("Post table is now partitioned."))
@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from common.profiling import ProfilerNotInstalledError, request_profile
+from flatlanders.settings import FEEDGEN_PROFILE_DIR, FEEDGEN_PROFILE_SECONDS
+
+
+class Command(BaseCommand):
+    help = (
+        "Profiles running indexer, labeler or server worker processes for a while, "
+        "and writes their cProfile stats and tracemalloc snapshots."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("pids", nargs="+", type=int, help="Processes to profile.")
+        parser.add_argument(
+            "--seconds",
+            type=float,
+            default=FEEDGEN_PROFILE_SECONDS,
+            help="Duration of the profiles.",
+        )
+        parser.add_argument(
+            "--no-wait",
+            action="store_true",
+            help="Exit once the profiles are started, without waiting for them.",
+        )
+
+    def handle(self, *args, **options):
+        seconds = options["seconds"]
+        stems = []
+        for pid in options["pids"]:
+            try:
+                stems.append(request_profile(pid, FEEDGEN_PROFILE_DIR, seconds))
+            except ProcessLookupError:
+                raise CommandError(f"No process with PID {pid}") from None
+            except ProfilerNotInstalledError as error:
+                raise CommandError(str(error)) from None
+            self.stdout.write(f"Profiling process {pid} for {seconds:.0f}s")
+
+        if options["no_wait"]:
+            return
+
+        # Writing the memory snapshot can take a while in a large process
+        deadline = time.monotonic() + seconds + 60
+        pending = {stem.with_suffix(".prof"): stem for stem in stems}
+        while pending and time.monotonic() < deadline:
+            time.sleep(0.5)
+            for stats in [stats for stats in pending if stats.exists()]:
+                snapshot = pending.pop(stats).with_suffix(".tracemalloc")
+                self.stdout.write(self.style.SUCCESS(f"Wrote {stats} and {snapshot}"))
+        if pending:
+            raise CommandError(
+                f"Timed out waiting for {', '.join(map(str, pending))}, check that "
+                "the processes installed the profiler"
+            )
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from flatlanders.retention import PostPruner
+from flatlanders.settings import FEEDGEN_POST_RETENTION_DAYS
+
+
+class Command(BaseCommand):
+    help = "Removes posts older than the retention period."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=FEEDGEN_POST_RETENTION_DAYS,
+            help="Retention period in days. Defaults to FEEDGEN_POST_RETENTION_DAYS.",
+        )
+
+    def handle(self, *args, **options):
+        deleted = PostPruner(retention_days=options["days"]).prune()
+        self.stdout.write(f"Deleted {deleted} expired posts.")
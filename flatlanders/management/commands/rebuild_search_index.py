@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from flatlanders.search import create_search_index
+
+
+class Command(BaseCommand):
+    help = "Recreates the full-text index of post text and indexes every post."
+
+    def handle(self, *args, **options):
+        create_search_index()
+        self.stdout.write(self.style.SUCCESS("Rebuilt the post search index."))
@@ -0,0 +1,106 @@
+import random
+import uuid
+from collections import deque
+from datetime import UTC, datetime, timedelta
+
+from django.core.management.base import BaseCommand
+
+from flatlanders.algorithms.flatlanders_feed import FlatlandersAlgorithm
+from flatlanders.ingest import write_posts
+from flatlanders.keywords import SASK_WORDS
+from flatlanders.models.posts import FeedEntry, Post, uri_key
+
+WORDS = (
+    "the a and of to in is it that for on with this was at by from prairie wheat "
+    "canola harvest storm winter coffee hockey game river bridge highway news "
+    "city council weather sunset field farm school bus road team"
+).split()
+
+
+class Command(BaseCommand):
+    help = "Seeds the database with a synthetic distribution of posts for benchmarks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=1_000_000)
+        parser.add_argument("--batch-size", type=int, default=5_000)
+        parser.add_argument("--authors", type=int, default=50_000)
+        parser.add_argument(
+            "--days", type=int, default=365, help="Span of the post timestamps."
+        )
+        parser.add_argument(
+            "--burst-ratio",
+            type=float,
+            default=0.05,
+            help="Share of posts that start a burst of identical timestamps.",
+        )
+        parser.add_argument("--reply-ratio", type=float, default=0.3)
+        parser.add_argument("--delete-ratio", type=float, default=0.02)
+        parser.add_argument("--seed", type=int, default=None)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        count = options["count"]
+        batch_size = options["batch_size"]
+
+        # Unique prefix so repeated runs never collide on the post URIs
+        run_id = uuid.uuid4().hex[:8]
+        sask_words = sorted(SASK_WORDS)
+        feed = FlatlandersAlgorithm().name
+
+        now = datetime.now(tz=UTC)
+        created_at = now - timedelta(days=options["days"])
+        mean_step = options["days"] * 86400 / count
+
+        # (uri, thread root) of recent posts that replies can point to
+        recent_posts: deque[tuple[str, str]] = deque(maxlen=1000)
+        burst_left = 0
+        created = deleted = 0
+
+        while created < count:
+            batch = []
+            to_delete = []
+            for _ in range(min(batch_size, count - created)):
+                # Bursts of posts share the exact same timestamp
+                if burst_left:
+                    burst_left -= 1
+                else:
+                    created_at += timedelta(seconds=rng.expovariate(1 / mean_step))
+                    if rng.random() < options["burst_ratio"]:
+                        burst_left = rng.randint(1, 20)
+
+                author = f"did:plc:seed{rng.randrange(options['authors']):08d}"
+                uri = f"at://{author}/app.bsky.feed.post/{run_id}{created:010x}"
+
+                reply_parent = reply_root = None
+                if recent_posts and rng.random() < options["reply_ratio"]:
+                    reply_parent, reply_root = rng.choice(recent_posts)
+
+                text = " ".join(rng.choices(WORDS, k=rng.randint(3, 50)))
+                if rng.random() < 0.5:
+                    text = f"{text} {rng.choice(sask_words)}"
+
+                batch.append(
+                    Post(
+                        uri=uri,
+                        cid=f"bafyrei{uuid.UUID(int=rng.getrandbits(128)).hex}",
+                        author_did=author,
+                        text=text,
+                        reply_parent=reply_parent,
+                        reply_root=reply_root,
+                        created_at=min(created_at, now),
+                        is_community_match=True,
+                    )
+                )
+                if rng.random() < options["delete_ratio"]:
+                    to_delete.append(uri_key(uri))
+
+                recent_posts.append((uri, reply_root or uri))
+                created += 1
+
+            write_posts((post, [feed]) for post in batch)
+            if to_delete:
+                FeedEntry.objects.filter(post_key__in=to_delete).delete()
+                deleted += Post.objects.filter(pk__in=to_delete).delete()[0]
+            self.stdout.write(f"Created {created}/{count} posts, deleted {deleted}")
+
+        self.stdout.write(self.style.SUCCESS(f"Seeded {created - deleted} posts."))
@@ -2,7 +2,9 @@ import logging
 
 from django.core.management.base import BaseCommand
 
+from common.profiling import OnDemandProfiler
 from flatlanders.labelers import run
+from flatlanders.settings import FEEDGEN_PROFILE_DIR, FEEDGEN_PROFILE_SECONDS
 
 logger = logging.getLogger("labeler")
 
@@ -19,5 +21,8 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
+        OnDemandProfiler(
+            "labeler", FEEDGEN_PROFILE_DIR, FEEDGEN_PROFILE_SECONDS
+        ).install()
         run(options["reset"])
 
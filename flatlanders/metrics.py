@@ -0,0 +1,28 @@
+"""Metrics of the indexing of posts and engagement, see `common.metrics`."""
+
+from common.metrics import REGISTRY, SIZE_BUCKETS
+
+POSTS_INDEXED = REGISTRY.counter(
+    "feedgen_posts_indexed_total",
+    "Posts indexed, by the rule they matched (keyword or author)",
+    ("match",),
+)
+POSTS_FILTERED = REGISTRY.counter(
+    "feedgen_posts_filtered_total",
+    "Created posts that were not indexed, by reason",
+    ("reason",),
+)
+POSTS_DELETED = REGISTRY.counter(
+    "feedgen_posts_deleted_total", "Indexed posts deleted by their author"
+)
+DB_WRITE_SECONDS = REGISTRY.histogram(
+    "feedgen_db_write_seconds",
+    "Duration of the database writes of the indexer, by operation",
+    ("operation",),
+)
+WRITE_BATCH_SIZE = REGISTRY.histogram(
+    "feedgen_write_batch_size",
+    "Number of posts written per batch, by kind of batch",
+    ("kind",),
+    buckets=SIZE_BUCKETS,
+)
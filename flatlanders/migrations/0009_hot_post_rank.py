@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flatlanders', '0008_apply_author_dids'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='created_at',
+            field=models.DateTimeField(db_index=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='HotPostRank',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('snapshot', models.PositiveIntegerField()),
+                ('rank', models.PositiveIntegerField()),
+                ('uri', models.CharField(max_length=255)),
+                ('score', models.FloatField()),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('snapshot', 'rank'), name='unique_hot_post_rank')],
+            },
+        ),
+    ]
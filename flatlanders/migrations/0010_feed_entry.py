@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:22
+
+from django.db import migrations, models
+
+# Every post indexed so far belongs to the chronological flatlanders feed
+BACKFILL_FEED_ENTRIES = """
+INSERT INTO flatlanders_feedentry (feed, created_at, uri, cid)
+SELECT 'flatlanders_jetstream', COALESCE(created_at, indexed_at), uri, cid
+FROM flatlanders_post
+"""
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flatlanders', '0009_hot_post_rank'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('feed', models.CharField(max_length=64)),
+                ('created_at', models.DateTimeField()),
+                ('uri', models.CharField(db_index=True, max_length=255)),
+                ('cid', models.CharField(max_length=255)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['feed', '-created_at'], name='feed_entry_page_idx')],
+                'constraints': [models.UniqueConstraint(fields=('feed', 'uri'), name='unique_feed_entry')],
+            },
+        ),
+        migrations.RunSQL(
+            BACKFILL_FEED_ENTRIES,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
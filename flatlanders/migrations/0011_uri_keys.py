@@ -0,0 +1,203 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:05
+
+import hashlib
+
+from django.db import migrations, models
+
+import flatlanders.models.posts
+
+BATCH_SIZE = 5000
+
+
+def uri_key(uri):
+    """The key of a URI, frozen copy of `flatlanders.models.posts.uri_key`."""
+    digest = hashlib.blake2b(uri.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def populate_keys(apps, schema_editor):
+    """Compute the key of every record from its URI, in batches."""
+    for model_name, field in (
+        ("Post", "id"),
+        ("Follow", "id"),
+        ("FeedEntry", "post_key"),
+    ):
+        model = apps.get_model("flatlanders", model_name)
+        batch = []
+        for instance in model.objects.only("pk", "uri").iterator(chunk_size=BATCH_SIZE):
+            setattr(instance, field, uri_key(instance.uri))
+            batch.append(instance)
+            if len(batch) == BATCH_SIZE:
+                model.objects.bulk_update(batch, [field])
+                batch = []
+        model.objects.bulk_update(batch, [field])
+
+
+def is_partitioned(schema_editor, table):
+    """Whether `table` was converted to a partitioned table by `partition_posts`."""
+    if schema_editor.connection.vendor != "postgresql":
+        return False
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = %s",
+            [table],
+        )
+        return cursor.fetchone() is not None
+
+
+def drop_uri_primary_keys(apps, schema_editor):
+    """Drop the primary keys and indexes on the URI columns.
+
+    Postgres cannot add the new primary keys while the URI primary keys exist,
+    while SQLite drops them when the tables are rebuilt with the new keys.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    quote = schema_editor.quote_name
+    for model_name in ("Post", "Follow"):
+        table = apps.get_model("flatlanders", model_name)._meta.db_table
+        with schema_editor.connection.cursor() as cursor:
+            constraints = schema_editor.connection.introspection.get_constraints(
+                cursor, table
+            )
+        partitioned = is_partitioned(schema_editor, table)
+        for name, constraint in constraints.items():
+            if partitioned and constraint["primary_key"]:
+                # (uri, created_at), partitioned tables need the partition key
+                schema_editor.execute(
+                    f"ALTER TABLE {quote(table)} DROP CONSTRAINT {quote(name)}"
+                )
+            elif constraint["columns"] != ["uri"]:
+                continue
+            elif constraint["primary_key"]:
+                schema_editor.execute(
+                    f"ALTER TABLE {quote(table)} DROP CONSTRAINT {quote(name)}"
+                )
+            elif constraint["index"]:
+                schema_editor.execute(f"DROP INDEX {quote(name)}")
+
+
+class AlterPostField(migrations.AlterField):
+    """Alters a post field, keeping the post table partitioned if it is.
+
+    Unique constraints of a partitioned table must include the partition key, so
+    on a table partitioned by `created_at` the primary key becomes
+    (id, created_at) and the URI gets a plain index, as `convert_to_partitioned`
+    does for tables partitioned after this migration.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        table = model._meta.db_table
+        if not is_partitioned(schema_editor, table):
+            return super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+
+        quote = schema_editor.quote_name
+        field = model._meta.get_field(self.name)
+        if field.primary_key:
+            schema_editor.execute(
+                f"ALTER TABLE {quote(table)} ALTER COLUMN {quote(field.column)} "
+                "SET NOT NULL"
+            )
+            schema_editor.execute(
+                f"ALTER TABLE {quote(table)} "
+                f"ADD PRIMARY KEY ({quote(field.column)}, created_at)"
+            )
+        elif field.unique:
+            schema_editor.execute(
+                f"CREATE INDEX ON {quote(table)} ({quote(field.column)})"
+            )
+        else:
+            raise RuntimeError(
+                f"Unsupported table layout: {table} is partitioned, and only its "
+                f"primary key and unique fields can be migrated, not {self.name}"
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flatlanders', '0010_feed_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='id',
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='follow',
+            name='id',
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='feedentry',
+            name='post_key',
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.RunPython(populate_keys, reverse_code=migrations.RunPython.noop),
+        # Move the primary keys from the URIs to the keys
+        migrations.RunPython(drop_uri_primary_keys, reverse_code=migrations.RunPython.noop),
+        AlterPostField(
+            model_name='post',
+            name='id',
+            field=flatlanders.models.posts.URIKeyField(editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='post',
+                    name='uri',
+                    field=models.CharField(max_length=255),
+                ),
+            ],
+        ),
+        AlterPostField(
+            model_name='post',
+            name='uri',
+            field=models.CharField(max_length=255, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='follow',
+            name='id',
+            field=flatlanders.models.posts.URIKeyField(editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='follow',
+                    name='uri',
+                    field=models.CharField(max_length=255),
+                ),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='follow',
+            name='uri',
+            field=models.CharField(max_length=255, unique=True),
+        ),
+        # Feed entries reference posts by key
+        migrations.RemoveConstraint(
+            model_name='feedentry',
+            name='unique_feed_entry',
+        ),
+        migrations.AlterField(
+            model_name='feedentry',
+            name='post_key',
+            field=models.BigIntegerField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='feedentry',
+            name='uri',
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AddConstraint(
+            model_name='feedentry',
+            constraint=models.UniqueConstraint(fields=('feed', 'post_key'), name='unique_feed_entry'),
+        ),
+    ]
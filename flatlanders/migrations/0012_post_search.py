@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:10
+
+from django.db import migrations
+
+# Frozen copies of the statements of `flatlanders.search.create_search_index`
+SEARCH_INDEX = "flatlanders_post_text_search"
+FTS_TABLE = "flatlanders_post_fts"
+
+POSTGRES_INDEX_SQL = [
+    f"DROP INDEX IF EXISTS {SEARCH_INDEX}",
+    f"CREATE INDEX {SEARCH_INDEX} ON flatlanders_post "
+    "USING GIN (to_tsvector('english'::regconfig, COALESCE(text, '')))",
+]
+
+SQLITE_INDEX_SQL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+    "USING fts5(text, content='flatlanders_post', content_rowid='id')",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_insert",
+    f"CREATE TRIGGER {FTS_TABLE}_insert AFTER INSERT ON flatlanders_post BEGIN "
+    f"INSERT INTO {FTS_TABLE} (rowid, text) VALUES (new.id, new.text); END",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_delete",
+    f"CREATE TRIGGER {FTS_TABLE}_delete AFTER DELETE ON flatlanders_post BEGIN "
+    f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, text) "
+    f"VALUES ('delete', old.id, old.text); END",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_update",
+    f"CREATE TRIGGER {FTS_TABLE}_update AFTER UPDATE OF text ON flatlanders_post "
+    f"BEGIN INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, text) "
+    f"VALUES ('delete', old.id, old.text); "
+    f"INSERT INTO {FTS_TABLE} (rowid, text) VALUES (new.id, new.text); END",
+    # Index the posts that already exist
+    f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        statements = POSTGRES_INDEX_SQL
+    else:
+        statements = SQLITE_INDEX_SQL
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {SEARCH_INDEX}")
+        return
+    for trigger in ("insert", "delete", "update"):
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{trigger}")
+    schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("flatlanders", "0011_uri_keys"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, reverse_code=drop_index),
+    ]
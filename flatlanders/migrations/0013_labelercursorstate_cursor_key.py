@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("flatlanders", "0012_post_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="labelercursorstate",
+            name="cursor_key",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("flatlanders", "0013_labelercursorstate_cursor_key"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PostOutbox",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("post_key", models.BigIntegerField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("flatlanders", "0014_post_outbox"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EmittedLabel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("uri", models.CharField(max_length=255)),
+                ("cid", models.CharField(max_length=255)),
+                ("label", models.CharField(max_length=64)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("uri", "cid", "label"), name="unique_emitted_label"
+                    )
+                ],
+            },
+        ),
+    ]
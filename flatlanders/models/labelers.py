@@ -1,6 +1,9 @@
 from enum import StrEnum
 
 from django.db import models
+from django.db.models import Q, QuerySet
+
+from flatlanders.models.posts import Post
 
 
 class SKPoliLabels(StrEnum):
@@ -19,6 +22,91 @@ class LabelerCursorState(models.Model):
 
     labeler_service = models.CharField(max_length=255, unique=True)
     cursor = models.DateTimeField(blank=True, null=True)
+    # Key of the last post processed, orders posts created at the same time
+    cursor_key = models.BigIntegerField(blank=True, null=True)
 
     def __str__(self):
         return f"{self.labeler_service} - {self.cursor.isoformat() if self.cursor else None}"
+
+    def pending_posts(self) -> QuerySet:
+        """Returns the posts after the cursor, ordered by (created_at, key)."""
+        posts = Post.objects.filter(created_at__isnull=False)
+        if self.cursor is not None:
+            after = Q(created_at__gt=self.cursor)
+            if self.cursor_key is not None:
+                after |= Q(created_at=self.cursor, pk__gt=self.cursor_key)
+            posts = posts.filter(after)
+        return posts.order_by("created_at", "pk")
+
+    def advance(self, post: Post) -> None:
+        """Moves the cursor past a processed post."""
+        self.cursor = post.created_at
+        self.cursor_key = post.pk
+
+    def reset(self) -> None:
+        """Moves the cursor before the earliest post."""
+        self.cursor = None
+        self.cursor_key = None
+
+
+class EmittedLabel(models.Model):
+    """Ledger of the label events emitted on posts.
+
+    Checked before emitting, so that labels are not emitted again when the
+    labeler is reset or restarts in the middle of a chunk.
+    """
+
+    # The URI of the labelled post
+    uri = models.CharField(max_length=255)
+    # The CID of the labelled post
+    cid = models.CharField(max_length=255)
+    # The label value
+    label = models.CharField(max_length=64)
+    # The date the label was emitted
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [  # noqa: RUF012
+            models.UniqueConstraint(
+                fields=["uri", "cid", "label"], name="unique_emitted_label"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.label} - {self.uri}"
+
+    @classmethod
+    def exclude_emitted(cls, labels: list[tuple[Post, str]]) -> list[tuple[Post, str]]:
+        """Returns the labels that were not emitted yet, with one query.
+
+        Args:
+            labels (list[tuple[Post, str]]): The posts and the label to apply.
+
+        Returns:
+            list[tuple[Post, str]]: The labels missing from the ledger.
+        """
+        if not labels:
+            return []
+        emitted = set(
+            cls.objects.filter(
+                uri__in={post.uri for post, _ in labels},
+                label__in={label for _, label in labels},
+            ).values_list("uri", "cid", "label")
+        )
+        return [
+            (post, label)
+            for post, label in labels
+            if (post.uri, post.cid, label) not in emitted
+        ]
+
+    @classmethod
+    def record(cls, labels: list[tuple[Post, str]]) -> None:
+        """Adds emitted labels to the ledger.
+
+        Args:
+            labels (list[tuple[Post, str]]): The posts and the label applied.
+        """
+        cls.objects.bulk_create(
+            [cls(uri=post.uri, cid=post.cid, label=label) for post, label in labels],
+            ignore_conflicts=True,
+        )
\ No newline at end of file
@@ -1,23 +1,53 @@
 """This module contains the models for the flatlanders app."""
 
+import hashlib
 import logging
+from collections.abc import Iterable
 
-from django.db import models
+from asgiref.sync import sync_to_async
+from django.db import connection, models, transaction
 
 from common.models import JetstreamEventWrapper
 from flatlanders.models.users import RegisteredUser
+from flatlanders.settings import FEEDGEN_LABELER_OUTBOX
 
 logger = logging.getLogger("feed")
 
 
+def uri_key(uri: str) -> int:
+    """Returns the surrogate key of a record URI.
+
+    The key is a signed 64-bit hash of the URI, so it can be computed from a URI
+    without querying the database.
+
+    Args:
+        uri (str): The URI of the record
+
+    Returns:
+        int: The key of the record
+    """
+    digest = hashlib.blake2b(uri.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class URIKeyField(models.BigIntegerField):
+    """Primary key holding the `uri_key` of the record URI, set when saved."""
+
+    def get_pk_value_on_save(self, instance):
+        return uri_key(instance.uri)
+
+
 class Record(models.Model):
     """Represents a generic record from a user"""
 
+    # Compact key of the record, derived from its URI
+    id = URIKeyField(primary_key=True, editable=False)
+
     # The CID of the post
     cid = models.CharField(max_length=255, null=True)  # noqa: DJ001
 
     # The URI of the record
-    uri = models.CharField(max_length=255, primary_key=True)
+    uri = models.CharField(max_length=255, unique=True)
 
     class Meta:
         abstract = True
@@ -34,6 +64,21 @@ class Follow(Record):
     author = models.TextField()
 
 
+class PostQuerySet(models.QuerySet):
+    """Deletes the feed entries of posts along with the posts."""
+
+    def delete(self):
+        # Feed entries reference posts by key, without a foreign key to cascade
+        with transaction.atomic(using=self.db):
+            FeedEntry.objects.using(self.db).filter(
+                post_key__in=self.values("pk")
+            ).delete()
+            return super().delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 class Post(Record):
     """Represents a post from a user"""
 
@@ -55,7 +100,7 @@ class Post(Record):
     # The root of the post
     reply_root = models.CharField(max_length=255, null=True)  # noqa: DJ001
     # The date the post was created
-    created_at = models.DateTimeField(null=True)
+    created_at = models.DateTimeField(null=True, db_index=True)
     # The date the post was indexed
     indexed_at = models.DateTimeField(auto_now_add=True)
     # number of reposts
@@ -65,34 +110,170 @@ class Post(Record):
     # Whether or not the post matched the algorithm
     is_community_match = models.BooleanField(default=False)
 
+    objects = PostQuerySet.as_manager()
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            FeedEntry.objects.filter(post_key=self.pk).delete()
+            return super().delete(*args, **kwargs)
+
+    @classmethod
+    def from_event(
+        cls,
+        post_record: JetstreamEventWrapper,
+        is_community_match: bool,
+        author: RegisteredUser | None = None,
+    ) -> "Post":
+        """Builds an unsaved Post object from a firehose record.
+
+        Args:
+            post_record (CreatedRecordOperation[MainPost]): Record object from firehose
+            is_community_match (bool): Wether or not the post matched the algorithm
+            author (RegisteredUser): Author of the post
+
+        Returns:
+            Post: The unsaved post instance
+        """
+        return cls(
+            uri=post_record.uri,
+            cid=str(post_record.cid),
+            author=author,
+            author_did=post_record.author,
+            text=post_record.text,
+            created_at=post_record.created_at,
+            reply_parent=post_record.reply_parent,
+            reply_root=post_record.reply_root,
+            is_community_match=is_community_match,
+        )
+
     @classmethod
     async def afrom_event(
         cls,
         post_record: JetstreamEventWrapper,
         is_community_match: bool,
         author: RegisteredUser | None = None,
+        feeds: Iterable[str] = (),
     ):
         """Creates a Post object from a firehose record.
 
+        The post and its entries in the given feeds are written in one transaction.
+
         Args:
             post_record (CreatedRecordOperation[MainPost]): Record object from firehose
             is_community_match (bool): Wether or not the post matched the algorithm
             author (RegisteredUser): Author of the post
+            feeds (Iterable[str]): Names of the feeds the post belongs to
 
         Returns:
-            Post: The post instance
+            Post | None: The post instance, or None if it could not be created
         """
+        post = cls.from_event(post_record, is_community_match, author)
         try:
-            await cls.objects.acreate(
-                uri=post_record.uri,
-                cid=str(post_record.cid),
-                author=author,
-                author_did=post_record.author,
-                text=post_record.text,
-                created_at=post_record.created_at,
-                reply_parent=post_record.reply_parent,
-                reply_root=post_record.reply_root,
-                is_community_match=is_community_match,
-            )
+            await sync_to_async(post._insert_with_feed_entries)(feeds)
+            return post
         except Exception as error:
             logger.error("Error creating post from record: %s", error)
+            return None
+
+    def _insert_with_feed_entries(self, feeds: Iterable[str]) -> None:
+        with transaction.atomic():
+            self.save(force_insert=True)
+            FeedEntry.objects.bulk_create(
+                FeedEntry.from_post(self, feed) for feed in feeds
+            )
+            PostOutbox.enqueue([self.pk])
+
+    @classmethod
+    async def adelete_uri(cls, uri: str) -> int:
+        """Deletes a post and its feed entries.
+
+        Args:
+            uri (str): The URI of the post to delete
+
+        Returns:
+            int: The number of deleted posts
+        """
+        return await sync_to_async(cls._delete_uri)(uri)
+
+    @classmethod
+    def _delete_uri(cls, uri: str) -> int:
+        deleted, _ = cls.objects.filter(pk=uri_key(uri)).delete()
+        return deleted
+
+
+class FeedEntry(models.Model):
+    """Represents a post in a feed.
+
+    Holds only the columns needed to serve a feed page so that feed reads never
+    touch the wide post table. A post has one entry per feed it belongs to.
+    """
+
+    # Name of the feed algorithm
+    feed = models.CharField(max_length=64)
+    # The date the post was created, or indexed if it has no creation date
+    created_at = models.DateTimeField()
+    # The key of the post
+    post_key = models.BigIntegerField(db_index=True)
+    # The URI of the post
+    uri = models.CharField(max_length=255)
+    # The CID of the post
+    cid = models.CharField(max_length=255)
+
+    class Meta:
+        constraints = [  # noqa: RUF012
+            models.UniqueConstraint(
+                fields=["feed", "post_key"], name="unique_feed_entry"
+            ),
+        ]
+        indexes = [  # noqa: RUF012
+            models.Index(fields=["feed", "-created_at"], name="feed_entry_page_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.feed} - {self.uri}"
+
+    @classmethod
+    def from_post(cls, post: Post, feed: str) -> "FeedEntry":
+        """Creates an unsaved feed entry for a post."""
+        return cls(
+            feed=feed,
+            created_at=post.created_at or post.indexed_at,
+            post_key=post.pk,
+            uri=post.uri,
+            cid=post.cid,
+        )
+
+
+class PostOutbox(models.Model):
+    """Represents a post waiting to be read by the labeler.
+
+    Written by the indexer in the transaction inserting the post, when
+    `FEEDGEN_LABELER_OUTBOX` is set, and deleted by the labeler once the post is
+    labelled. Entries are read in the order the posts were indexed.
+    """
+
+    # Name of the Postgres channel notified when posts are added to the outbox
+    CHANNEL = "flatlanders_post_outbox"
+
+    # The key of the post
+    post_key = models.BigIntegerField()
+
+    def __str__(self):
+        return str(self.post_key)
+
+    @classmethod
+    def enqueue(cls, keys: Iterable[int]) -> None:
+        """Adds posts to the outbox, and notifies the labeler on Postgres.
+
+        Does nothing unless the outbox is enabled. The notification is delivered
+        when the enclosing transaction commits.
+
+        Args:
+            keys (Iterable[int]): Keys of the inserted posts
+        """
+        if not FEEDGEN_LABELER_OUTBOX:
+            return
+        entries = cls.objects.bulk_create(cls(post_key=key) for key in keys)
+        if entries and connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(f"NOTIFY {cls.CHANNEL}")
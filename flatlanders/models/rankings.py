@@ -0,0 +1,30 @@
+"""This module contains the ranking models for the flatlanders app."""
+
+from django.db import models
+
+
+class HotPostRank(models.Model):
+    """A post's position in a snapshot of the ranked "hot" feed.
+
+    Snapshots are rebuilt periodically so that serving the hot feed is a range
+    read over (snapshot, rank) instead of scoring and sorting posts per request.
+    """
+
+    # Snapshot the rank belongs to. Higher is newer.
+    snapshot = models.PositiveIntegerField()
+    # Position in the snapshot, starting at 1
+    rank = models.PositiveIntegerField()
+    # The URI of the ranked post
+    uri = models.CharField(max_length=255)
+    # The score the post was ranked by
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [  # noqa: RUF012
+            models.UniqueConstraint(
+                fields=["snapshot", "rank"], name="unique_hot_post_rank"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.snapshot}:{self.rank} - {self.uri}"
@@ -0,0 +1,59 @@
+"""Notifications of posts added to the labeler outbox.
+
+On Postgres, the indexer notifies `PostOutbox.CHANNEL` when it adds posts to the
+outbox, and the labeler listens on a dedicated connection so that it labels posts
+as they are indexed. Other databases have no notifications, so the labeler polls
+the outbox instead.
+"""
+
+import logging
+import time
+
+import psycopg
+from django.db import connection
+
+from flatlanders.models.posts import PostOutbox
+
+logger = logging.getLogger("labeler")
+
+
+class OutboxListener:
+    """Waits for posts to be added to the outbox."""
+
+    def __init__(self) -> None:
+        self._connection: psycopg.Connection | None = None
+
+    def wait(self, timeout: float) -> bool:
+        """Block until posts are added to the outbox, or the timeout expires.
+
+        Args:
+            timeout (float): Maximum number of seconds to wait.
+
+        Returns:
+            bool: True if a notification was received.
+        """
+        if connection.vendor != "postgresql":
+            time.sleep(timeout)
+            return False
+
+        try:
+            return bool(list(self._listen().notifies(timeout=timeout, stop_after=1)))
+        except psycopg.Error as error:
+            logger.warning("Error listening to the outbox, polling instead: %s", error)
+            self.close()
+            time.sleep(timeout)
+            return False
+
+    def close(self) -> None:
+        """Close the listening connection."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _listen(self) -> psycopg.Connection:
+        if self._connection is None or self._connection.closed:
+            self._connection = psycopg.connect(
+                **connection.get_connection_params(), autocommit=True
+            )
+            self._connection.execute(f"LISTEN {PostOutbox.CHANNEL}")
+        return self._connection
@@ -0,0 +1,321 @@
+"""Retention of indexed posts and range partitioning of the post table.
+
+On Postgres the post table can be converted to a table range partitioned by
+`created_at` with one partition per month or week. The interval is chosen when the
+table is converted, and later read back from the existing partitions. Expired partitions are then
+dropped (or detached, to archive them) in O(1) instead of deleting rows. Rows
+that fall outside of every partition, e.g. posts with bogus creation dates, land in
+a default partition. Unpartitioned tables, including every SQLite database, and
+the feed entry table are pruned with chunked deletes.
+"""
+
+import asyncio
+import logging
+from datetime import UTC, date, datetime, time, timedelta
+from itertools import pairwise
+
+from asgiref.sync import sync_to_async
+from django.db import connection, transaction
+from django.db.models import Q, QuerySet
+
+from flatlanders.cache import abump_feed_version
+from flatlanders.models.posts import FeedEntry, Post
+from flatlanders.search import create_search_index
+from flatlanders.settings import (
+    FEEDGEN_POST_PARTITION_INTERVAL,
+    FEEDGEN_POST_RETENTION_DAYS,
+    FEEDGEN_POST_RETENTION_MODE,
+    FEEDGEN_PRUNE_CHUNK_SIZE,
+    FEEDGEN_PRUNE_INTERVAL,
+)
+
+logger = logging.getLogger("feed")
+
+# Number of future partitions kept ready for incoming posts
+PARTITIONS_AHEAD = 2
+
+
+class PartitioningError(Exception):
+    """Raised when the post table cannot be partitioned."""
+
+
+def partition_start(day: date, interval: str = FEEDGEN_POST_PARTITION_INTERVAL) -> date:
+    """Return the first day of the partition containing a day."""
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def next_partition_start(
+    start: date, interval: str = FEEDGEN_POST_PARTITION_INTERVAL
+) -> date:
+    """Return the first day of the partition following the one starting at `start`."""
+    if interval == "week":
+        return start + timedelta(days=7)
+    return (start + timedelta(days=32)).replace(day=1)
+
+
+def partition_name(start: date) -> str:
+    """Return the table name of the partition starting at `start`."""
+    return f"{Post._meta.db_table}_p{start:%Y%m%d}"
+
+
+def _bound(day: date) -> str:
+    return f"'{datetime.combine(day, time(), tzinfo=UTC).isoformat()}'"
+
+
+def is_partitioned() -> bool:
+    """Indicate if the post table is a partitioned Postgres table."""
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = %s",
+            [Post._meta.db_table],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions() -> list[str]:
+    """Return the names of the partitions attached to the post table."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = %s",
+            [Post._meta.db_table],
+        )
+        return [name for (name,) in cursor.fetchall()]
+
+
+def _partition_starts() -> dict[str, date]:
+    """Return the first day of each dated partition of the post table, by name."""
+    prefix = f"{Post._meta.db_table}_p"
+    return {
+        name: datetime.strptime(name.removeprefix(prefix), "%Y%m%d")
+        .replace(tzinfo=UTC)
+        .date()
+        for name in list_partitions()
+        if name.startswith(prefix)
+    }
+
+
+def partition_interval(default: str = FEEDGEN_POST_PARTITION_INTERVAL) -> str:
+    """Return the interval the post table was partitioned with.
+
+    Partitions are consecutive, so weekly partitions start 7 days apart while
+    monthly ones start at least 28 days apart. `default` is returned when there
+    are not enough partitions to tell.
+    """
+    starts = sorted(_partition_starts().values())
+    gaps = [(end - start).days for start, end in pairwise(starts)]
+    if not gaps:
+        return default
+    return "week" if min(gaps) <= 7 else "month"
+
+
+def create_partition(start: date, interval: str = FEEDGEN_POST_PARTITION_INTERVAL):
+    """Create and attach the partition starting at `start`.
+
+    Rows of the new range that already landed in the default partition are moved
+    into the new partition first, otherwise attaching it would fail.
+    """
+    qn = connection.ops.quote_name
+    table = Post._meta.db_table
+    name = partition_name(start)
+    lower, upper = _bound(start), _bound(next_partition_start(start, interval))
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"CREATE TABLE {qn(name)} (LIKE {qn(table)} INCLUDING DEFAULTS)")
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {qn(table + '_default')} "
+            f"WHERE created_at >= {lower} AND created_at < {upper} RETURNING *) "
+            f"INSERT INTO {qn(name)} SELECT * FROM moved"
+        )
+        cursor.execute(
+            f"ALTER TABLE {qn(table)} ATTACH PARTITION {qn(name)} "
+            f"FOR VALUES FROM ({lower}) TO ({upper})"
+        )
+    logger.info("Created post partition %s", name)
+
+
+def ensure_partitions(
+    now: datetime | None = None, interval: str = FEEDGEN_POST_PARTITION_INTERVAL
+) -> None:
+    """Create the current partition and the next `PARTITIONS_AHEAD` ones."""
+    now = now or datetime.now(tz=UTC)
+    existing = set(list_partitions())
+    start = partition_start(now.date(), interval)
+    for _ in range(PARTITIONS_AHEAD + 1):
+        if partition_name(start) not in existing:
+            create_partition(start, interval)
+        start = next_partition_start(start, interval)
+
+
+def convert_to_partitioned(interval: str = FEEDGEN_POST_PARTITION_INTERVAL) -> None:
+    """Convert the post table to a table partitioned by `created_at`.
+
+    Postgres requires the partition key in the primary key and unique
+    constraints, so the primary key becomes (pk, created_at), unique columns only
+    keep a plain index and posts without a creation date get their indexing date.
+    The full-text index is recreated on the partitioned table.
+    The whole conversion, including copying every post, runs in a single
+    transaction.
+    """
+    if connection.vendor != "postgresql":
+        raise PartitioningError("Partitioning is only supported on Postgres")
+    if interval not in ("month", "week"):
+        raise PartitioningError(f"Unsupported partition interval: {interval}")
+    if is_partitioned():
+        raise PartitioningError("The post table is already partitioned")
+
+    qn = connection.ops.quote_name
+    table = Post._meta.db_table
+    old = f"{table}_unpartitioned"
+    pk = Post._meta.pk.column
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {qn(table)} SET created_at = indexed_at WHERE created_at IS NULL"
+        )
+        # Posts may carry bogus creation dates, so partitions start from the first
+        # indexing date and older posts land in the default partition
+        cursor.execute(f"SELECT MIN(indexed_at) FROM {qn(table)}")
+        (oldest,) = cursor.fetchone()
+
+        cursor.execute(f"ALTER TABLE {qn(table)} RENAME TO {qn(old)}")
+        cursor.execute(
+            f"CREATE TABLE {qn(table)} (LIKE {qn(old)} INCLUDING DEFAULTS) "
+            "PARTITION BY RANGE (created_at)"
+        )
+        cursor.execute(
+            f"ALTER TABLE {qn(table)} ADD PRIMARY KEY ({qn(pk)}, created_at)"
+        )
+        for field in Post._meta.local_fields:
+            if (field.db_index or field.unique) and not field.primary_key:
+                cursor.execute(f"CREATE INDEX ON {qn(table)} ({qn(field.column)})")
+        cursor.execute(
+            f"CREATE TABLE {qn(table + '_default')} PARTITION OF {qn(table)} DEFAULT"
+        )
+
+        now = datetime.now(tz=UTC)
+        start = partition_start((oldest or now).date(), interval)
+        end = next_partition_start(partition_start(now.date(), interval), interval)
+        for _ in range(PARTITIONS_AHEAD):
+            end = next_partition_start(end, interval)
+        while start < end:
+            create_partition(start, interval)
+            start = next_partition_start(start, interval)
+
+        cursor.execute(f"INSERT INTO {qn(table)} SELECT * FROM {qn(old)}")
+        cursor.execute(f"DROP TABLE {qn(old)}")
+        create_search_index()
+
+
+def drop_expired_partitions(
+    cutoff: datetime,
+    mode: str = FEEDGEN_POST_RETENTION_MODE,
+    interval: str = FEEDGEN_POST_PARTITION_INTERVAL,
+) -> int:
+    """Drop or detach partitions whose whole range is older than `cutoff`.
+
+    Returns:
+        int: The number of partitions removed from the post table.
+    """
+    qn = connection.ops.quote_name
+    table = Post._meta.db_table
+
+    removed = 0
+    for name, start in sorted(_partition_starts().items()):
+        if next_partition_start(start, interval) > cutoff.date():
+            continue
+
+        with connection.cursor() as cursor:
+            if mode == "detach":
+                cursor.execute(f"ALTER TABLE {qn(table)} DETACH PARTITION {qn(name)}")
+                logger.info("Detached post partition %s", name)
+            else:
+                cursor.execute(f"DROP TABLE {qn(name)}")
+                logger.info("Dropped post partition %s", name)
+        removed += 1
+    return removed
+
+
+def _delete_in_chunks(queryset: QuerySet, chunk_size: int) -> int:
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            pks = list(queryset.values_list("pk", flat=True)[:chunk_size])
+            if not pks:
+                return deleted
+            deleted += queryset.model.objects.filter(pk__in=pks).delete()[0]
+
+
+def delete_expired_posts(
+    cutoff: datetime, chunk_size: int = FEEDGEN_PRUNE_CHUNK_SIZE
+) -> int:
+    """Delete posts and feed entries older than `cutoff` in short transactions.
+
+    Returns:
+        int: The number of deleted posts.
+    """
+    _delete_in_chunks(FeedEntry.objects.filter(created_at__lt=cutoff), chunk_size)
+    return _delete_in_chunks(
+        Post.objects.filter(
+            Q(created_at__lt=cutoff) | Q(created_at__isnull=True, indexed_at__lt=cutoff)
+        ),
+        chunk_size,
+    )
+
+
+class PostPruner:
+    """Keeps partitions ready and removes posts older than the retention period."""
+
+    def __init__(
+        self,
+        retention_days: int = FEEDGEN_POST_RETENTION_DAYS,
+        chunk_size: int = FEEDGEN_PRUNE_CHUNK_SIZE,
+    ) -> None:
+        self._retention_days = retention_days
+        self._chunk_size = chunk_size
+
+    def prune(self, now: datetime | None = None) -> int:
+        """Run one pruning pass.
+
+        Returns:
+            int: The number of posts deleted row by row.
+        """
+        now = now or datetime.now(tz=UTC)
+        partitioned = is_partitioned()
+        if partitioned:
+            interval = partition_interval()
+            ensure_partitions(now, interval)
+
+        if not self._retention_days:
+            return 0
+
+        cutoff = now - timedelta(days=self._retention_days)
+        if partitioned:
+            drop_expired_partitions(cutoff, interval=interval)
+        # On partitioned tables this only finds rows of the default partition
+        return delete_expired_posts(cutoff, self._chunk_size)
+
+    async def start(self, interval: int = FEEDGEN_PRUNE_INTERVAL) -> None:
+        """Task that periodically prunes the post table.
+
+        Args:
+            interval (int): Seconds between pruning passes.
+        """
+        try:
+            while True:
+                try:
+                    deleted = await sync_to_async(self.prune)()
+                    if deleted:
+                        await abump_feed_version()
+                    logger.info("Pruned %d expired posts", deleted)
+                except Exception as e:
+                    logger.error("Error pruning posts: %s", e)
+                await asyncio.sleep(interval)
+        except asyncio.CancelledError:
+            pass
@@ -0,0 +1,121 @@
+"""Full-text search over the text of posts.
+
+On Postgres, posts are searched through a GIN index on the `tsvector` of their
+text. On SQLite, an FTS5 table mirrors the post text and is maintained by triggers
+on the post table. Both are maintained by the database as posts are inserted,
+updated and deleted.
+
+SQLite drops the triggers when a migration rebuilds the post table, which
+`restore_search_triggers` undoes after every `migrate`. Postgres does not carry the
+index over when the post table is partitioned, which recreates it. Both can be
+recreated by hand with the rebuild_search_index command.
+"""
+
+from django.contrib.postgres.search import SearchQuery, SearchVector
+from django.db import DEFAULT_DB_ALIAS, connection
+from django.db.models import QuerySet
+from django.db.models.expressions import RawSQL
+
+from flatlanders.models.posts import Post
+
+# Text search configuration of the Postgres index
+SEARCH_CONFIG = "english"
+
+POST_TABLE = Post._meta.db_table
+SEARCH_INDEX = "flatlanders_post_text_search"
+FTS_TABLE = "flatlanders_post_fts"
+
+# Must match the expression `SearchVector("text", config=SEARCH_CONFIG)` compiles to
+POSTGRES_INDEX_SQL = [
+    f"DROP INDEX IF EXISTS {SEARCH_INDEX}",
+    f"CREATE INDEX {SEARCH_INDEX} ON {POST_TABLE} "
+    f"USING GIN (to_tsvector('{SEARCH_CONFIG}'::regconfig, COALESCE(text, '')))",
+]
+
+SQLITE_TRIGGERS = [f"{FTS_TABLE}_{event}" for event in ("insert", "delete", "update")]
+
+SQLITE_INDEX_SQL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+    f"USING fts5(text, content='{POST_TABLE}', content_rowid='id')",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_insert",
+    f"CREATE TRIGGER {FTS_TABLE}_insert AFTER INSERT ON {POST_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE} (rowid, text) VALUES (new.id, new.text); END",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_delete",
+    f"CREATE TRIGGER {FTS_TABLE}_delete AFTER DELETE ON {POST_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, text) "
+    f"VALUES ('delete', old.id, old.text); END",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_update",
+    f"CREATE TRIGGER {FTS_TABLE}_update AFTER UPDATE OF text ON {POST_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, text) "
+    f"VALUES ('delete', old.id, old.text); "
+    f"INSERT INTO {FTS_TABLE} (rowid, text) VALUES (new.id, new.text); END",
+    # Index the posts that already exist
+    f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+
+def create_search_index(schema_editor=None) -> None:
+    """Create, or recreate, the full-text index of the post table."""
+    statements = (
+        POSTGRES_INDEX_SQL if connection.vendor == "postgresql" else SQLITE_INDEX_SQL
+    )
+    if schema_editor is not None:
+        for statement in statements:
+            schema_editor.execute(statement)
+        return
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def restore_search_triggers(using: str = DEFAULT_DB_ALIAS, **kwargs) -> None:
+    """Recreate the SQLite search triggers if a migration dropped them.
+
+    Connected to `post_migrate`. Without the triggers, posts written after a
+    migration rebuilt the post table would silently be missing from searches.
+    """
+    if using != DEFAULT_DB_ALIAS or connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name = %s OR tbl_name = %s",
+            [FTS_TABLE, POST_TABLE],
+        )
+        names = {name for (name,) in cursor.fetchall()}
+    # The search index does not exist before its migration or after reverting it
+    if FTS_TABLE in names and not names.issuperset(SQLITE_TRIGGERS):
+        create_search_index()
+
+
+def _fts5_query(query: str) -> str:
+    # Quote every term so that FTS5 operators in the query are searched literally
+    return " ".join('"{}"'.format(term.replace('"', '""')) for term in query.split())
+
+
+def search_posts(query: str, queryset: QuerySet | None = None) -> QuerySet:
+    """Filter posts to those whose text matches a search query.
+
+    Args:
+        query (str): Words to search for. On Postgres, quoted phrases, `or` and
+            `-word` exclusions are supported.
+        queryset (QuerySet | None): Posts to search, all posts by default.
+
+    Returns:
+        QuerySet: The matching posts.
+    """
+    queryset = Post.objects.all() if queryset is None else queryset
+    if connection.vendor == "postgresql":
+        return queryset.annotate(
+            search=SearchVector("text", config=SEARCH_CONFIG)
+        ).filter(
+            search=SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+        )
+
+    fts_query = _fts5_query(query)
+    if not fts_query:
+        return queryset.none()
+    return queryset.filter(
+        pk__in=RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [fts_query]
+        )
+    )
@@ -3,6 +3,7 @@ Feed gen settings
 """
 
 import os
+from pathlib import Path
 
 from dotenv import load_dotenv
 
@@ -22,6 +23,40 @@ FEEDGEN_DB_PASSWORD = os.getenv("FEEDGEN_DB_PASSWORD", "postgres")
 FEEDGEN_DB_NAME = os.getenv("FEEDGEN_DB_NAME", "feedgen")
 FEEDGEN_DB_SSL_MODE = os.getenv("FEEDGEN_DB_SSL_MODE", "require")
 FEEDGEN_DB_SSL_CERT = os.getenv("FEEDGEN_DB_SSL_CERT", "")
+
+# Postgres connection pooling. Pools are per process and sized by the role of the
+# process (server, indexer or labeler), which bin/docker_entrypoint sets.
+# Without a pool, connections are persistent and health checked instead.
+FEEDGEN_PROCESS = os.getenv("FEEDGEN_PROCESS", "server")
+FEEDGEN_DB_POOL = os.getenv("FEEDGEN_DB_POOL", "TRUE").upper() == "TRUE"
+FEEDGEN_DB_POOL_SIZES = {
+    # Concurrent async requests each run their queries in their own thread
+    "server": (2, 8),
+    # Database work of the indexer runs in a single thread, plus periodic tasks
+    "indexer": (1, 4),
+    "labeler": (1, 2),
+}
+_POOL_MIN_SIZE, _POOL_MAX_SIZE = FEEDGEN_DB_POOL_SIZES.get(FEEDGEN_PROCESS, (2, 8))
+FEEDGEN_DB_POOL_MIN_SIZE = int(os.getenv("FEEDGEN_DB_POOL_MIN_SIZE") or _POOL_MIN_SIZE)
+FEEDGEN_DB_POOL_MAX_SIZE = int(os.getenv("FEEDGEN_DB_POOL_MAX_SIZE") or _POOL_MAX_SIZE)
+FEEDGEN_DB_POOL_TIMEOUT = float(os.getenv("FEEDGEN_DB_POOL_TIMEOUT", "10"))
+FEEDGEN_DB_CONN_MAX_AGE = int(os.getenv("FEEDGEN_DB_CONN_MAX_AGE", "600"))
+
+# Read replicas, as hosts (host or host:port) for Postgres or file paths for
+# SQLite. Only reads of the XRPC routes use them, unless a replica lags behind by
+# more than the max lag (seconds).
+FEEDGEN_DB_REPLICAS = [
+    replica for replica in os.getenv("FEEDGEN_DB_REPLICAS", "").split(",") if replica
+]
+FEEDGEN_DB_REPLICA_MAX_LAG = float(os.getenv("FEEDGEN_DB_REPLICA_MAX_LAG", "5"))
+
+# SQLite. The WAL profile lets feed requests read while the indexer writes, and
+# every connection waits up to the busy timeout (seconds) for the write lock.
+FEEDGEN_SQLITE_PATH = os.getenv("FEEDGEN_SQLITE_PATH", "")
+FEEDGEN_SQLITE_WAL = os.getenv("FEEDGEN_SQLITE_WAL", "TRUE").upper() == "TRUE"
+FEEDGEN_SQLITE_CACHE_SIZE_MB = int(os.getenv("FEEDGEN_SQLITE_CACHE_SIZE_MB", "64"))
+FEEDGEN_SQLITE_MMAP_SIZE_MB = int(os.getenv("FEEDGEN_SQLITE_MMAP_SIZE_MB", "256"))
+FEEDGEN_SQLITE_BUSY_TIMEOUT = int(os.getenv("FEEDGEN_SQLITE_BUSY_TIMEOUT", "20"))
 FEEDGEN_ADMIN_DID = os.getenv("FEEDGEN_ADMIN_DID", "did:plc:cug2evrqa3nhdbvlfd2cvtky")
 FEEDGEN_PUBLISHER_DID = os.getenv("FEEDGEN_PUBLISHER_DID", "")
 
@@ -31,3 +66,72 @@ RECORD_NAME = os.getenv("RECORD_NAME", "")
 DISPLAY_NAME = os.getenv("DISPLAY_NAME", "")
 DESCRIPTION = os.getenv("DESCRIPTION", "")
 AVATAR_PATH = os.getenv("AVATAR_PATH", "")
+
+# Feed page cache. Use "file" when the indexer and server run as separate
+# processes so version bumps from the indexer invalidate the server's pages.
+FEEDGEN_CACHE_BACKEND = os.getenv("FEEDGEN_CACHE_BACKEND", "locmem")
+FEEDGEN_CACHE_LOCATION = os.getenv("FEEDGEN_CACHE_LOCATION", "")
+FEEDGEN_FEED_CACHE_TTL = int(os.getenv("FEEDGEN_FEED_CACHE_TTL", "60"))
+
+# Seconds between flushes of the aggregated like and repost counters
+FEEDGEN_ENGAGEMENT_FLUSH_INTERVAL = int(
+    os.getenv("FEEDGEN_ENGAGEMENT_FLUSH_INTERVAL", "10")
+)
+# Posts whose increments are kept while flushes fail, the smallest are dropped
+FEEDGEN_ENGAGEMENT_MAX_PENDING = int(
+    os.getenv("FEEDGEN_ENGAGEMENT_MAX_PENDING", "100000")
+)
+
+# Batched ingest. Posts of events older than the catch-up lag, e.g. while the
+# indexer replays the firehose after downtime, are written in batches (with COPY
+# on Postgres) instead of one transaction per post.
+# SQLite has a single writer, so there every post is written in batches.
+FEEDGEN_INGEST_CATCHUP_LAG = int(
+    os.getenv(
+        "FEEDGEN_INGEST_CATCHUP_LAG", "0" if FEEDGEN_DB_TYPE == "sqlite" else "30"
+    )
+)
+FEEDGEN_INGEST_BATCH_SIZE = int(os.getenv("FEEDGEN_INGEST_BATCH_SIZE", "1000"))
+FEEDGEN_INGEST_FLUSH_INTERVAL = int(os.getenv("FEEDGEN_INGEST_FLUSH_INTERVAL", "1"))
+
+# Posts read by the labeler per query. The labeler cursor is saved after each chunk.
+FEEDGEN_LABELER_CHUNK_SIZE = int(os.getenv("FEEDGEN_LABELER_CHUNK_SIZE", "1000"))
+# Label events in flight at once, events emitted per second (0 for no limit) and
+# retries of events failing with a transient error
+FEEDGEN_LABELER_CONCURRENCY = int(os.getenv("FEEDGEN_LABELER_CONCURRENCY", "8"))
+FEEDGEN_LABELER_RATE = float(os.getenv("FEEDGEN_LABELER_RATE", "10"))
+FEEDGEN_LABELER_RETRIES = int(os.getenv("FEEDGEN_LABELER_RETRIES", "3"))
+# Push newly indexed posts to the labeler through an outbox table, instead of the
+# labeler scanning the post table every minute. Only enable it when the labeler
+# runs, since the indexer fills the outbox. Postgres wakes the labeler with
+# LISTEN/NOTIFY, and the labeler also checks the outbox every poll interval
+# (seconds) in case a notification is missed, or on SQLite.
+FEEDGEN_LABELER_OUTBOX = os.getenv("FEEDGEN_LABELER_OUTBOX", "FALSE").upper() == "TRUE"
+FEEDGEN_LABELER_POLL_INTERVAL = float(
+    os.getenv(
+        "FEEDGEN_LABELER_POLL_INTERVAL", "1" if FEEDGEN_DB_TYPE == "sqlite" else "60"
+    )
+)
+
+# Ranked "hot" feed. The feed is only served and ranked when a URI is set.
+FEEDGEN_HOT_URI = os.getenv("FEEDGEN_HOT_URI")
+FEEDGEN_HOT_INTERVAL = int(os.getenv("FEEDGEN_HOT_INTERVAL", "300"))
+FEEDGEN_HOT_WINDOW_HOURS = int(os.getenv("FEEDGEN_HOT_WINDOW_HOURS", "48"))
+FEEDGEN_HOT_SIZE = int(os.getenv("FEEDGEN_HOT_SIZE", "500"))
+FEEDGEN_HOT_GRAVITY = float(os.getenv("FEEDGEN_HOT_GRAVITY", "1.8"))
+
+# Post retention. Posts older than the retention period are pruned by the
+# indexer; 0 keeps posts forever. On Postgres the post table can be range
+# partitioned by created_at (see the partition_posts command) so that expired
+# partitions are dropped, or detached with FEEDGEN_POST_RETENTION_MODE=detach.
+FEEDGEN_POST_RETENTION_DAYS = int(os.getenv("FEEDGEN_POST_RETENTION_DAYS", "0"))
+FEEDGEN_POST_RETENTION_MODE = os.getenv("FEEDGEN_POST_RETENTION_MODE", "drop")
+FEEDGEN_POST_PARTITION_INTERVAL = os.getenv("FEEDGEN_POST_PARTITION_INTERVAL", "month")
+FEEDGEN_PRUNE_INTERVAL = int(os.getenv("FEEDGEN_PRUNE_INTERVAL", "3600"))
+FEEDGEN_PRUNE_CHUNK_SIZE = int(os.getenv("FEEDGEN_PRUNE_CHUNK_SIZE", "5000"))
+
+# On-demand profiling of the indexer, labeler and server processes, started by the
+# profile_process command. Profiles last FEEDGEN_PROFILE_SECONDS by default and are
+# written to FEEDGEN_PROFILE_DIR.
+FEEDGEN_PROFILE_DIR = Path(os.getenv("FEEDGEN_PROFILE_DIR", "profiles"))
+FEEDGEN_PROFILE_SECONDS = float(os.getenv("FEEDGEN_PROFILE_SECONDS", "30"))
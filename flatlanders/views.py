@@ -1,45 +1,70 @@
+import orjson
 from django.conf import settings
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control
 from django.views import View
 
 from flatlanders.algorithms import ALGORITHMS
+from flatlanders.cache import aget_feed_page, aset_feed_page
+from flatlanders.db import pool_stats
+from flatlanders.search import search_posts
+
+# Seconds AppViews may cache the static XRPC bodies for
+STATIC_BODY_MAX_AGE = 3600
+
+# Bounds of the limit parameter of searchPosts
+SEARCH_DEFAULT_LIMIT = 25
+SEARCH_MAX_LIMIT = 100
+
+DID_JSON_BODY = orjson.dumps(
+    {
+        "@context": ["https://www.w3.org/ns/did/v1"],
+        "id": settings.FEEDGEN_SERVICE_DID,
+        "service": [
+            {
+                "id": "#bsky_fg",
+                "type": "BskyFeedGenerator",
+                "serviceEndpoint": f"https://{settings.FEEDGEN_HOSTNAME}",
+            }
+        ],
+    }
+)
+
+DESCRIBE_FEED_GENERATOR_BODY = orjson.dumps(
+    {
+        "did": settings.FEEDGEN_SERVICE_DID,
+        "feeds": [{"uri": uri} for uri in ALGORITHMS],
+    }
+)
+
+
+def static_json_response(body: bytes) -> HttpResponse:
+    """Return a precomputed JSON body that clients may cache."""
+    response = HttpResponse(body, content_type="application/json")
+    patch_cache_control(response, public=True, max_age=STATIC_BODY_MAX_AGE)
+    return response
 
 
 class DidJson(View):
     """View that gets the well known DID JSON for the feed generator"""
 
-    def get(self, _):
+    async def get(self, _):
         """Return the well known DID JSON for the feed generator"""
-
-        response_data = {
-            "@context": ["https://www.w3.org/ns/did/v1"],
-            "id": settings.FEEDGEN_SERVICE_DID,
-            "service": [
-                {
-                    "id": "#bsky_fg",
-                    "type": "BskyFeedGenerator",
-                    "serviceEndpoint": f"https://{settings.FEEDGEN_HOSTNAME}",
-                }
-            ],
-        }
-        return JsonResponse(response_data)
+        return static_json_response(DID_JSON_BODY)
 
 
 class DescribeFeedGenerator(View):
     """View that describes the feed generator"""
 
-    def get(self, _):
+    async def get(self, _):
         """Return the description of the feed generator"""
-        feeds = [{"uri": uri} for uri in ALGORITHMS]
-        response_data = {"did": settings.FEEDGEN_SERVICE_DID, "feeds": feeds}
-
-        return JsonResponse(response_data)
+        return static_json_response(DESCRIBE_FEED_GENERATOR_BODY)
 
 
 class FeedSkeleton(View):
     """View that returns the feed skeleton"""
 
-    def get(self, request):
+    async def get(self, request):
         """Return the feed skeleton for a given algorithm"""
         uri = request.GET.get("feed", None)
 
@@ -51,8 +76,54 @@ class FeedSkeleton(View):
             limit = request.GET.get("limit", "20")
             # Convert limit to int
             limit = int(limit)
-            body = ALGORITHMS[uri](cursor=cursor, limit=limit)
+            key, body = await aget_feed_page(uri, cursor, limit)
+            if body is None:
+                skeleton = await ALGORITHMS[uri](cursor=cursor, limit=limit)
+                body = orjson.dumps(skeleton)
+                await aset_feed_page(key, body)
         except ValueError as error:
             return HttpResponse(f"Malformed cursor:{error}", status=400)
 
-        return JsonResponse(body)
+        return HttpResponse(body, content_type="application/json")
+
+
+class SearchPosts(View):
+    """View that searches the text of indexed posts"""
+
+    async def get(self, request):
+        """Return the URIs of the newest posts matching a query"""
+        query = request.GET.get("q", "").strip()
+        if not query:
+            return HttpResponse("Missing query", status=400)
+
+        try:
+            limit = int(request.GET.get("limit", SEARCH_DEFAULT_LIMIT))
+            offset = int(request.GET.get("cursor") or 0)
+        except ValueError as error:
+            return HttpResponse(f"Malformed parameter:{error}", status=400)
+        if offset < 0:
+            return HttpResponse("Malformed parameter:negative cursor", status=400)
+        limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+
+        posts = search_posts(query).order_by("-created_at", "-id")
+        uris = [
+            uri
+            async for uri in posts.values_list("uri", flat=True)[
+                offset : offset + limit
+            ]
+        ]
+        body = {"posts": [{"uri": uri} for uri in uris]}
+        if len(uris) == limit:
+            body["cursor"] = str(offset + limit)
+        return HttpResponse(orjson.dumps(body), content_type="application/json")
+
+
+class DatabasePoolStats(View):
+    """View that returns the connection pool statistics of the serving process"""
+
+    async def get(self, request):
+        """Return the pool statistics to staff users"""
+        user = await request.auser()
+        if not user.is_staff:
+            return HttpResponse("Forbidden", status=403)
+        return HttpResponse(orjson.dumps(pool_stats()), content_type="application/json")
@@ -1,6 +1,7 @@
 """
 Configures the gunicorn server for SolusGuard services.
 """
+import multiprocessing
 import os
 
 loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
@@ -8,11 +9,26 @@ errorlog = os.environ.get('GUNICORN_ERROR_LOG', '-')
 accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
 
 bind = "0.0.0.0:3000"
+
+# Each uvicorn worker serves many concurrent requests on its own event loop,
+# so one worker per CPU is enough to keep every core busy.
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "uvicorn_worker.UvicornWorker")
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count()))
+
 if os.getenv("DJANGO_DEBUG", "TRUE").upper() == "TRUE":
-    workers = 2
     reload = True
 else:
-    workers = 2
+    # Import Django and the feed algorithms once in the master process
+    preload_app = True
 
 capture_output = True
-timeout = 60
\ No newline at end of file
+timeout = 60
+
+
+def post_worker_init(worker):
+    # Workers profile themselves on demand, see the profile_process command. The
+    # handler is installed once gunicorn has set up the signals of the worker.
+    from common.profiling import OnDemandProfiler
+    from flatlanders.settings import FEEDGEN_PROFILE_DIR, FEEDGEN_PROFILE_SECONDS
+
+    OnDemandProfiler("server", FEEDGEN_PROFILE_DIR, FEEDGEN_PROFILE_SECONDS).install()
@@ -2,6 +2,7 @@
 ASGI config for sk_atp_feed project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+XRPC requests are dispatched to a handler with a minimal middleware stack.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.1/howto/deployment/asgi/
@@ -13,4 +14,14 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sk_atp_feed.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from sk_atp_feed.xrpc import XRPCASGIHandler, is_xrpc_path  # noqa: E402
+
+xrpc_application = XRPCASGIHandler()
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "http" and is_xrpc_path(scope["path"]):
+        return await xrpc_application(scope, receive, send)
+    return await django_application(scope, receive, send)
@@ -0,0 +1,138 @@
+"""
+Routing of read-only requests to database replicas.
+
+Reads only go to a replica inside `use_replica`, which `ReplicaReadMiddleware`
+enters for the safe requests of the XRPC routes. Everything else, including the
+indexer, the follower sync and the labeler, reads and writes the primary. A replica
+lagging behind the primary by more than `FEEDGEN_DB_REPLICA_MAX_LAG` seconds, or
+that cannot be reached, is skipped until its next lag check. The XRPC routes never
+write, so their reads have no writes of their own to wait for.
+"""
+
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+logger = logging.getLogger("feed")
+
+REPLICA_PREFIX = "replica_"
+
+# Seconds between two lag checks of a replica
+LAG_CHECK_INTERVAL = 5
+
+# Milliseconds a lag check may run, it runs on the request path
+LAG_CHECK_TIMEOUT = 500
+
+# Replication lag in seconds, 0 when the replica has replayed everything it received
+POSTGRES_LAG_SQL = """
+SELECT CASE
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+_read_replica: ContextVar[bool] = ContextVar("read_replica", default=False)
+
+
+@contextmanager
+def use_replica():
+    """Send the reads of the enclosed block, and of the tasks it awaits, to replicas."""
+    token = _read_replica.set(True)
+    try:
+        yield
+    finally:
+        _read_replica.reset(token)
+
+
+class ReplicaRouter:
+    """Database router sending reads inside `use_replica` to a healthy replica."""
+
+    def __init__(self) -> None:
+        self.replicas = [
+            alias for alias in settings.DATABASES if alias.startswith(REPLICA_PREFIX)
+        ]
+        self.max_lag = settings.FEEDGEN_DB_REPLICA_MAX_LAG
+        # alias -> (monotonic time of the check, healthy)
+        self._checks: dict[str, tuple[float, bool]] = {}
+
+    def db_for_read(self, model, **hints) -> str:
+        if not self.replicas or not _read_replica.get():
+            return DEFAULT_DB_ALIAS
+
+        healthy = [alias for alias in self.replicas if self.is_healthy(alias)]
+        return random.choice(healthy) if healthy else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints) -> str:
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool:
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> bool:
+        return db == DEFAULT_DB_ALIAS
+
+    def is_healthy(self, alias: str) -> bool:
+        """Indicate if a replica is reachable and within the lag threshold."""
+        now = time.monotonic()
+        checked_at, healthy = self._checks.get(alias, (None, True))
+        if checked_at is None or now - checked_at >= LAG_CHECK_INTERVAL:
+            try:
+                lag = self.replica_lag(alias)
+                healthy = lag <= self.max_lag
+                if not healthy:
+                    logger.warning(
+                        "Replica %s is %.1fs behind, skipping it", alias, lag
+                    )
+            except Exception as error:
+                healthy = False
+                logger.warning("Replica %s is unavailable: %s", alias, error)
+            self._checks[alias] = (now, healthy)
+        return healthy
+
+    def replica_lag(self, alias: str) -> float:
+        """Return the replication lag of a replica in seconds."""
+        connection = connections[alias]
+        if connection.vendor != "postgresql":
+            # Other databases, e.g. SQLite copies in local tests, have no lag to report
+            return 0.0
+        with transaction.atomic(using=alias), connection.cursor() as cursor:
+            cursor.execute(f"SET LOCAL statement_timeout = {LAG_CHECK_TIMEOUT}")
+            cursor.execute(POSTGRES_LAG_SQL)
+            return float(cursor.fetchone()[0] or 0)
+
+
+class ReplicaReadMiddleware:
+    """Serves GET and HEAD requests with `use_replica`.
+
+    Only part of the XRPC middleware stack: admin pages read from the primary so
+    they always show their own changes.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if request.method not in ("GET", "HEAD"):
+            return self.get_response(request)
+        with use_replica():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        if request.method not in ("GET", "HEAD"):
+            return await self.get_response(request)
+        with use_replica():
+            return await self.get_response(request)
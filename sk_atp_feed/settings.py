@@ -10,13 +10,14 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 
+import copy
 import os
 from pathlib import Path
 
-import sentry_sdk
 from django.core.management.utils import get_random_secret_key
 from dotenv import load_dotenv
 
+from common.sentry import init_sentry
 from flatlanders.settings import *  # noqa: F403, F401
 
 load_dotenv()
@@ -90,6 +91,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "sk_atp_feed.wsgi.application"
+ASGI_APPLICATION = "sk_atp_feed.asgi.application"
 
 
 # Database
@@ -102,9 +104,28 @@ if FEEDGEN_DB_TYPE == "sqlite":
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
-            "NAME": os.path.join(BASE_DIR, "db.sqlite3"),
+            "NAME": FEEDGEN_SQLITE_PATH or os.path.join(BASE_DIR, "db.sqlite3"),
+            "OPTIONS": {
+                "timeout": FEEDGEN_SQLITE_BUSY_TIMEOUT,
+                # Take the write lock when a transaction starts, so concurrent
+                # writers wait for the busy timeout instead of failing to upgrade
+                # their read lock
+                "transaction_mode": "IMMEDIATE",
+            },
         }
     }
+
+    if FEEDGEN_SQLITE_WAL:
+        DATABASES["default"]["OPTIONS"]["init_command"] = ";".join(
+            [
+                "PRAGMA journal_mode=WAL",
+                # Durable across application crashes, fsyncs only at checkpoints
+                "PRAGMA synchronous=NORMAL",
+                f"PRAGMA cache_size=-{FEEDGEN_SQLITE_CACHE_SIZE_MB * 1024}",
+                f"PRAGMA mmap_size={FEEDGEN_SQLITE_MMAP_SIZE_MB * 1024 * 1024}",
+                "PRAGMA temp_store=MEMORY",
+            ]
+        )
 else:
     DATABASES = {
         "default": {
@@ -114,7 +135,8 @@ else:
             "PASSWORD": FEEDGEN_DB_PASSWORD,
             "HOST": FEEDGEN_DB_HOST,
             "PORT": FEEDGEN_DB_PORT,
-            "CONN_MAX_AGE": 600,
+            "CONN_MAX_AGE": FEEDGEN_DB_CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": True,
             "DISABLE_SERVER_SIDE_CURSORS": True,
             "OPTIONS": {
                 "sslmode": FEEDGEN_DB_SSL_MODE,
@@ -124,6 +146,51 @@ else:
         }
     }
 
+    if FEEDGEN_DB_POOL:
+        # Pooled connections are returned to the pool at the end of each request,
+        # which Django only supports without persistent connections
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": FEEDGEN_DB_POOL_MIN_SIZE,
+            "max_size": FEEDGEN_DB_POOL_MAX_SIZE,
+            "timeout": FEEDGEN_DB_POOL_TIMEOUT,
+        }
+
+for index, replica in enumerate(FEEDGEN_DB_REPLICAS):
+    replica_database = copy.deepcopy(DATABASES["default"])
+    if FEEDGEN_DB_TYPE == "sqlite":
+        replica_database["NAME"] = replica
+    else:
+        host, _, port = replica.partition(":")
+        replica_database["HOST"] = host
+        replica_database["PORT"] = int(port or FEEDGEN_DB_PORT)
+        # Lag checks connect on the request path, give up on unreachable replicas
+        replica_database["OPTIONS"]["connect_timeout"] = 2
+    # Test databases read through the connection of the primary
+    replica_database["TEST"] = {"MIRROR": "default"}
+    DATABASES[f"replica_{index}"] = replica_database
+
+DATABASE_ROUTERS = ["sk_atp_feed.routers.ReplicaRouter"]
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+
+if FEEDGEN_CACHE_BACKEND == "file":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": FEEDGEN_CACHE_LOCATION or os.path.join(BASE_DIR, ".cache"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": FEEDGEN_CACHE_LOCATION or "feedgen",
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -162,20 +229,31 @@ USE_TZ = True
 
 # Logging
 # https://docs.djangoproject.com/en/4.1/topics/logging/
+# Logs are written from background threads, see common.logs. Set FEEDGEN_LOG_FORMAT
+# to "json" to write one JSON object per record.
+LOGGING_CONFIG = "common.logs.configure"
+LOG_FORMAT = os.getenv("FEEDGEN_LOG_FORMAT", "text").lower()
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
+    "formatters": {
+        "text": {},
+        "json": {"()": "common.logs.JsonFormatter"},
+    },
     "handlers": {
         "console": {
             "class": "logging.StreamHandler",
+            "formatter": LOG_FORMAT,
         },
         "server": {
             "class": "logging.FileHandler",
             "filename": "server.log",
+            "formatter": LOG_FORMAT,
         },
         "index": {
             "class": "logging.FileHandler",
             "filename": "index.log",
+            "formatter": LOG_FORMAT,
         },
     },
     "root": {
@@ -190,12 +268,12 @@ LOGGING = {
         },
         "feed": {
             "handlers": ["console", "index"],
-            "level": os.getenv("FEEDGEN_LOG_LEVEL", "DEBUG"),
+            "level": os.getenv("FEEDGEN_LOG_LEVEL", "INFO"),
             "propagate": False,
         },
         "labeler": {
             "handlers": ["console", "index"],
-            "level": os.getenv("labeler_LOG_LEVEL", "DEBUG"),
+            "level": os.getenv("labeler_LOG_LEVEL", "INFO"),
             "propagate": False,
         },
     },
@@ -214,16 +292,18 @@ STATICFILES_DIRS = [
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
-# Sentry SDK for error tracking
+# Sentry SDK for error tracking, every error is reported but only a sample of the
+# requests is traced: SENTRY_TRACES_SAMPLE_RATE of them, and no more than
+# SENTRY_MAX_TRACES_PER_SECOND a second (0 for no limit). SENTRY_PROFILES_SAMPLE_RATE
+# is the fraction of the traced requests that are also profiled.
 SENTRY_DNS = os.getenv("SENTRY_DNS")
+SENTRY_TRACES_SAMPLE_RATE = float(os.getenv("SENTRY_TRACES_SAMPLE_RATE", "0.05"))
+SENTRY_MAX_TRACES_PER_SECOND = int(os.getenv("SENTRY_MAX_TRACES_PER_SECOND", "5"))
+SENTRY_PROFILES_SAMPLE_RATE = float(os.getenv("SENTRY_PROFILES_SAMPLE_RATE", "0"))
 if SENTRY_DNS:
-    sentry_sdk.init(
-        dsn=SENTRY_DNS,
-        # Set traces_sample_rate to 1.0 to capture 100%
-        # of transactions for tracing.
-        traces_sample_rate=1.0,
-        # Set profiles_sample_rate to 1.0 to profile 100%
-        # of sampled transactions.
-        # We recommend adjusting this value in production.
-        profiles_sample_rate=1.0,
-)
\ No newline at end of file
+    init_sentry(
+        SENTRY_DNS,
+        SENTRY_TRACES_SAMPLE_RATE,
+        SENTRY_MAX_TRACES_PER_SECOND,
+        SENTRY_PROFILES_SAMPLE_RATE,
+    )
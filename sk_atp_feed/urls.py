@@ -17,9 +17,16 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import include, path
 
-from flatlanders.views import DescribeFeedGenerator, DidJson, FeedSkeleton
+from flatlanders.views import (
+    DatabasePoolStats,
+    DescribeFeedGenerator,
+    DidJson,
+    FeedSkeleton,
+    SearchPosts,
+)
 
 urlpatterns = [
+    path("admin/pool-stats/", DatabasePoolStats.as_view(), name="db_pool_stats"),
     path("admin/", admin.site.urls),
     path("", include("django.contrib.auth.urls")),
     path(".well-known/did.json", DidJson.as_view(), name="well_known_did"),
@@ -33,4 +40,7 @@ urlpatterns = [
         FeedSkeleton.as_view(),
         name="get_feed_skeleton",
     ),
+    path(
+        "xrpc/social.flatlander.searchPosts", SearchPosts.as_view(), name="search_posts"
+    ),
 ]
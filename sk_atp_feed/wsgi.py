@@ -2,6 +2,7 @@
 WSGI config for sk_atp_feed project.
 
 It exposes the WSGI callable as a module-level variable named ``application``.
+XRPC requests are dispatched to a handler with a minimal middleware stack.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.1/howto/deployment/wsgi/
@@ -13,4 +14,14 @@ from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sk_atp_feed.settings")
 
-application = get_wsgi_application()
+django_application = get_wsgi_application()
+
+from sk_atp_feed.xrpc import XRPCWSGIHandler, is_xrpc_path  # noqa: E402
+
+xrpc_application = XRPCWSGIHandler()
+
+
+def application(environ, start_response):
+    if is_xrpc_path(environ.get("PATH_INFO", "")):
+        return xrpc_application(environ, start_response)
+    return django_application(environ, start_response)
@@ -0,0 +1,58 @@
+"""
+Lightweight request handlers for the public XRPC routes.
+
+The XRPC endpoints and the well known DID document are public, unauthenticated
+JSON APIs, so they are dispatched to handlers that only run `XRPC_MIDDLEWARE`
+instead of the full `MIDDLEWARE` stack used by the admin and login pages.
+"""
+
+from importlib import import_module
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.exception import convert_exception_to_response
+from django.core.handlers.wsgi import WSGIHandler
+from django.utils.module_loading import import_string
+
+# Request paths served by the XRPC handlers
+XRPC_PATH_PREFIXES = ("/xrpc/", "/.well-known/")
+
+# Must be both sync and async capable so the async stack never hops threads
+XRPC_MIDDLEWARE = [
+    "django.middleware.security.SecurityMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "sk_atp_feed.routers.ReplicaReadMiddleware",
+]
+
+
+def is_xrpc_path(path: str) -> bool:
+    """Indicate if a request path is served by the XRPC handlers."""
+    return path.startswith(XRPC_PATH_PREFIXES)
+
+
+class XRPCHandlerMixin:
+    """Builds the middleware chain from `XRPC_MIDDLEWARE`."""
+
+    def load_middleware(self, is_async=False):
+        self._view_middleware = []
+        self._template_response_middleware = []
+        self._exception_middleware = []
+
+        get_response = self._get_response_async if is_async else self._get_response
+        handler = convert_exception_to_response(get_response)
+        for middleware_path in reversed(XRPC_MIDDLEWARE):
+            middleware = import_string(middleware_path)
+            handler = convert_exception_to_response(middleware(handler))
+
+        self._middleware_chain = handler
+
+        # Import the views now so that their static bodies are built at startup
+        import_module(settings.ROOT_URLCONF)
+
+
+class XRPCASGIHandler(XRPCHandlerMixin, ASGIHandler):
+    """ASGI handler for the XRPC routes."""
+
+
+class XRPCWSGIHandler(XRPCHandlerMixin, WSGIHandler):
+    """WSGI handler for the XRPC routes."""
@@ -0,0 +1,100 @@
+import json
+import logging
+import threading
+import time
+
+import pytest
+
+from common.logs import BackgroundHandler, JsonFormatter, RateLimitedLog
+
+
+class ListHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
+        self.emitting = threading.Event()
+        self.unblocked = threading.Event()
+        self.unblocked.set()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.emitting.set()
+        self.unblocked.wait()
+        self.records.append(record)
+
+
+@pytest.fixture
+def handler():
+    return ListHandler()
+
+
+@pytest.fixture
+def logger(handler):
+    logger = logging.getLogger("tests.logs")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.handlers = [handler]
+    yield logger
+    logger.handlers = []
+
+
+def test_rate_limited_log_summarizes_skipped_messages(logger, handler):
+    """Test that messages over the limit are counted and summarized"""
+    now = [0.0]
+    log = RateLimitedLog(logger, limit=2, interval=60, clock=lambda: now[0])
+
+    for i in range(5):
+        log.info("indexed", "Indexed %d", i)
+    log.error("failed", "Failed")
+    log.log(logging.DEBUG, "debug", "Not logged")
+    assert [record.getMessage() for record in handler.records] == [
+        "Indexed 0",
+        "Indexed 1",
+        "Failed",
+    ]
+
+    now[0] = 60
+    log.info("indexed", "Indexed %d", 5)
+    summary, message = handler.records[3:]
+    assert summary.getMessage() == "Skipped 3 of 5 indexed messages in the last 60s"
+    assert summary.skipped == 3
+    assert message.getMessage() == "Indexed 5"
+
+
+def test_background_handler_drops_records_when_full(logger, handler):
+    """Test that a blocked handler never blocks logging"""
+    handler.unblocked.clear()
+    background = BackgroundHandler([handler], maxsize=2)
+    logger.handlers = [background]
+
+    # The thread blocks on the first record, the next two fill the queue
+    logger.info("Record 0")
+    assert handler.emitting.wait(5)
+    for i in range(1, 10):
+        logger.info("Record %d", i)
+    handler.unblocked.set()
+    deadline = time.monotonic() + 5
+    while len(handler.records) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    logger.info("Last")
+    background.stop()
+
+    messages = [record.getMessage() for record in handler.records]
+    assert messages[0] == "Record 0"
+    assert messages[-2:] == ["Dropped 7 log records, the log queue was full", "Last"]
+    assert len(messages) == 5
+
+
+def test_json_formatter(logger, handler):
+    """Test that records are formatted as JSON with their extra fields"""
+    try:
+        raise ValueError("bad event")
+    except ValueError:
+        logger.exception("Error processing %s", "event", extra={"uri": "at://post"})
+
+    entry = json.loads(JsonFormatter().format(handler.records[0]))
+
+    assert entry["level"] == "ERROR"
+    assert entry["logger"] == "tests.logs"
+    assert entry["message"] == "Error processing event"
+    assert entry["uri"] == "at://post"
+    assert "ValueError: bad event" in entry["exc_info"]
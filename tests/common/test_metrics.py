@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from common.metrics import MetricsServer, Registry
+
+
+def test_registry_renders_prometheus_text():
+    """Test that metrics are rendered in the Prometheus text format"""
+    registry = Registry()
+    events = registry.counter("events_total", "Events", ("kind",))
+    lag = registry.gauge("lag_seconds", "Lag")
+    writes = registry.histogram("write_seconds", "Writes", buckets=(0.1, 1))
+
+    events.inc("like")
+    events.inc("like", amount=2)
+    lag.set(1.5)
+    writes.observe(0.05)
+    writes.observe(0.5)
+    writes.observe(5)
+
+    # Registering a metric again returns the existing metric
+    assert registry.counter("events_total", "Events", ("kind",)) is events
+    assert registry.render().splitlines() == [
+        "# HELP events_total Events",
+        "# TYPE events_total counter",
+        'events_total{kind="like"} 3',
+        "# HELP lag_seconds Lag",
+        "# TYPE lag_seconds gauge",
+        "lag_seconds 1.5",
+        "# HELP write_seconds Writes",
+        "# TYPE write_seconds histogram",
+        'write_seconds_bucket{le="0.1"} 1',
+        'write_seconds_bucket{le="1"} 2',
+        'write_seconds_bucket{le="+Inf"} 3',
+        "write_seconds_sum 5.55",
+        "write_seconds_count 3",
+    ]
+
+
+def test_gauge_callback():
+    """Test that gauges read from callbacks, and skip samples they cannot read"""
+    registry = Registry()
+    depth = registry.gauge("queue_depth", "Depth", ("queue",))
+    depth.callback = lambda: {("posts",): 4}
+    assert 'queue_depth{queue="posts"} 4' in registry.render()
+
+    depth.callback = lambda: 1 / 0
+    assert "queue_depth{" not in registry.render()
+
+
+@pytest.mark.asyncio
+async def test_metrics_server():
+    """Test that the metrics are served over HTTP"""
+    registry = Registry()
+    registry.counter("events_total", "Events").inc()
+    server = MetricsServer("127.0.0.1", 0, registry)
+    task = asyncio.create_task(server.start())
+    while server._server is None:
+        await asyncio.sleep(0.01)
+
+    async def get(path: str) -> bytes:
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        response = await reader.read()
+        writer.close()
+        return response
+
+    response = await get("/metrics")
+    assert response.startswith(b"HTTP/1.1 200 OK")
+    assert response.endswith(b"events_total 1\n")
+    assert (await get("/missing")).startswith(b"HTTP/1.1 404")
+
+    task.cancel()
+    await task
+
+
+@pytest.mark.asyncio
+async def test_metrics_server_port_in_use(caplog):
+    """Test that failing to listen is logged instead of stopping the caller"""
+    listening = await asyncio.start_server(lambda reader, writer: None, "127.0.0.1", 0)
+    port = listening.sockets[0].getsockname()[1]
+
+    async with listening:
+        await MetricsServer("127.0.0.1", port, Registry()).start()
+
+    assert "Failed to serve metrics" in caplog.text
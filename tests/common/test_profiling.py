@@ -0,0 +1,71 @@
+import os
+import pstats
+import signal
+import time
+import tracemalloc
+
+import pytest
+
+from common.profiling import (
+    PROFILE_SIGNAL,
+    OnDemandProfiler,
+    ProfilerNotInstalledError,
+    request_profile,
+)
+
+
+def allocate() -> list[str]:
+    return [str(i) * 100 for i in range(1000)]
+
+
+@pytest.fixture
+def profiler(tmp_path):
+    profiler = OnDemandProfiler("test", tmp_path, seconds=60)
+    handler = signal.getsignal(PROFILE_SIGNAL)
+    yield profiler
+    profiler.stop()
+    signal.signal(PROFILE_SIGNAL, handler)
+
+
+def test_profile_is_written_in_standard_formats(profiler, tmp_path):
+    """Test that profiles can be loaded by pstats and tracemalloc"""
+    assert profiler.stop() is None
+
+    profiler.start()
+    assert profiler.running
+    data = allocate()
+    stats_path, snapshot_path = profiler.stop()
+
+    assert not profiler.running
+    assert not tracemalloc.is_tracing()
+    assert stats_path.parent == tmp_path
+    assert stats_path.name.startswith(f"test-{os.getpid()}-")
+    functions = {function for _, _, function in pstats.Stats(str(stats_path)).stats}
+    assert "allocate" in functions
+    snapshot = tracemalloc.Snapshot.load(str(snapshot_path))
+    assert sum(stat.size for stat in snapshot.statistics("filename")) > 0
+    assert data
+
+
+def test_signal_starts_time_bounded_profile(profiler, tmp_path):
+    """Test that a profile requested by signal stops once its time is up"""
+    profiler.install()
+
+    stem = request_profile(os.getpid(), tmp_path, seconds=0.2)
+
+    assert profiler.running
+    assert not (tmp_path / f"request-{os.getpid()}.json").exists()
+    deadline = time.monotonic() + 5
+    while profiler.running and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not profiler.running
+    assert stem.with_suffix(".prof").exists()
+    assert stem.with_suffix(".tracemalloc").exists()
+
+
+def test_processes_without_profiler_are_not_signalled(profiler, tmp_path):
+    """Test that only processes advertising a profiler are asked for a profile"""
+    with pytest.raises(ProfilerNotInstalledError):
+        request_profile(os.getpid(), tmp_path, seconds=0.2)
+    assert not profiler.running
+    assert list(tmp_path.iterdir()) == []
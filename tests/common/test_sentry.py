@@ -0,0 +1,98 @@
+import time
+from contextlib import contextmanager
+
+import pytest
+
+from common.sentry import AdaptiveSampler, EventTracer
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeTransaction:
+    def __init__(self, kwargs: dict) -> None:
+        self.kwargs = kwargs
+        self.tags: dict = {}
+        self.end_timestamp: float | None = None
+
+    def set_tag(self, key: str, value) -> None:
+        self.tags[key] = value
+
+    def finish(self, end_timestamp: float | None = None) -> None:
+        self.end_timestamp = end_timestamp
+
+
+@pytest.fixture
+def transactions():
+    """Transactions started by the tracer, recorded instead of sent to Sentry"""
+    started: list[FakeTransaction] = []
+
+    @contextmanager
+    def traced(transaction):
+        yield transaction
+
+    def start_transaction(**kwargs):
+        transaction = FakeTransaction(kwargs)
+        started.append(transaction)
+        return transaction if "start_timestamp" in kwargs else traced(transaction)
+
+    return started, start_transaction
+
+
+def test_sampler_caps_transactions_per_second():
+    """Test that no more than max_per_second transactions are sampled a second"""
+    clock = FakeClock()
+    sampler = AdaptiveSampler(rate=1.0, max_per_second=3, clock=clock)
+
+    assert [sampler.should_sample() for _ in range(5)] == [True] * 3 + [False] * 2
+
+    clock.now += 1
+    assert sampler({}) == 1.0
+    assert sampler({"parent_sampled": False}) == 0.0
+
+
+def test_sampler_rate():
+    """Test that the sample rate applies when under the cap"""
+    assert not any(AdaptiveSampler(0.0, 0).should_sample() for _ in range(100))
+    assert all(AdaptiveSampler(1.0, 0).should_sample() for _ in range(100))
+
+    sampled = sum(AdaptiveSampler(0.1, 0).should_sample() for _ in range(10_000))
+    assert 700 < sampled < 1300
+
+
+def test_tracer_only_traces_sampled_and_slow_events(transactions):
+    """Test that events are traced when sampled, or after the fact when slow"""
+    started, start_transaction = transactions
+    tracer = EventTracer()
+
+    # Disabled until configured
+    with tracer.trace("jetstream.event", "app.bsky.feed.post"):
+        pass
+    assert started == []
+
+    sampler = AdaptiveSampler(rate=0.0, max_per_second=10)
+    tracer.configure(sampler, 0.01, start_transaction)
+    with tracer.trace("jetstream.event", "app.bsky.feed.post"):
+        pass
+    assert started == []
+
+    with tracer.trace("jetstream.event", "app.bsky.feed.post"):
+        time.sleep(0.02)
+    [slow] = started
+    assert slow.kwargs["name"] == "app.bsky.feed.post"
+    assert slow.tags == {"slow": True}
+    assert slow.end_timestamp - slow.kwargs["start_timestamp"] >= 0.02
+
+    sampler.rate = 1.0
+    with tracer.trace("jetstream.event", "app.bsky.feed.like"):
+        pass
+    assert started[-1].kwargs == {
+        "op": "jetstream.event",
+        "name": "app.bsky.feed.like",
+        "sampled": True,
+    }
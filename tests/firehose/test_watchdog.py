@@ -0,0 +1,122 @@
+import json
+import time
+
+import pytest
+
+from firehose.watchdog import Watchdog, WatchdogState, WatchDogTimeoutError
+
+
+class FakeClient:
+    """Stands in for a JetStreamClient receiving events"""
+
+    def __init__(self) -> None:
+        self.cursor: float | None = None
+        self.event_counter = 0
+        self.reconnections = 0
+
+    def receive(self, count: int, lag: float = 1.0) -> None:
+        self.event_counter += count
+        self.cursor = (time.time() - lag) * 1_000_000
+
+    async def reconnect(self) -> None:
+        self.reconnections += 1
+
+
+@pytest.fixture
+def client():
+    return FakeClient()
+
+
+@pytest.fixture
+def clock():
+    now = [0.0]
+
+    def advance(seconds: float) -> None:
+        now[0] += seconds
+
+    return lambda: now[0], advance
+
+
+@pytest.fixture
+def watchdog(client, clock):
+    return Watchdog(
+        client,
+        interval=10,
+        stall_seconds=30,
+        max_lag=60,
+        max_reconnects=2,
+        clock=clock[0],
+    )
+
+
+def health(watchdog: Watchdog) -> tuple[int, dict]:
+    status, content_type, body = watchdog.health()
+    assert content_type == "application/json"
+    return status, json.loads(body)
+
+
+@pytest.mark.asyncio
+async def test_watchdog_reconnects_stalled_client(watchdog, client, clock):
+    """Test that a client without events reconnects in place, then recovers"""
+    _, advance = clock
+    client.receive(100)
+    advance(10)
+    await watchdog.check()
+    assert watchdog.state == WatchdogState.OK
+    assert watchdog.rate == 10
+    assert health(watchdog)[0] == 200
+
+    for _ in range(3):
+        advance(10)
+        await watchdog.check()
+    assert watchdog.state == WatchdogState.STALLED
+    assert client.reconnections == 1
+    status, body = health(watchdog)
+    assert status == 503
+    assert body["status"] == "stalled"
+    assert body["reconnects"] == 1
+    assert body["seconds_without_events"] == 0
+
+    client.receive(50)
+    advance(10)
+    await watchdog.check()
+    assert watchdog.state == WatchdogState.OK
+    assert watchdog.reconnects == 0
+    status, body = health(watchdog)
+    assert status == 200
+    assert body["cursor"] == client.cursor
+
+
+@pytest.mark.asyncio
+async def test_watchdog_gives_up_after_max_reconnects(watchdog, client, clock):
+    """Test that the watchdog stops the indexer when reconnecting does not help"""
+    _, advance = clock
+    with pytest.raises(WatchDogTimeoutError):
+        for _ in range(20):
+            advance(10)
+            await watchdog.check()
+    assert client.reconnections == 2
+
+
+@pytest.mark.asyncio
+async def test_watchdog_reconnects_lagging_client(watchdog, client, clock):
+    """Test that a lagging client is only reconnected when it stops catching up"""
+    _, advance = clock
+
+    # Catching up: the lag is over the limit but decreasing
+    for lag in (600, 500, 400, 300):
+        client.receive(1000, lag=lag)
+        advance(10)
+        await watchdog.check()
+    assert watchdog.state == WatchdogState.CATCHING_UP
+    assert health(watchdog)[0] == 200
+    assert client.reconnections == 0
+
+    # Falling behind
+    for lag in (310, 320, 330):
+        client.receive(10, lag=lag)
+        advance(10)
+        await watchdog.check()
+    assert watchdog.state == WatchdogState.LAGGING
+    assert client.reconnections == 1
+    assert health(watchdog)[0] == 503
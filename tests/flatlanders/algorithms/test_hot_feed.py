@@ -0,0 +1,42 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from flatlanders.algorithms.hot_feed import FlatlandersHotFeed, hot_score
+from flatlanders.models.posts import Post
+from flatlanders.models.rankings import HotPostRank
+
+
+def test_hot_score_decays_with_age():
+    assert hot_score(10, 0, 1) > hot_score(10, 0, 10)
+    assert hot_score(0, 5, 1) > hot_score(5, 0, 1)
+
+
+@pytest.mark.django_db
+def test_hot_feed_pages_through_snapshot():
+    now = timezone.now()
+    Post.objects.create(uri="old", cid="cid", created_at=now - timedelta(days=30))
+    Post.objects.create(uri="quiet", cid="cid", created_at=now)
+    Post.objects.create(uri="liked", cid="cid", created_at=now, likes=50)
+    Post.objects.create(
+        uri="reposted", cid="cid", created_at=now - timedelta(hours=1), reposts=40
+    )
+
+    feed = FlatlandersHotFeed()
+    assert feed.rank(now=now) == 3
+
+    page = feed.get_feed(cursor=None, limit=2)
+    assert [item["post"] for item in page["feed"]] == ["liked", "reposted"]
+
+    # A new snapshot doesn't disturb clients paging through the previous one
+    Post.objects.filter(uri="quiet").update(likes=1000)
+    feed.rank(now=now)
+
+    page = feed.get_feed(cursor=page["cursor"], limit=2)
+    assert [item["post"] for item in page["feed"]] == ["quiet"]
+    assert feed.get_feed(cursor=None, limit=1)["feed"] == [{"post": "quiet"}]
+
+    # Only the latest two snapshots are kept
+    feed.rank(now=now)
+    assert set(HotPostRank.objects.values_list("snapshot", flat=True)) == {2, 3}
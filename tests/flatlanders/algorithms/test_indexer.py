@@ -10,7 +10,7 @@ from flatlanders.algorithms.flatlanders_feed import (
     FlatlandersAlgorithm,
     is_sask_text,
 )
-from flatlanders.models.posts import Post
+from flatlanders.models.posts import FeedEntry, Post
 from flatlanders.models.users import RegisteredUser
 from common.models import JetstreamEventWrapper
 from tests.jetstream.sample_json import REPLY_POST
@@ -27,10 +27,13 @@ def test_is_sask_text():
     assert is_sask_text(youtube_link) is False
 
 
-@pytest.mark.django_db
+@pytest.mark.django_db(transaction=True)
 @pytest.mark.asyncio
-async def test_index_new_sask_post():
+async def test_index_new_sask_post(monkeypatch):
     # Creation of post record
+    monkeypatch.setattr(
+        "flatlanders.algorithms.flatlanders_feed.FEEDGEN_INGEST_CATCHUP_LAG", 10**10
+    )
 
     algo = FlatlandersAlgorithm()
     event = JetstreamEventWrapper(REPLY_POST)
@@ -40,3 +43,20 @@ async def test_index_new_sask_post():
     post = await Post.objects.afirst()
     assert post.text == event.text
     assert post.author_did == event.author
+    assert await FeedEntry.objects.filter(feed=algo.name, uri=post.uri).aexists()
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+async def test_catch_up_posts_are_written_in_batches():
+    # The sample event is years old, so the indexer is catching up
+    algo = FlatlandersAlgorithm()
+    event = JetstreamEventWrapper(REPLY_POST)
+    await algo.process_event(event)
+
+    assert algo.writer.pending == 1
+    assert not await Post.objects.aexists()
+
+    assert await algo.writer.flush() == 1
+    assert await Post.objects.filter(uri=event.uri).aexists()
+    assert await FeedEntry.objects.filter(feed=algo.name, uri=event.uri).aexists()
@@ -0,0 +1,73 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from atproto import Client
+
+from flatlanders.emitter import LabelEmitter
+
+LABELER_DID = "did:plc:labeler"
+
+
+class LabelerStandIn(BaseHTTPRequestHandler):
+    """Stand-in for a PDS proxying moderation events to the labeler."""
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        uri = body["subject"]["uri"]
+        with server.lock:
+            server.attempts[uri] = server.attempts.get(uri, 0) + 1
+            attempt = server.attempts[uri]
+
+        responses = server.responses.get(uri, [200])
+        status = responses[min(attempt, len(responses)) - 1]
+        if status == 200:
+            with server.lock:
+                server.events.append((uri, self.headers["atproto-proxy"]))
+            content = {
+                "id": len(server.events),
+                "event": body["event"],
+                "subject": body["subject"],
+                "subjectBlobCids": [],
+                "createdBy": body["createdBy"],
+                "createdAt": "2024-01-01T00:00:00Z",
+            }
+        else:
+            content = {"error": "Error", "message": str(status)}
+
+        payload = json.dumps(content).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        if status == 429:
+            self.send_header("retry-after", "0")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+@pytest.fixture
+def labeler_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), LabelerStandIn)
+    server.lock = threading.Lock()
+    server.attempts = {}
+    server.events = []
+    # uri -> status of each attempt, the last one repeating
+    server.responses = {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def emitter(labeler_server):
+    client = Client(base_url=f"http://127.0.0.1:{labeler_server.server_port}/xrpc")
+    emitter = LabelEmitter(client, LABELER_DID, concurrency=4, rate=0, backoff=0.01)
+    yield emitter
+    emitter.close()
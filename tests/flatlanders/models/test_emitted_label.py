@@ -0,0 +1,25 @@
+import pytest
+
+from flatlanders.models.labelers import EmittedLabel
+from flatlanders.models.posts import Post
+
+
+@pytest.mark.django_db
+def test_exclude_emitted_skips_labels_in_ledger():
+    """Test that labels in the ledger are skipped, per post version and label"""
+    post = Post(uri="uri_1", cid="cid_1")
+    edited = Post(uri="uri_1", cid="cid_2")
+    other = Post(uri="uri_2", cid="cid_1")
+    EmittedLabel.record([(post, "label_a")])
+    # Recording a label twice is a no-op
+    EmittedLabel.record([(post, "label_a")])
+
+    labels = [
+        (post, "label_a"),
+        (post, "label_b"),
+        (edited, "label_a"),
+        (other, "label_a"),
+    ]
+
+    assert EmittedLabel.exclude_emitted(labels) == labels[1:]
+    assert EmittedLabel.objects.count() == 1
@@ -0,0 +1,31 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from flatlanders.models.labelers import LabelerCursorState
+from flatlanders.models.posts import Post
+
+
+@pytest.mark.django_db
+def test_pending_posts_resume_after_cursor():
+    """Test that the cursor resumes between posts created at the same time"""
+    now = datetime.now(tz=UTC)
+    Post.objects.bulk_create(
+        Post(uri=f"uri_{i}", cid="cid", created_at=now + timedelta(seconds=i // 3))
+        for i in range(9)
+    )
+    ordered = list(Post.objects.order_by("created_at", "pk"))
+    cursor_state = LabelerCursorState.objects.create(labeler_service="test")
+
+    assert list(cursor_state.pending_posts()) == ordered
+
+    # Stop in the middle of the posts created in the second second
+    for post in ordered[:4]:
+        cursor_state.advance(post)
+    cursor_state.save()
+    cursor_state.refresh_from_db()
+
+    assert list(cursor_state.pending_posts()) == ordered[4:]
+
+    cursor_state.reset()
+    assert list(cursor_state.pending_posts()) == ordered
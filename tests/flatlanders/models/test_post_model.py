@@ -1,6 +1,7 @@
 import pytest
+from django.urls import reverse
 
-from flatlanders.models.posts import Post
+from flatlanders.models.posts import FeedEntry, Post, uri_key
 from flatlanders.models.users import RegisteredUser
 
 
@@ -20,3 +21,56 @@ def test_post_create():
 
     assert post.author_did == "did"
     assert user.posts.first().uri == "uri"
+
+
+@pytest.mark.django_db
+def test_delete_uri_removes_feed_entries():
+    """Test that deleting a post removes its entries from every feed"""
+    post = Post.objects.create(uri="uri", cid="cid", text="text")
+    FeedEntry.objects.bulk_create(
+        FeedEntry.from_post(post, feed) for feed in ("feed_a", "feed_b")
+    )
+
+    assert FeedEntry.objects.filter(uri="uri").count() == 2
+    assert FeedEntry.objects.get(feed="feed_a").created_at == post.indexed_at
+
+    assert Post._delete_uri("uri") == 1
+    assert not FeedEntry.objects.exists()
+    assert not Post.objects.exists()
+
+
+@pytest.mark.django_db
+def test_post_key_is_derived_from_uri():
+    """Test that posts are keyed by the hash of their URI"""
+    created = Post.objects.create(uri="uri_1", cid="cid")
+    (bulk_created,) = Post.objects.bulk_create([Post(uri="uri_2", cid="cid")])
+
+    assert created.pk == uri_key("uri_1")
+    assert Post.objects.get(pk=uri_key("uri_2")).uri == bulk_created.uri
+    assert -(2**63) <= uri_key("uri_1") < 2**63
+
+
+@pytest.mark.django_db
+def test_every_post_delete_removes_feed_entries(admin_client):
+    """Test that feed entries never outlive their posts, whatever deletes them"""
+    user = RegisteredUser.objects.create(did="did")
+    posts = [
+        Post.objects.create(uri=f"uri_{index}", cid="cid", author=user)
+        for index in range(4)
+    ]
+    FeedEntry.objects.bulk_create(FeedEntry.from_post(post, "feed") for post in posts)
+
+    # Deleting the author keeps the posts, and so their entries
+    user.delete()
+    assert FeedEntry.objects.count() == 4
+
+    posts[0].delete()
+    Post.objects.filter(uri="uri_1").delete()
+    response = admin_client.post(
+        reverse("admin:flatlanders_post_changelist"),
+        {"action": "delete_selected", "_selected_action": [posts[2].pk], "post": "yes"},
+    )
+    assert response.status_code == 302
+
+    assert list(Post.objects.values_list("uri", flat=True)) == ["uri_3"]
+    assert list(FeedEntry.objects.values_list("uri", flat=True)) == ["uri_3"]
@@ -0,0 +1,51 @@
+import time
+
+import pytest
+from atproto.exceptions import BadRequestError, RequestException
+
+from flatlanders.emitter import TokenBucket
+from flatlanders.models.posts import Post
+
+
+def test_emit_all_retries_transient_errors(labeler_server, emitter):
+    """Test that transient errors are retried and permanent errors are reported"""
+    posts = [Post(uri=f"at://post/{i}", cid="cid") for i in range(10)]
+    labeler_server.responses = {
+        "at://post/1": [502, 200],
+        "at://post/2": [429, 500, 200],
+        "at://post/3": [400],
+    }
+
+    errors = emitter.emit_all([(post, "label") for post in posts])
+
+    assert [error is None for error in errors] == [i != 3 for i in range(10)]
+    assert isinstance(errors[3], BadRequestError)
+    assert sorted(uri for uri, _ in labeler_server.events) == sorted(
+        post.uri for i, post in enumerate(posts) if i != 3
+    )
+    assert {proxy for _, proxy in labeler_server.events} == {
+        f"{emitter.labeler_did}#atproto_labeler"
+    }
+    assert labeler_server.attempts["at://post/2"] == 3
+    assert labeler_server.attempts["at://post/3"] == 1
+
+
+def test_emit_gives_up_after_retries(labeler_server, emitter):
+    """Test that an event failing on every attempt raises once retries are spent"""
+    labeler_server.responses = {"at://post/0": [503]}
+
+    with pytest.raises(RequestException, match="503"):
+        emitter.emit(Post(uri="at://post/0", cid="cid"), "label")
+    assert labeler_server.attempts["at://post/0"] == emitter.retries + 1
+
+
+def test_token_bucket_limits_rate():
+    """Test that the token bucket spaces out acquisitions past its burst"""
+    bucket = TokenBucket(rate=100, burst=5)
+
+    start = time.monotonic()
+    for _ in range(15):
+        bucket.acquire()
+
+    # 5 tokens are available at once, the next 10 take 10ms each
+    assert time.monotonic() - start >= 0.09
@@ -0,0 +1,82 @@
+import pytest
+from django.db import DatabaseError
+
+from common.models import JetstreamEventWrapper
+from flatlanders.algorithms.flatlanders_feed import FlatlandersAlgorithm
+from flatlanders.engagement import EngagementCounter
+from flatlanders.models.posts import Post
+from tests.jetstream.sample_json import CREATE_LIKE, CREATE_REPOST, REPLY_POST
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+async def test_engagement_counters_are_flushed_in_batches():
+    algo = FlatlandersAlgorithm()
+    await algo.process_event(JetstreamEventWrapper(REPLY_POST))
+    await algo.writer.flush()
+
+    for _ in range(3):
+        await algo.process_event(JetstreamEventWrapper(CREATE_LIKE))
+    await algo.process_event(JetstreamEventWrapper(CREATE_REPOST))
+
+    # Nothing is written until the counters are flushed
+    post = await Post.objects.aget(uri=JetstreamEventWrapper(REPLY_POST).uri)
+    assert (post.likes, post.reposts) == (0, 0)
+    assert algo.engagement.pending == 2
+
+    assert await algo.engagement.flush() == 2
+    await post.arefresh_from_db()
+    assert (post.likes, post.reposts) == (3, 1)
+    assert algo.engagement.pending == 0
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+async def test_engagement_of_unindexed_posts_is_ignored():
+    algo = FlatlandersAlgorithm()
+    await algo.process_event(JetstreamEventWrapper(CREATE_LIKE))
+
+    assert await algo.engagement.flush() == 0
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_increments(monkeypatch):
+    """Test that increments failing to be written are written by the next flush"""
+    algo = FlatlandersAlgorithm()
+    await algo.process_event(JetstreamEventWrapper(REPLY_POST))
+    await algo.writer.flush()
+    await algo.process_event(JetstreamEventWrapper(CREATE_LIKE))
+
+    def fail(pending):
+        raise DatabaseError("connection lost")
+
+    monkeypatch.setattr(algo.engagement, "_write", fail)
+    with pytest.raises(DatabaseError):
+        await algo.engagement.flush()
+    assert algo.engagement.pending == 1
+
+    monkeypatch.undo()
+    await algo.process_event(JetstreamEventWrapper(CREATE_LIKE))
+    assert await algo.engagement.flush() == 1
+    post = await Post.objects.aget(uri=JetstreamEventWrapper(REPLY_POST).uri)
+    assert post.likes == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_flushes_keep_at_most_max_pending_posts(monkeypatch, caplog):
+    """Test that the smallest increments are dropped while flushes keep failing"""
+    engagement = EngagementCounter(max_pending=2)
+    for index, likes in enumerate((3, 1, 2)):
+        for _ in range(likes):
+            engagement.add("likes", f"at://did:plc:user/app.bsky.feed.post/{index}")
+
+    def fail(pending):
+        raise DatabaseError("connection lost")
+
+    monkeypatch.setattr(engagement, "_write", fail)
+    with pytest.raises(DatabaseError):
+        await engagement.flush()
+    assert engagement.pending == 2
+    assert sorted(engagement._pending["likes"].values()) == [2, 3]
+    assert "Dropped 1 engagement increments of 1 posts" in caplog.text
@@ -0,0 +1,119 @@
+import pytest
+from django.db import DataError, OperationalError
+from django.utils import timezone
+
+from flatlanders import ingest
+from flatlanders.ingest import PostBatchWriter, insert_posts, write_posts
+from flatlanders.metrics import POSTS_INDEXED
+from flatlanders.models.posts import FeedEntry, Post
+
+
+def build_post(index: int) -> Post:
+    return Post(
+        uri=f"post{index}_uri",
+        cid=f"post{index}_cid",
+        text=f"post {index}",
+        created_at=timezone.now(),
+    )
+
+
+@pytest.mark.django_db
+def test_write_posts_skips_existing_posts():
+    """Test that batches only insert new posts and their feed entries"""
+    existing = build_post(0)
+    existing.save()
+
+    inserted = write_posts(
+        [
+            (build_post(0), ["feed_a"]),
+            (build_post(1), ["feed_a", "feed_b"]),
+            (build_post(2), ["feed_a"]),
+        ]
+    )
+
+    assert inserted == 2
+    assert Post.objects.count() == 3
+    assert Post.objects.get(uri="post1_uri").indexed_at is not None
+    assert set(FeedEntry.objects.values_list("feed", "uri")) == {
+        ("feed_a", "post1_uri"),
+        ("feed_b", "post1_uri"),
+        ("feed_a", "post2_uri"),
+    }
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_failed_flush_keeps_buffered_posts(monkeypatch):
+    """Test that a batch failing while the database is down is written later"""
+    writer = PostBatchWriter(batch_size=100)
+    await writer.add(build_post(0), ["feed_a"])
+    await writer.add(build_post(1), ["feed_a"])
+
+    def fail(posts):
+        raise OperationalError("connection lost")
+
+    monkeypatch.setattr(ingest, "insert_posts", fail)
+    with pytest.raises(OperationalError):
+        await writer.flush()
+    assert writer.pending == 2
+    assert "post0_uri" in writer
+
+    monkeypatch.undo()
+    await writer.add(build_post(2), ["feed_a"])
+    assert await writer.flush() == 3
+    assert writer.pending == 0
+    assert await Post.objects.acount() == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_failed_flush_drops_posts_that_cannot_be_written(monkeypatch):
+    """Test that the posts of a batch that fail on their own are dropped"""
+    writer = PostBatchWriter(batch_size=100)
+    for index in range(5):
+        await writer.add(build_post(index), ["feed_a"], match="keyword")
+    indexed = POSTS_INDEXED.value("keyword")
+
+    def write_valid_posts(posts):
+        posts = list(posts)
+        if any(post.uri == "post3_uri" for post, _ in posts):
+            raise DataError("PostgreSQL text fields cannot contain NUL (0x00) bytes")
+        return insert_posts(posts)
+
+    monkeypatch.setattr(ingest, "insert_posts", write_valid_posts)
+    assert await writer.flush() == 4
+    # Only the inserted posts are counted as indexed
+    assert POSTS_INDEXED.value("keyword") == indexed + 4
+    assert writer.pending == 0
+    assert await Post.objects.filter(uri="post3_uri").aexists() is False
+    assert await Post.objects.acount() == 4
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_posts_deleted_during_flush_are_not_kept(monkeypatch):
+    """Test that posts discarded while their batch is written are not kept"""
+    writer = PostBatchWriter(batch_size=100)
+    await writer.add(build_post(0), ["feed_a"])
+    await writer.add(build_post(1), ["feed_a"])
+
+    def discard_then(error):
+        def write(posts):
+            assert writer.discard("post0_uri")
+            if error:
+                raise error
+            return insert_posts(posts)
+
+        return write
+
+    monkeypatch.setattr(ingest, "insert_posts", discard_then(OperationalError()))
+    with pytest.raises(OperationalError):
+        await writer.flush()
+    assert "post0_uri" not in writer
+    assert "post1_uri" in writer
+
+    await writer.add(build_post(0), ["feed_a"])
+    monkeypatch.setattr(ingest, "insert_posts", discard_then(None))
+    await writer.flush()
+    assert [post.uri async for post in Post.objects.all()] == ["post1_uri"]
+    assert not await FeedEntry.objects.filter(uri="post0_uri").aexists()
@@ -0,0 +1,60 @@
+import pytest
+from django.utils import timezone
+
+from flatlanders import labelers
+from flatlanders.emitter import LabelEmissionError
+from flatlanders.ingest import write_posts
+from flatlanders.models.labelers import EmittedLabel, LabelerCursorState
+from flatlanders.models.posts import Post, PostOutbox
+
+
+def build_post(index: int, text: str) -> Post:
+    return Post(
+        uri=f"at://post/{index}", cid="cid", text=text, created_at=timezone.now()
+    )
+
+
+@pytest.fixture(autouse=True)
+def stand_in_emitter(monkeypatch, emitter):
+    # The labeler logs in to the PDS on first use, emit to the stand-in instead
+    monkeypatch.setattr(labelers, "get_emitter", lambda: emitter)
+
+
+@pytest.mark.django_db
+def test_label_outbox_retries_failed_posts(monkeypatch, labeler_server):
+    """Test that outbox entries are kept from the first post whose label failed"""
+    monkeypatch.setattr("flatlanders.models.posts.FEEDGEN_LABELER_OUTBOX", True)
+    write_posts(
+        (build_post(index, text), [])
+        for index, text in enumerate(["the premier", "hockey", "the mla", "mlas"])
+    )
+    labeler_server.responses = {"at://post/2": [400, 200]}
+
+    with pytest.raises(LabelEmissionError):
+        labelers.label_outbox(chunk_size=10)
+
+    keys = PostOutbox.objects.order_by("id").values_list("post_key", flat=True)
+    assert list(keys) == [Post.objects.get(uri=f"at://post/{i}").pk for i in (2, 3)]
+
+    assert labelers.label_outbox(chunk_size=10) == 2
+    assert not PostOutbox.objects.exists()
+    # Labels in the ledger are not emitted again
+    assert sorted(uri for uri, _ in labeler_server.events) == [
+        "at://post/0",
+        "at://post/2",
+        "at://post/3",
+    ]
+
+
+@pytest.mark.django_db
+def test_label_posts_skips_labels_in_ledger(labeler_server):
+    """Test that a reset only emits the labels missing from the ledger"""
+    write_posts((build_post(index, "the premier"), []) for index in range(5))
+    cursor_state = LabelerCursorState.objects.create(labeler_service="test")
+
+    assert labelers.label_posts(cursor_state, chunk_size=2) == 5
+    assert EmittedLabel.objects.count() == 5
+
+    cursor_state.reset()
+    assert labelers.label_posts(cursor_state, chunk_size=2) == 5
+    assert len(labeler_server.events) == 5
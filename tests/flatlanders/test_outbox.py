@@ -0,0 +1,51 @@
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from flatlanders.ingest import write_posts
+from flatlanders.models.posts import Post, PostOutbox, uri_key
+from flatlanders.outbox import OutboxListener
+
+
+def build_post(index: int) -> Post:
+    return Post(uri=f"post{index}_uri", cid="cid", created_at=timezone.now())
+
+
+@pytest.fixture
+def outbox(monkeypatch):
+    monkeypatch.setattr("flatlanders.models.posts.FEEDGEN_LABELER_OUTBOX", True)
+
+
+@pytest.mark.django_db
+def test_indexed_posts_are_added_to_outbox(outbox):
+    """Test that inserted posts are queued in the order they are indexed"""
+    build_post(0)._insert_with_feed_entries(["feed"])
+    write_posts([(build_post(0), ["feed"]), (build_post(1), ["feed"])])
+    build_post(2)._insert_with_feed_entries([])
+
+    keys = PostOutbox.objects.order_by("id").values_list("post_key", flat=True)
+    assert list(keys) == [uri_key(f"post{index}_uri") for index in range(3)]
+
+
+@pytest.mark.django_db
+def test_outbox_is_disabled_by_default():
+    """Test that posts are not queued unless the outbox is enabled"""
+    write_posts([(build_post(0), ["feed"])])
+
+    assert not PostOutbox.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_listener_wakes_on_outbox_notification(outbox):
+    """Test that the listener is notified when posts are committed to the outbox"""
+    listener = OutboxListener()
+    try:
+        assert not listener.wait(0.01)
+
+        write_posts([(build_post(0), ["feed"])])
+
+        # Only Postgres notifies the listener, other databases are polled
+        is_postgres = connection.vendor == "postgresql"
+        assert listener.wait(5 if is_postgres else 0.01) == is_postgres
+    finally:
+        listener.close()
@@ -0,0 +1,75 @@
+from datetime import UTC, date, datetime, timedelta
+
+import pytest
+from django.utils import timezone
+
+from flatlanders import retention
+from flatlanders.models.posts import Post
+from flatlanders.retention import (
+    PostPruner,
+    next_partition_start,
+    partition_interval,
+    partition_name,
+    partition_start,
+)
+
+
+def test_partition_ranges():
+    assert partition_start(date(2024, 11, 21), "month") == date(2024, 11, 1)
+    assert next_partition_start(date(2024, 12, 1), "month") == date(2025, 1, 1)
+    assert partition_start(date(2024, 11, 21), "week") == date(2024, 11, 18)
+    assert next_partition_start(date(2024, 11, 18), "week") == date(2024, 11, 25)
+    assert partition_name(date(2024, 11, 1)) == "flatlanders_post_p20241101"
+
+
+@pytest.mark.django_db
+def test_prune_deletes_expired_posts_in_chunks():
+    now = timezone.now()
+    for index in range(5):
+        Post.objects.create(
+            uri=f"old{index}", cid="cid", created_at=now - timedelta(days=40)
+        )
+    Post.objects.create(uri="recent", cid="cid", created_at=now - timedelta(days=1))
+
+    assert PostPruner(retention_days=0).prune(now) == 0
+    assert PostPruner(retention_days=30, chunk_size=2).prune(now) == 5
+    assert list(Post.objects.values_list("uri", flat=True)) == ["recent"]
+
+
+@pytest.mark.django_db
+def test_prune_uses_interval_of_existing_partitions(monkeypatch):
+    """Test that weekly partitions stay weekly whatever the configured interval"""
+    weeks = [date(2024, 10, 28) + timedelta(weeks=index) for index in range(4)]
+    monkeypatch.setattr(
+        retention,
+        "list_partitions",
+        lambda: ["flatlanders_post_default", *map(partition_name, weeks)],
+    )
+    assert partition_interval("month") == "week"
+
+    created, dropped = [], []
+    monkeypatch.setattr(retention, "is_partitioned", lambda: True)
+    monkeypatch.setattr(
+        retention, "create_partition", lambda start, interval: created.append(interval)
+    )
+    monkeypatch.setattr(
+        retention,
+        "drop_expired_partitions",
+        lambda cutoff, interval: dropped.append(interval),
+    )
+    now = datetime(2024, 12, 4, tzinfo=UTC)
+    PostPruner(retention_days=30).prune(now)
+
+    assert created == ["week"] * 3
+    assert dropped == ["week"]
+
+
+def test_partition_interval_of_monthly_partitions(monkeypatch):
+    months = [date(2024, 10, 1), date(2024, 11, 1), date(2024, 12, 1)]
+    monkeypatch.setattr(
+        retention, "list_partitions", lambda: list(map(partition_name, months))
+    )
+    assert partition_interval("week") == "month"
+
+    monkeypatch.setattr(retention, "list_partitions", lambda: [])
+    assert partition_interval("week") == "week"
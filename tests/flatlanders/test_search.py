@@ -0,0 +1,86 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from flatlanders.models.posts import Post
+from flatlanders.search import FTS_TABLE, search_posts
+
+
+def create_post(index: int, text: str) -> Post:
+    return Post.objects.create(
+        uri=f"post{index}_uri",
+        cid=f"post{index}_cid",
+        text=text,
+        created_at=timezone.now(),
+    )
+
+
+@pytest.mark.django_db
+def test_search_index_follows_post_changes():
+    """Test that the index is maintained as posts are created, updated and deleted"""
+    create_post(1, "Watching the Riders game in Regina")
+    post = create_post(2, "Canola harvest is done")
+
+    assert list(search_posts("regina").values_list("uri", flat=True)) == ["post1_uri"]
+    assert not search_posts('"unmatched quote').exists()
+
+    post.text = "Harvest is done, heading to Regina"
+    post.save()
+    assert search_posts("regina").count() == 2
+    assert not search_posts("canola").exists()
+
+    post.delete()
+    assert search_posts("regina").count() == 1
+
+
+@pytest.mark.django_db
+def test_search_posts_view(client):
+    """Test that the search endpoint pages through the newest matches"""
+    for index in range(3):
+        create_post(index, f"Prairie sunset number {index}")
+    url = reverse("search_posts")
+
+    response = client.get(url, {"q": "sunset", "limit": 2})
+    assert response.status_code == 200
+    assert response.json() == {
+        "posts": [{"uri": "post2_uri"}, {"uri": "post1_uri"}],
+        "cursor": "2",
+    }
+
+    response = client.get(url, {"q": "sunset", "limit": 2, "cursor": "2"})
+    assert response.json() == {"posts": [{"uri": "post0_uri"}]}
+
+    assert client.get(url).status_code == 400
+    assert client.get(url, {"q": "sunset", "cursor": "-1"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_admin_search_uses_search_index(admin_client):
+    """Test that the post admin searches text, URIs and DIDs"""
+    create_post(1, "Watching the Riders game in Regina")
+    create_post(2, "Canola harvest is done")
+    url = reverse("admin:flatlanders_post_changelist")
+
+    response = admin_client.get(url, {"q": "riders"})
+    assert list(response.context["cl"].result_list) == [
+        Post.objects.get(uri="post1_uri")
+    ]
+
+    response = admin_client.get(url, {"q": "at://missing"})
+    assert response.context["cl"].result_count == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_search_triggers_are_restored_after_migrations():
+    """Test that migrating recreates search triggers dropped by a table rebuild"""
+    if connection.vendor != "sqlite":
+        pytest.skip("Only the SQLite search index uses triggers")
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TRIGGER {FTS_TABLE}_insert")
+
+    call_command("migrate", "flatlanders", verbosity=0)
+
+    create_post(1, "Watching the Riders game in Regina")
+    assert search_posts("regina").exists()
@@ -1,21 +1,34 @@
 import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.urls import reverse
 from django.utils import timezone
 
+from flatlanders.algorithms import ALGORITHMS
 from flatlanders.algorithms.flatlanders_feed import FlatlandersAlgorithm
-from flatlanders.models.posts import Post, RegisteredUser
+from flatlanders.cache import abump_feed_version
+from flatlanders.models.posts import FeedEntry, Post, RegisteredUser, uri_key
+
+FEED = FlatlandersAlgorithm().name
+
+
+def create_feed_post(**kwargs) -> Post:
+    post = Post.objects.create(**kwargs)
+    FeedEntry.from_post(post, FEED).save()
+    return post
 
 
 @pytest.mark.django_db
 def test_flatlanders_handler():
     user = RegisteredUser.objects.create(did="did")
     # Create some test posts
-    post1 = Post.objects.create(
+    post1 = create_feed_post(
         uri="post1_uri", cid="post1_cid", created_at=timezone.now(), author=user
     )
-    post2 = Post.objects.create(
+    post2 = create_feed_post(
         uri="post2_uri", cid="post2_cid", created_at=timezone.now(), author=user
     )
-    post3 = Post.objects.create(
+    post3 = create_feed_post(
         uri="post3_uri", cid="post3_cid", created_at=timezone.now(), author=user
     )
 
@@ -36,3 +49,63 @@ def test_flatlanders_handler():
     assert len(result["feed"]) == 1
     assert result["feed"][0]["post"] == "post1_uri"
     
+
+
+@pytest.mark.django_db
+def test_feed_skeleton_page_cache(client, monkeypatch, django_assert_num_queries):
+    feed_uri = "at://did:example/app.bsky.feed.generator/flatlanders"
+    monkeypatch.setitem(ALGORITHMS, feed_uri, FlatlandersAlgorithm().aget_feed)
+    cache.clear()
+
+    create_feed_post(uri="post1_uri", cid="post1_cid", created_at=timezone.now())
+    params = {"feed": feed_uri, "limit": 5}
+
+    response = client.get(reverse("get_feed_skeleton"), params)
+    assert response["Content-Type"] == "application/json"
+    assert response.json()["feed"] == [{"post": "post1_uri"}]
+
+    # Identical requests are served from the cache without touching the database
+    create_feed_post(uri="post2_uri", cid="post2_cid", created_at=timezone.now())
+    with django_assert_num_queries(0):
+        cached = client.get(reverse("get_feed_skeleton"), params)
+    assert cached.content == response.content
+
+    # Bumping the feed version invalidates every cached page
+    async_to_sync(abump_feed_version)()
+    response = client.get(reverse("get_feed_skeleton"), params)
+    assert [item["post"] for item in response.json()["feed"]] == [
+        "post2_uri",
+        "post1_uri",
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+async def test_flatlanders_async_handler():
+    for index in range(3):
+        await FeedEntry.objects.acreate(
+            feed=FEED,
+            post_key=uri_key(f"post{index}_uri"),
+            uri=f"post{index}_uri",
+            cid=f"post{index}_cid",
+            created_at=timezone.now(),
+        )
+
+    algo = FlatlandersAlgorithm()
+
+    result = await algo.aget_feed(limit=2, cursor=None)
+    assert [item["post"] for item in result["feed"]] == ["post2_uri", "post1_uri"]
+
+    result = await algo.aget_feed(limit=2, cursor=result["cursor"])
+    assert [item["post"] for item in result["feed"]] == ["post0_uri"]
+
+
+@pytest.mark.django_db
+def test_pool_stats_requires_staff(client, admin_client):
+    """Test that only staff users can read the connection pool statistics"""
+    url = reverse("db_pool_stats")
+    assert client.get(url).status_code == 403
+
+    response = admin_client.get(url)
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/json"
@@ -56,3 +56,45 @@ CREATE_FOLLOW = {
         "cid": "bafyreiehtzjqj5j66ci65tvcv4kvuluvbohaqokq4be3zasjazwr7mts3i",
     },
 }
+
+CREATE_LIKE = {
+    "did": "did:plc:jkotys5vybvpmwulg5u43q7y",
+    "time_us": 1731623117283712,
+    "kind": "commit",
+    "commit": {
+        "rev": "3lawvqgjx7k2a",
+        "operation": "create",
+        "collection": "app.bsky.feed.like",
+        "rkey": "3lawvqgjvks2a",
+        "record": {
+            "$type": "app.bsky.feed.like",
+            "createdAt": "2024-11-14T22:25:17.102Z",
+            "subject": {
+                "cid": "bafyreifsghszkqvli53yj7v43sgbacqaq6lck73otcradmwrsv5scb22fu",
+                "uri": "at://did:plc:7keopgujra55zzcgmvvbmnfm/app.bsky.feed.post/3lawvqfat362m",
+            },
+        },
+        "cid": "bafyreigb6vnsj2hbm5zw5fzdv5yeu6enbq7nqf3lmyvpgyp3m4pqxzvd4a",
+    },
+}
+
+CREATE_REPOST = {
+    "did": "did:plc:dxd5og7wehgstecmmufakfs5",
+    "time_us": 1731623117592004,
+    "kind": "commit",
+    "commit": {
+        "rev": "3lawvqgtlbc2x",
+        "operation": "create",
+        "collection": "app.bsky.feed.repost",
+        "rkey": "3lawvqgsrrk2x",
+        "record": {
+            "$type": "app.bsky.feed.repost",
+            "createdAt": "2024-11-14T22:25:17.411Z",
+            "subject": {
+                "cid": "bafyreifsghszkqvli53yj7v43sgbacqaq6lck73otcradmwrsv5scb22fu",
+                "uri": "at://did:plc:7keopgujra55zzcgmvvbmnfm/app.bsky.feed.post/3lawvqfat362m",
+            },
+        },
+        "cid": "bafyreibhg3ti2vbc5pd7bcwdoyxzm2s4bqwnj7dd4prjuczbxhzhsh3kxq",
+    },
+}
@@ -0,0 +1,28 @@
+import pytest
+from django.db import DEFAULT_DB_ALIAS
+
+from flatlanders.models.posts import Post
+from sk_atp_feed.routers import ReplicaRouter, use_replica
+
+
+@pytest.fixture
+def router(monkeypatch):
+    router = ReplicaRouter()
+    router.replicas = ["replica_0"]
+    monkeypatch.setattr(router, "replica_lag", lambda alias: 0.0)
+    return router
+
+
+def test_reads_use_replicas_only_when_requested(router):
+    assert router.db_for_read(Post) == DEFAULT_DB_ALIAS
+    with use_replica():
+        assert router.db_for_read(Post) == "replica_0"
+        assert router.db_for_write(Post) == DEFAULT_DB_ALIAS
+    assert router.db_for_read(Post) == DEFAULT_DB_ALIAS
+
+
+def test_lagging_replicas_are_skipped(router, monkeypatch):
+    monkeypatch.setattr(router, "replica_lag", lambda alias: router.max_lag + 1)
+
+    with use_replica():
+        assert router.db_for_read(Post) == DEFAULT_DB_ALIAS
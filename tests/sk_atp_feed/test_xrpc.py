@@ -0,0 +1,43 @@
+import pytest
+from asgiref.testing import ApplicationCommunicator
+
+from sk_atp_feed.asgi import application
+
+
+async def asgi_get(path: str) -> tuple[int, dict[bytes, bytes], bytes]:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [(b"host", b"localhost")],
+        "server": ("localhost", 80),
+    }
+    communicator = ApplicationCommunicator(application, scope)
+    await communicator.send_input({"type": "http.request", "body": b""})
+    start = await communicator.receive_output(timeout=5)
+    body = await communicator.receive_output(timeout=5)
+    return start["status"], dict(start["headers"]), body["body"]
+
+
+@pytest.mark.asyncio
+async def test_xrpc_routes_skip_full_middleware_stack():
+    status, headers, body = await asgi_get("/xrpc/app.bsky.feed.describeFeedGenerator")
+
+    assert status == 200
+    assert b"feeds" in body
+    assert headers[b"Cache-Control"] == b"public, max-age=3600"
+    # The clickjacking middleware only runs for the full stack
+    assert b"X-Frame-Options" not in headers
+
+
+@pytest.mark.asyncio
+async def test_admin_keeps_full_middleware_stack():
+    status, headers, _ = await asgi_get("/admin/login/")
+
+    assert status == 200
+    assert headers[b"X-Frame-Options"] == b"DENY"